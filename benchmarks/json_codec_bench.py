@@ -0,0 +1,77 @@
+"""
+benchmarks/json_codec_bench.py
+JSON 编解码器微基准 - 对 reports/responses 中录制的订单簿推送和 K 线响应逐条解析，对比各实现的单条耗时
+
+用法:
+    python benchmarks/json_codec_bench.py [--repeat 200] [--dir reports/responses]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import json_codec  # noqa: E402
+
+
+def load_payloads(directory: str) -> Dict[str, List[bytes]]:
+    """
+    读取录制的消息，按类型分组
+
+    订单簿文件是原始 WebSocket 推送，K 线文件是 APIClient 的结果字典（载荷在 "response" 下），
+    两者都重新序列化为交易所返回的原始字节。
+    """
+    payloads: Dict[str, List[bytes]] = {"book": [], "candlestick": []}
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if "orderbook" in name:
+            payloads["book"].append(json.dumps(data).encode("utf-8"))
+        elif isinstance(data, dict) and isinstance(data.get("response"), dict):
+            payloads["candlestick"].append(json.dumps(data["response"]).encode("utf-8"))
+    return payloads
+
+
+def bench(codec: json_codec.JsonCodec, messages: List[bytes], repeat: int) -> float:
+    """返回单条消息平均解析耗时（微秒）"""
+    loads = codec.loads
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        for raw in messages:
+            loads(raw)
+    elapsed = time.perf_counter_ns() - start
+    return elapsed / 1000 / (repeat * len(messages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 编解码器微基准")
+    parser.add_argument("--dir", default="reports/responses", help="录制消息目录")
+    parser.add_argument("--repeat", type=int, default=200, help="每组消息重复解析次数")
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.dir)
+    backends = json_codec.available_backends()
+    print(f"可用实现: {', '.join(backends)}（当前: {json_codec.codec_name()}）")
+
+    for kind, messages in payloads.items():
+        if not messages:
+            print(f"\n{kind}: 无录制消息，跳过")
+            continue
+
+        avg_size = sum(len(m) for m in messages) / len(messages)
+        print(f"\n{kind}: {len(messages)} 条消息，平均 {avg_size / 1024:.1f} KB")
+        baseline = None
+        for name in reversed(backends):  # 标准库 json 排在最后，先测作为基线
+            micros = bench(json_codec.get_codec(name), messages, args.repeat)
+            baseline = baseline or micros
+            print(f"  {name:<10} {micros:>10.2f} µs/条   {baseline / micros:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
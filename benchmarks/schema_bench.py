@@ -0,0 +1,150 @@
+"""
+benchmarks/schema_bench.py
+结构校验微基准 - 对比原有的断言链与编译后的结构校验函数的单条耗时
+
+断言链按改造前 validate_book_push_message / validate_subscription_response / validate_data_exists
+中的检查原样保留在本文件里（不含日志与 allure.step），两侧只比较结构检查本身。
+编译后的订单簿推送校验比原断言链多检查字段类型和 data 每一项，因此另有一组同等检查的断言链作对照。
+
+用法:
+    python benchmarks/schema_bench.py [--repeat 20000] [--depth 150]
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.validators import validate_data_exists_shape  # noqa: E402
+from utils.ws_validators import validate_book_push_shape, validate_subscription_shape  # noqa: E402
+
+
+def legacy_book_push(message: Dict[str, Any]):
+    assert message is not None, "推送消息为空"
+    assert isinstance(message, dict), f"推送消息应该是字典（实际: {type(message)}）"
+    assert "method" in message, "缺少 method 字段"
+    assert "result" in message, "缺少 result 字段"
+    assert "code" in message, "缺少 code 字段"
+    method = message["method"]
+    code = message["code"]
+    result = message["result"]
+    assert method == "subscribe", f"method 应该是 'subscribe'（实际: {method}）"
+    assert code == 0, f"code 应该是 0（实际: {code}）"
+    assert isinstance(result, dict), f"result 应该是字典（实际: {type(result)}）"
+    assert "instrument_name" in result, "result 缺少 instrument_name 字段"
+    assert "subscription" in result, "result 缺少 subscription 字段"
+    assert "channel" in result, "result 缺少 channel 字段"
+    assert "depth" in result, "result 缺少 depth 字段"
+    assert "data" in result, "result 缺少 data 字段"
+    channel = result["channel"]
+    data = result["data"]
+    assert channel == "book", f"channel 应该是 'book'（实际: {channel}）"
+    assert isinstance(data, list), f"data 应该是列表（实际: {type(data)}）"
+    assert len(data) > 0, "data 不应为空"
+
+
+def legacy_book_push_full(message: Dict[str, Any]):
+    """与 validate_book_push_shape 覆盖相同检查的断言链（字段类型、data 每项的 bids/asks/t）"""
+    legacy_book_push(message)
+    result = message["result"]
+    assert isinstance(result["instrument_name"], str), "instrument_name 应该是 str"
+    assert isinstance(result["subscription"], str), "subscription 应该是 str"
+    assert isinstance(result["depth"], int), "depth 应该是 int"
+    for i, item in enumerate(result["data"]):
+        assert isinstance(item, dict), f"data[{i}] 应该是字典"
+        assert "bids" in item, f"data[{i}] 缺少 bids 字段"
+        assert "asks" in item, f"data[{i}] 缺少 asks 字段"
+        assert "t" in item, f"data[{i}] 缺少 t 字段"
+        assert isinstance(item["bids"], list), f"data[{i}].bids 应该是列表"
+        assert isinstance(item["asks"], list), f"data[{i}].asks 应该是列表"
+        assert isinstance(item["t"], (int, float)), f"data[{i}].t 应该是数字"
+
+
+def legacy_subscription(response: Dict[str, Any]):
+    assert response is not None, "订阅响应为空（None）"
+    assert isinstance(response, dict), f"订阅响应应该是字典类型（实际类型: {type(response)}）"
+    assert "id" in response, "缺少 id 字段"
+    assert "method" in response, "缺少 method 字段"
+    assert "code" in response, "缺少 code 字段"
+    method = response["method"]
+    assert method == "subscribe", f"method 应该是 'subscribe'（实际: {method}）"
+
+
+def legacy_data_exists(response: Dict[str, Any]):
+    assert "result" in response, "Response should contain 'result' field"
+    assert "data" in response["result"], "Result should contain 'data' field"
+    data = response["result"]["data"]
+    assert isinstance(data, list), "Data should be a list"
+    assert len(data) > 0, "Data should not be empty"
+
+
+def make_book_push(depth: int) -> Dict[str, Any]:
+    """合成的订单簿推送（Crypto.com 三元素档位）"""
+    mid, tick = 50000.0, 0.5
+    return {
+        "id": -1,
+        "method": "subscribe",
+        "code": 0,
+        "result": {
+            "instrument_name": "BTCUSD-PERP",
+            "subscription": f"book.BTCUSD-PERP.{depth}",
+            "channel": "book",
+            "depth": depth,
+            "data": [{
+                "bids": [[str(mid - tick * (i + 1)), "0.25", "3"] for i in range(depth)],
+                "asks": [[str(mid + tick * (i + 1)), "0.5", "1"] for i in range(depth)],
+                "t": 1700000000000,
+            }],
+        },
+    }
+
+
+def make_candlestick_response(count: int) -> Dict[str, Any]:
+    """合成的 K 线响应"""
+    return {
+        "id": 1,
+        "method": "public/get-candlestick",
+        "code": 0,
+        "result": {
+            "interval": "1m",
+            "data": [{"o": "100", "h": "101", "l": "99", "c": "100.5", "v": "1", "t": 1700000000000 + i * 60000}
+                     for i in range(count)],
+        },
+    }
+
+
+def bench(function: Callable[[Any], Any], message: Any, repeat: int) -> float:
+    """返回单条消息平均校验耗时（微秒）"""
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        function(message)
+    elapsed = time.perf_counter_ns() - start
+    return elapsed / 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="结构校验微基准")
+    parser.add_argument("--repeat", type=int, default=20000, help="每种消息重复校验次数")
+    parser.add_argument("--depth", type=int, default=150, help="合成订单簿推送的深度")
+    args = parser.parse_args()
+
+    book_push = make_book_push(args.depth)
+    cases = [
+        (f"订单簿推送 (depth={args.depth})", book_push, legacy_book_push, validate_book_push_shape),
+        (f"订单簿推送 (depth={args.depth}，同等检查)", book_push, legacy_book_push_full, validate_book_push_shape),
+        ("订阅响应", {"id": 1, "method": "subscribe", "code": 0}, legacy_subscription, validate_subscription_shape),
+        ("K 线响应 (300 根)", make_candlestick_response(300), legacy_data_exists, validate_data_exists_shape),
+    ]
+
+    for title, message, legacy, compiled in cases:
+        legacy_micros = bench(legacy, message, args.repeat)
+        compiled_micros = bench(compiled, message, args.repeat)
+        print(f"\n{title}")
+        print(f"  {'断言链':<8} {legacy_micros:>8.3f} µs/条")
+        print(f"  {'编译校验':<8} {compiled_micros:>8.3f} µs/条   {legacy_micros / compiled_micros:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
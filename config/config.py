@@ -2,6 +2,7 @@
 API 配置文件
 """
 import os
+import tempfile
 from enum import Enum
 
 
@@ -19,6 +20,16 @@ class Config:
     BASE_URL = "https://api.crypto.com/exchange/v1"
     TIMEOUT = 30
     MAX_RETRIES = 3
+    # 重试：只针对 GET 的连接错误与下列状态码，退避 backoff_factor * 2^(n-1) 秒
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    RETRY_BACKOFF_FACTOR = float(os.getenv("RETRY_BACKOFF_FACTOR", "0.3"))
+    # HTTP 连接池：pool_connections 为缓存的主机数，pool_maxsize 为每个主机保留的连接数（不小于批量线程数）
+    HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+
+    # 异步 REST 客户端：同时在途的请求数、连接池大小（keep-alive 复用）
+    ASYNC_MAX_CONCURRENCY = int(os.getenv("ASYNC_MAX_CONCURRENCY", "10"))
+    ASYNC_CONNECTION_LIMIT = int(os.getenv("ASYNC_CONNECTION_LIMIT", "20"))
 
     # 环境配置
     CURRENT_ENV = Environment.PROD
@@ -28,6 +39,51 @@ class Config:
         "candlestick": "/public/get-candlestick"
     }
 
+    # 限流（令牌桶）：rate 为每秒请求数，burst 为允许的突发量
+    # 键为 "rest:<端点>" 或 "ws:<方法>"；交易所公开行情接口限制为每 IP 100 次/秒，留出余量
+    RATE_LIMITS = {
+        "rest:candlestick": {
+            "rate": float(os.getenv("CANDLESTICK_RATE_LIMIT", "50")),
+            "burst": float(os.getenv("CANDLESTICK_RATE_BURST", "10")),
+        },
+        "ws:subscribe": {
+            "rate": float(os.getenv("WS_SUBSCRIBE_RATE_LIMIT", "50")),
+            "burst": float(os.getenv("WS_SUBSCRIBE_RATE_BURST", "10")),
+        },
+        "ws:unsubscribe": {
+            "rate": float(os.getenv("WS_SUBSCRIBE_RATE_LIMIT", "50")),
+            "burst": float(os.getenv("WS_SUBSCRIBE_RATE_BURST", "10")),
+        },
+    }
+    # 多个进程（pytest-xdist worker）通过状态文件共享令牌桶，速率为所有进程合计
+    RATE_LIMIT_SHARED = os.getenv("RATE_LIMIT_SHARED", "true").lower() == "true"
+    RATE_LIMIT_STATE_DIR = os.getenv(
+        "RATE_LIMIT_STATE_DIR", os.path.join(tempfile.gettempdir(), "crypto-api-ratelimit")
+    )
+    # 批量请求的线程数
+    REST_MAX_WORKERS = int(os.getenv("REST_MAX_WORKERS", "8"))
+
+    # K 线周期（毫秒），包含交易所的新旧两种写法；1M（自然月）长度不固定，不在此列
+    TIMEFRAME_MS = {
+        "1m": 60_000, "M1": 60_000,
+        "5m": 300_000, "M5": 300_000,
+        "15m": 900_000, "M15": 900_000,
+        "30m": 1_800_000, "M30": 1_800_000,
+        "1h": 3_600_000, "H1": 3_600_000,
+        "2h": 7_200_000, "H2": 7_200_000,
+        "4h": 14_400_000, "H4": 14_400_000,
+        "12h": 43_200_000, "H12": 43_200_000,
+        "1D": 86_400_000, "D1": 86_400_000,
+        "7D": 604_800_000,
+        "14D": 1_209_600_000,
+    }
+
+    # K 线响应缓存：已收盘窗口永久缓存，包含当前时间的窗口按 TTL 过期，超出容量按 LRU 淘汰
+    CANDLE_CACHE_ENABLED = os.getenv("CANDLE_CACHE_ENABLED", "false").lower() == "true"
+    CANDLE_CACHE_PATH = os.getenv("CANDLE_CACHE_PATH", ".cache/candles.sqlite3")
+    CANDLE_CACHE_MAX_BYTES = int(os.getenv("CANDLE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    CANDLE_CACHE_OPEN_TTL = float(os.getenv("CANDLE_CACHE_OPEN_TTL", "5"))  # 秒
+
     # WebSocket 配置（新增）
     #WS_URL = "wss://uat-stream.3ona.co/exchange/v1/market"
     WS_URL = "wss://stream.crypto.com/exchange/v1/market"
@@ -36,6 +92,25 @@ class Config:
     WS_PING_INTERVAL = int(os.getenv("WS_PING_INTERVAL", "30"))
     WS_MESSAGE_TIMEOUT = 10  # WebSocket 消息接收超时
 
+    # WebSocket 自动重连（指数退避 + 抖动）
+    WS_AUTO_RECONNECT = os.getenv("WS_AUTO_RECONNECT", "true").lower() == "true"
+    WS_RECONNECT_BASE_DELAY = float(os.getenv("WS_RECONNECT_BASE_DELAY", "0.5"))  # 秒
+    WS_RECONNECT_MAX_DELAY = float(os.getenv("WS_RECONNECT_MAX_DELAY", "30"))  # 秒
+    WS_RECONNECT_MAX_ATTEMPTS = int(os.getenv("WS_RECONNECT_MAX_ATTEMPTS", "10"))
+
+    # WebSocket 连接池（频道分片）
+    WS_POOL_MAX_SOCKETS = int(os.getenv("WS_POOL_MAX_SOCKETS", "4"))
+    WS_MAX_CHANNELS_PER_SOCKET = int(os.getenv("WS_MAX_CHANNELS_PER_SOCKET", "100"))
+
+    # WebSocket 频道队列：block（不静默丢消息；超出容量的暂存在有界溢出区，溢出区满时关闭队列并报错）
+    # / drop_oldest / conflate_latest（只保留最新快照）
+    WS_QUEUE_POLICY = os.getenv("WS_QUEUE_POLICY", "block")
+    WS_QUEUE_MAXSIZE = int(os.getenv("WS_QUEUE_MAXSIZE", "10000"))  # 0 表示不限
+    WS_QUEUE_OVERFLOW_MAXSIZE = int(os.getenv("WS_QUEUE_OVERFLOW_MAXSIZE", "10000"))  # block 溢出区容量
+
+    # JSON 编解码器: auto（按 orjson > simdjson > ujson > json 选择已安装的实现）或指定实现名称
+    JSON_CODEC = os.getenv("JSON_CODEC", "auto")
+
     # WebSocket 频道（新增）
     WS_CHANNELS = {"orderbook": "book.{instrument_name}.{depth}",
                    "trade": "trade.{instrument_name}",
@@ -119,6 +119,23 @@ class OrderbookCases:
             }
         },
 
+        "TC_BOOK_008": {
+            "case_id": "TC_BOOK_008",
+            "description": "快照 + 增量订阅 - 本地重建订单簿 - BTC_USDT - 深度 50",
+            "channel_type": "orderbook",
+            "params": {
+                "instrument_name": "BTCUSD-PERP",
+                "depth": 50,
+                "book_subscription_type": "SNAPSHOT_AND_UPDATE",
+                "book_update_frequency": 10
+            },
+            "expected": {
+                "subscription_success": True,
+                "message_count": 50,  # 快照 + 增量共处理 50 条
+                "sequence_continuous": True
+            }
+        },
+
 
     }
 
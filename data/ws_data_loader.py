@@ -2,8 +2,11 @@
 config/test_data/ws_data_loader.py
 WebSocket 测试数据加载器
 """
+from typing import Callable, Dict, Tuple
+
 from data.base_data_loader import BaseDataLoader
 from data.orderbook_cases import OrderbookCases
+from utils.case_compiler import compile_case
 
 
 class WebSocketDataLoader(BaseDataLoader):
@@ -14,4 +17,24 @@ class WebSocketDataLoader(BaseDataLoader):
         # 未来扩展
         # "trade": TradeCases,
         # "ticker": TickerCases,
-    }
\ No newline at end of file
+    }
+
+    # 编译后的逐帧检查 {(case_type, case_id): {channel: check}}
+    _compiled: Dict[Tuple[str, str], Dict[str, Callable]] = {}
+
+    @classmethod
+    def get_compiled_checks(cls, case_id: str, case_type: str = "orderbook") -> Dict[str, Callable]:
+        """
+        获取用例 expected 编译后的逐帧检查（首次调用时编译并缓存）
+
+        conftest 在收集阶段预先编译参数化用到的用例，执行阶段直接取缓存
+
+        Returns:
+            Dict: {频道: check(message) -> [(违规类型, 说明)]}
+        """
+        key = (case_type.lower(), case_id)
+        checks = cls._compiled.get(key)
+        if checks is None:
+            checks = compile_case(cls.get_case(case_id, case_type))
+            cls._compiled[key] = checks
+        return checks
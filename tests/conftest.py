@@ -3,6 +3,7 @@ Pytest 配置和 Fixtures
 提供测试所需的通用 fixture 和钩子函数
 """
 import pytest
+import asyncio
 import logging
 import os
 import json
@@ -32,49 +33,85 @@ def api_client():
     yield client
     client.close()
 
+
 # ==================== WebSocket Client ====================
-@pytest.fixture(scope="function")
-async def ws_client(test_logger):
-    """    WebSocket 客户端 Fixture（异步）    自动连接和断开    """
-    test_logger.info("=" * 80)
-    test_logger.info("🔧 初始化 WebSocket 客户端")
-    test_logger.info("=" * 80)
-    # 创建客户端
+@pytest.fixture(scope="session")
+def event_loop():
+    """
+    会话级事件循环
+
+    会话级异步 fixture（共享 WebSocket 连接）要求事件循环同样为会话级。
+    覆盖 event_loop 的写法依赖 requirements.txt 固定的 pytest-asyncio 0.21.x；
+    升级到 0.24 及以上时需删除此 fixture，改为在 ws_session_client 上声明 loop_scope="session"
+    """
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+async def ws_session_client():
+    """
+    会话级 WebSocket 连接 Fixture
+
+    整个测试会话只建立一次代理 CONNECT + TLS + WS 握手，
+    用例之间通过订阅隔离（见 ws_client），而不是每个用例新建连接
+    """
+    logger = logging.getLogger("ws_session")
     client = WebSocketClient(ws_url=Config.WS_URL, timeout=Config.WS_TIMEOUT)
-    test_logger.info(f"WebSocket URL: {Config.WS_URL}")
-    test_logger.info(f"超时设置: {Config.WS_TIMEOUT}秒")
-    # 连接
-    test_logger.info("正在连接 WebSocket...")
     connected = await client.connect()
     if not connected:
-        test_logger.error("=" * 80)
-        test_logger.error("❌ WebSocket 连接失败")
-        test_logger.error("=" * 80)
-        test_logger.error("可能的原因:")
-        test_logger.error("1. 网络连接问题")
-        test_logger.error("2. WebSocket URL 不正确")
-        test_logger.error("3. 防火墙阻止连接")
-        test_logger.error("4. 服务器不可用")
-        test_logger.error("=" * 80)
-        test_logger.error(f"当前 URL: {Config.WS_URL}")
-        test_logger.error("=" * 80)
+        logger.error(f"❌ WebSocket 连接失败: {Config.WS_URL}")
         pytest.fail(f"WebSocket 连接失败，请检查配置和网络: {Config.WS_URL}")
+    yield client
+    logger.info(f"💓 心跳统计: {client.get_heartbeat_stats()}")
+    logger.info(f"🔁 重连统计: {client.get_reconnect_stats()}")
+    await client.disconnect()
+
+
+@pytest.fixture(scope="function")
+async def ws_client(ws_session_client, test_logger):
+    """    WebSocket 客户端 Fixture（异步）    复用会话级连接，用例结束后取消本用例的订阅并清空未读消息    """
+    client = ws_session_client
     test_logger.info("=" * 80)
-    test_logger.info("✅ WebSocket 连接成功")
+    test_logger.info("🔧 复用会话级 WebSocket 连接")
     test_logger.info("=" * 80)
+    test_logger.info(f"WebSocket URL: {Config.WS_URL}")
+    test_logger.info(f"超时设置: {Config.WS_TIMEOUT}秒")
+    # 会话连接已断开且未能自动恢复时重新连接
+    if not await client.is_connected():
+        test_logger.warning("⚠️  会话级连接不可用，重新连接...")
+        if not await client.connect():
+            test_logger.error("=" * 80)
+            test_logger.error("❌ WebSocket 连接失败")
+            test_logger.error("=" * 80)
+            test_logger.error("可能的原因:")
+            test_logger.error("1. 网络连接问题")
+            test_logger.error("2. WebSocket URL 不正确")
+            test_logger.error("3. 防火墙阻止连接")
+            test_logger.error("4. 服务器不可用")
+            test_logger.error("=" * 80)
+            test_logger.error(f"当前 URL: {Config.WS_URL}")
+            test_logger.error("=" * 80)
+            pytest.fail(f"WebSocket 连接失败，请检查配置和网络: {Config.WS_URL}")
     # 验证连接状态
     is_connected = await client.is_connected()
     test_logger.info(f"连接状态验证: {is_connected}")
     yield client
-    # 断开连接
+    test_logger.info(f"💓 心跳统计: {client.get_heartbeat_stats()}")
+    test_logger.info(f"📦 频道队列统计: {client.get_queue_stats()}")
+    test_logger.info(f"⏱️ 延迟统计: {client.get_latency_stats()}")
+    client.reset_latency_stats()
+    # 清理本用例的订阅，连接留给后续用例
     try:
         test_logger.info("=" * 80)
-        test_logger.info("正在断开 WebSocket 连接...")
-        await client.disconnect()
-        test_logger.info("✅ WebSocket 已断开")
+        test_logger.info("正在取消本用例的订阅...")
+        responses = await client.unsubscribe_all(timeout=10)
+        dropped = client.clear_inbox()
+        test_logger.info(f"✅ 已取消订阅: {list(responses)}，丢弃未读消息 {dropped} 条")
         test_logger.info("=" * 80)
     except Exception as e:
-        test_logger.error(f"❌ 断开连接时发生错误: {e}")
+        test_logger.error(f"❌ 清理订阅时发生错误: {e}")
 
 @pytest.fixture(scope="function")
 def ws_client_sync(test_logger):
@@ -435,6 +472,13 @@ def pytest_collection_modifyitems(config, items):
             #item.add_marker(pytest.mark.allure_label("feature", "Performance Tests"))
             item.add_marker(pytest.mark.allure_label(item.nodeid, label_type="feature", value="Performance Tests"))
 
+    # 预编译订单簿用例的 expected：执行阶段每帧只调用编译好的检查闭包
+    for item in items:
+        callspec = getattr(item, "callspec", None)
+        case_id = callspec.params.get("orderbook_case") if callspec else None
+        if isinstance(case_id, str) and case_id in TestDataLoader.ws.get_case_ids("orderbook"):
+            TestDataLoader.ws.get_compiled_checks(case_id, "orderbook")
+
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
@@ -0,0 +1,83 @@
+"""
+tests/test_async_api_client.py
+异步 API 客户端测试（本地 HTTP 服务，不访问交易所）
+"""
+import asyncio
+
+import allure
+import pytest
+from aiohttp import web
+
+from config.config import Config
+from utils.async_api_client import AsyncAPIClient
+
+
+@pytest.fixture
+async def candlestick_server(monkeypatch):
+    """本地模拟 K 线接口：按 instrument_name 返回，记录并发峰值和连接数"""
+    state = {"in_flight": 0, "peak": 0, "connections": set()}
+
+    async def handler(request):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        state["connections"].add(request.transport.get_extra_info("peername"))
+        await asyncio.sleep(0.02)
+        state["in_flight"] -= 1
+        return web.json_response({
+            "id": -1,
+            "method": "public/get-candlestick",
+            "code": 0,
+            "result": {"instrument_name": request.query["instrument_name"], "data": []}
+        })
+
+    app = web.Application()
+    app.router.add_get("/public/get-candlestick", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    monkeypatch.setattr(Config, "BASE_URL", f"http://127.0.0.1:{port}")
+    yield state
+    await runner.cleanup()
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("异步 API 客户端")
+class TestAsyncAPIClient:
+    """并发上限、结果顺序与连接复用"""
+
+    @allure.story("并发请求：结果结构与 APIClient 一致，顺序与参数一致")
+    async def test_concurrent_requests(self, candlestick_server):
+        client = AsyncAPIClient(max_concurrency=4)
+        params_list = [{"instrument_name": f"INST{i}-PERP", "timeframe": "1m", "count": 10} for i in range(20)]
+
+        try:
+            results = await client.get_multiple_candlesticks(params_list)
+        finally:
+            await client.close()
+
+        assert [r["response"]["result"]["instrument_name"] for r in results] == \
+               [p["instrument_name"] for p in params_list]
+        assert all(r["status_code"] == 200 for r in results)
+        assert {"response", "status_code", "response_time", "headers", "url", "request_params"} <= set(results[0])
+        assert "count=10" in results[0]["url"]
+        assert candlestick_server["peak"] == 4
+        assert len(candlestick_server["connections"]) <= 4
+
+    @allure.story("参数编码与 requests 一致")
+    def test_encode_params(self):
+        encoded = AsyncAPIClient._encode_params({"instrument_name": "BTCUSD-PERP", "count": 5, "end_ts": None})
+        assert encoded == [("instrument_name", "BTCUSD-PERP"), ("count", "5")]
+
+    @allure.story("连接失败返回 error")
+    async def test_connection_error(self, monkeypatch):
+        monkeypatch.setattr(Config, "BASE_URL", "http://127.0.0.1:9")
+        client = AsyncAPIClient()
+        try:
+            result = await client.get_candlestick({"instrument_name": "BTCUSD-PERP"})
+        finally:
+            await client.close()
+
+        assert "error" in result and "status_code" not in result
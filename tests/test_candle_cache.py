@@ -0,0 +1,103 @@
+"""
+tests/test_candle_cache.py
+K 线响应缓存测试（不访问交易所）
+"""
+import time
+
+import allure
+import pytest
+
+from utils.candle_cache import CandleCache
+
+
+HOUR_MS = 3_600_000
+
+
+def ok_result(instrument_name="BTCUSD-PERP", payload_size=0):
+    return {
+        "response": {"code": 0, "result": {"instrument_name": instrument_name, "data": [], "pad": "x" * payload_size}},
+        "status_code": 200,
+        "response_time": 120.0,
+        "headers": {},
+        "url": "https://api.crypto.com/exchange/v1/public/get-candlestick",
+        "request_params": {},
+    }
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CandleCache(path=str(tmp_path / "candles.sqlite3"), open_ttl=0.05)
+    yield cache
+    cache.close()
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("K线响应缓存")
+class TestCandleCache:
+    """已收盘窗口永久缓存、未收盘窗口 TTL、LRU 淘汰"""
+
+    @allure.story("判断窗口是否已收盘")
+    def test_is_closed_window(self):
+        now_ms = 10 * HOUR_MS + 1234
+        closed = {"timeframe": "1h", "end_ts": 10 * HOUR_MS - 1}
+        at_open = {"timeframe": "1h", "end_ts": 10 * HOUR_MS}
+        touches_now = {"timeframe": "1h", "end_ts": 10 * HOUR_MS + 1}
+
+        assert CandleCache.is_closed_window(closed, now_ms)
+        # end_ts 为闭区间端点：等于当前 K 线开盘时间时包含未收盘的 K 线
+        assert not CandleCache.is_closed_window(at_open, now_ms)
+        assert not CandleCache.is_closed_window(touches_now, now_ms)
+        assert not CandleCache.is_closed_window({"timeframe": "1h"}, now_ms)
+        assert not CandleCache.is_closed_window({"timeframe": "1M", "end_ts": 0}, now_ms)
+
+    @allure.story("已收盘窗口永久缓存，未收盘窗口过期")
+    def test_closed_window_persists_open_window_expires(self, cache):
+        closed = {"instrument_name": "BTCUSD-PERP", "timeframe": "1h", "count": 10, "start_ts": 0, "end_ts": HOUR_MS}
+        open_window = {"instrument_name": "BTCUSD-PERP", "timeframe": "1h", "count": 10}
+
+        assert cache.put(closed, ok_result())
+        assert cache.put(open_window, ok_result())
+        assert cache.get(open_window) is not None
+
+        time.sleep(0.06)
+        assert cache.get(open_window) is None
+        assert cache.get(closed)["response"]["code"] == 0
+
+    @allure.story("重新打开后仍可读取")
+    def test_persisted_on_disk(self, tmp_path):
+        path = str(tmp_path / "candles.sqlite3")
+        params = {"instrument_name": "ETHUSD-PERP", "timeframe": "1D", "end_ts": 86_400_000}
+
+        first = CandleCache(path=path)
+        first.put(params, ok_result("ETHUSD-PERP"))
+        first.close()
+
+        second = CandleCache(path=path)
+        assert second.get(params)["response"]["result"]["instrument_name"] == "ETHUSD-PERP"
+        second.close()
+
+    @allure.story("错误响应不缓存")
+    def test_error_response_not_cached(self, cache):
+        params = {"instrument_name": "INVALID", "timeframe": "1h", "end_ts": HOUR_MS}
+        error = ok_result()
+        error["response"]["code"] = 40003
+
+        assert not cache.put(params, error)
+        assert not cache.put(params, {"error": "Timeout"})
+        assert cache.get(params) is None
+
+    @allure.story("超出容量按 LRU 淘汰")
+    def test_lru_eviction(self, tmp_path):
+        cache = CandleCache(path=str(tmp_path / "lru.sqlite3"), max_bytes=3000)
+        windows = [{"instrument_name": f"INST{i}", "timeframe": "1h", "end_ts": HOUR_MS} for i in range(3)]
+
+        cache.put(windows[0], ok_result(payload_size=1000))
+        cache.put(windows[1], ok_result(payload_size=1000))
+        time.sleep(0.01)
+        cache.get(windows[0])  # windows[0] 最近访问，windows[1] 最久未访问
+        cache.put(windows[2], ok_result(payload_size=1000))
+
+        assert cache.get(windows[1]) is None
+        assert cache.get(windows[0]) is not None and cache.get(windows[2]) is not None
+        assert cache.stats["evictions"] == 1
+        cache.close()
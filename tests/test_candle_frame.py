@@ -0,0 +1,57 @@
+"""
+tests/test_candle_frame.py
+K 线列式存储测试（不访问交易所）
+"""
+import math
+
+import allure
+import pytest
+
+from utils.candle_frame import CandleFrame, np
+
+
+CANDLES = [
+    {"t": 1700000000000, "o": "100.5", "h": "101", "l": "99.5", "c": "100.8", "v": "12.5"},
+    {"t": 1700000060000, "o": "100.8", "h": "102", "l": "100", "c": "101.9", "v": "8"},
+    {"timestamp": 1700000120000, "open": "101.9", "high": "103", "low": "101", "close": "102", "volume": "0"},
+]
+
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(np is None, reason="NumPy 未安装"))]
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("K线列式存储")
+class TestCandleFrame:
+    """一次解析、别名解析、定长列"""
+
+    @allure.story("解析为定长列，个别行使用长字段名")
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_parse_columns(self, use_numpy):
+        frame = CandleFrame.from_candles(CANDLES, use_numpy=use_numpy)
+
+        assert len(frame) == 3
+        assert frame.uses_numpy == use_numpy
+        assert list(frame.t) == [1700000000000, 1700000060000, 1700000120000]
+        assert list(frame.c) == [100.8, 101.9, 102.0]
+        assert frame.nbytes == 3 * 48
+        assert frame.row(2) == {"t": 1700000120000, "o": 101.9, "h": 103.0, "l": 101.0, "c": 102.0, "v": 0.0}
+
+    @allure.story("从响应构建，长字段名响应")
+    def test_from_response_with_long_names(self):
+        long_names = [{"timestamp": 1, "open": "1", "high": "2", "low": "0.5", "close": "1.5", "volume": "3"}]
+        frame = CandleFrame.from_response({"response": {"code": 0, "result": {"data": long_names}}})
+
+        assert frame.to_candles() == [{"t": 1, "o": 1.0, "h": 2.0, "l": 0.5, "c": 1.5, "v": 3.0}]
+
+    @allure.story("缺失价格记为 NaN，缺失时间戳报错")
+    def test_missing_values(self):
+        frame = CandleFrame.from_candles([{"t": 1, "o": None, "h": "", "l": "1", "c": "1", "v": "1"}])
+        assert math.isnan(frame.o[0]) and math.isnan(frame.h[0])
+
+        with pytest.raises(ValueError, match="Candle 1: invalid timestamp"):
+            CandleFrame.from_candles([CANDLES[0], {"o": "1"}])
+
+    @allure.story("空数据")
+    def test_empty(self):
+        frame = CandleFrame.from_candles([])
+        assert len(frame) == 0 and frame.nbytes == 0
@@ -0,0 +1,126 @@
+"""
+tests/test_candle_paginator.py
+历史 K 线分页器测试（模拟接口，不访问交易所）
+"""
+import threading
+
+import allure
+import pytest
+
+from utils.candle_paginator import CandlePaginator
+
+
+MINUTE_MS = 60_000
+
+
+class FakeCandlestickClient:
+    """
+    按 start_ts / end_ts（闭区间）生成 1m K 线的模拟客户端
+
+    每个窗口额外多返回前一根 K 线（模拟边界重叠），fail_starts 中的窗口返回错误
+    """
+
+    def __init__(self, fail_starts=(), mutate=None):
+        self.fail_starts = set(fail_starts)
+        self.mutate = mutate
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get_candlestick(self, params):
+        with self._lock:
+            self.calls.append(params)
+        if params["start_ts"] in self.fail_starts:
+            return {"error": "Timeout", "response_time": 0, "request_params": params}
+
+        first = params["start_ts"] - MINUTE_MS
+        data = [
+            {"t": t, "o": "1", "h": "2", "l": "0.5", "c": "1.5", "v": "10"}
+            for t in range(first, params["end_ts"] + 1, MINUTE_MS)
+        ][:params["count"] + 1]
+        if self.mutate:
+            self.mutate(params, data)
+        return {
+            "response": {"code": 0, "result": {"instrument_name": params["instrument_name"], "data": data}},
+            "status_code": 200,
+            "response_time": 1.0,
+        }
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("历史 K 线分页")
+class TestCandlePaginator:
+    """窗口切分、拼接去重、断点续传"""
+
+    @allure.story("按周期对齐切分窗口")
+    def test_plan_windows(self):
+        paginator = CandlePaginator(FakeCandlestickClient(), window_count=300)
+        start = 1_700_000_000_000 + 12_345  # 非整分钟
+        windows = paginator.plan_windows("1m", start, start + 1000 * MINUTE_MS)
+
+        assert windows[0][0] % MINUTE_MS == 0
+        assert len(windows) == 4
+        assert all(end - begin == 300 * MINUTE_MS - 1 for begin, end in windows[:-1])
+        assert windows[-1][1] == start + 1000 * MINUTE_MS - 1
+
+    @allure.story("并发抓取、去重后整段连续")
+    def test_fetch_merges_and_dedups(self):
+        client = FakeCandlestickClient()
+        paginator = CandlePaginator(client, max_workers=4)
+        start = 1_700_000_000_000 - 1_700_000_000_000 % MINUTE_MS
+        end = start + 2000 * MINUTE_MS
+
+        result = paginator.fetch("BTCUSD-PERP", "1m", start, end)
+
+        timestamps = [candle["t"] for candle in result["data"]]
+        assert timestamps == list(range(start, end, MINUTE_MS))
+        assert result["complete"] and result["windows"] == 7 == len(client.calls)
+        assert result["duplicates_removed"] == 6 and result["window_duplicates"] == 0
+        paginator.validate(result, "1m")
+
+    @allure.story("窗口响应内重复与无效时间戳：跳过计数，校验失败")
+    def test_window_duplicates_and_invalid_timestamps(self):
+        start = 1_700_000_000_000 - 1_700_000_000_000 % MINUTE_MS
+        end = start + 600 * MINUTE_MS
+
+        def mutate(params, data):
+            if params["start_ts"] == start:
+                data.append(dict(data[-1]))
+                data.append({"o": "1", "h": "2", "l": "0.5", "c": "1.5", "v": "10"})
+
+        paginator = CandlePaginator(FakeCandlestickClient(mutate=mutate))
+        result = paginator.fetch("BTCUSD-PERP", "1m", start, end)
+
+        assert result["complete"] and len(result["data"]) == 600
+        assert result["window_duplicates"] == 1 and result["invalid_candles"] == 1
+        with pytest.raises(AssertionError, match="within window responses"):
+            paginator.validate(result, "1m")
+
+    @allure.story("失败后从断点续传，只重抓失败窗口")
+    def test_resume_from_checkpoint(self, tmp_path):
+        checkpoint = tmp_path / "checkpoint.json"
+        start = 1_700_000_000_000 - 1_700_000_000_000 % MINUTE_MS
+        end = start + 900 * MINUTE_MS
+        failing_window = start + 300 * MINUTE_MS
+
+        first = CandlePaginator(FakeCandlestickClient(fail_starts=[failing_window]), checkpoint_path=str(checkpoint))
+        partial = first.fetch("BTCUSD-PERP", "1m", start, end)
+
+        assert not partial["complete"] and checkpoint.exists()
+        assert partial["failed_windows"][0]["start_ts"] == failing_window
+        with pytest.raises(AssertionError, match="抓取失败的窗口"):
+            first.validate(partial, "1m")
+
+        retry_client = FakeCandlestickClient()
+        resumed = CandlePaginator(retry_client, checkpoint_path=str(checkpoint)).fetch("BTCUSD-PERP", "1m", start, end)
+
+        assert [call["start_ts"] for call in retry_client.calls] == [failing_window]
+        assert resumed["complete"] and resumed["resumed"] == 2
+        assert len(resumed["data"]) == 900
+        assert not checkpoint.exists()
+
+    @allure.story("不支持的周期与窗口大小")
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            CandlePaginator(FakeCandlestickClient(), window_count=301)
+        with pytest.raises(ValueError, match="不支持分页的周期"):
+            CandlePaginator(FakeCandlestickClient()).plan_windows("1M", 0, 1)
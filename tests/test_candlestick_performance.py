@@ -45,7 +45,7 @@ class TestCandlestickPerformance:
         api_params = {"instrument_name": case['params']['instrument_name'],"timeframe": case['params']['timeframe'], "count": case['params']['count']    }
         # 执行单次请求并测量响应时间
         start_time = time.time()
-        response = api_client.get_candlestick(params=api_params)
+        response = api_client.get_candlestick(params=api_params, use_cache=False)
         response_time = (time.time() - start_time) * 1000  # 转换为毫秒
 
         # 获取实际的 API 响应数据
@@ -83,6 +83,7 @@ class TestCandlestickPerformance:
                 name="响应时间统计",
                 attachment_type=allure.attachment_type.TEXT
             )
+            TestHelpers.attach_timings(response, test_logger)
 
             # 验证响应时间性能指标
             assert response_time <= case['expected']['max_response_time'], \
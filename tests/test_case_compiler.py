@@ -0,0 +1,78 @@
+"""
+tests/test_case_compiler.py
+用例 expected 编译器测试（不连接交易所）
+"""
+import allure
+
+from data import OrderbookCases, TestDataLoader
+from utils.case_compiler import case_channels, compile_case, compile_expected
+
+
+def book_push(bids=None, asks=None, t=1, **result_fields):
+    result = {
+        "instrument_name": "BTCUSD-PERP",
+        "subscription": "book.BTCUSD-PERP.10",
+        "channel": "book",
+        "data": [{
+            "bids": [["100.0", "1", "1"]] if bids is None else bids,
+            "asks": [["101.0", "1", "1"]] if asks is None else asks,
+            "t": t,
+        }],
+    }
+    result.update(result_fields)
+    return {"method": "subscribe", "code": 0, "result": result}
+
+
+@allure.epic("Crypto API WebSocket 测试")
+@allure.feature("订单簿")
+@allure.story("用例 expected 编译")
+class TestCaseCompiler:
+    """expected 声明 → 逐帧检查闭包"""
+
+    def test_valid_push_passes_every_case(self):
+        for case_id in OrderbookCases.CASES:
+            for check in TestDataLoader.ws.get_compiled_checks(case_id).values():
+                assert check(book_push()) == []
+
+    def test_required_and_data_fields(self):
+        check = compile_expected(OrderbookCases.CASES["TC_BOOK_001"]["expected"], expected_depth=10)
+        message = book_push()
+        del message["result"]["channel"]
+        del message["result"]["data"][0]["t"]
+
+        failures = check(message)
+
+        assert ("missing_field", "result 缺少 channel 字段") in failures
+        assert ("missing_data_field", "data[0] 缺少 t 字段") in failures
+
+    def test_min_levels_and_book_content(self):
+        check = compile_expected({"data_fields": ["bids", "asks", "t"], "min_bids": 2, "min_asks": 1})
+
+        failures = dict(check(book_push(asks=[["99.0", "1", "1"]])))
+
+        assert "too_few_bids" in failures and "crossed" in failures
+
+    def test_non_dict_data_items_reported(self):
+        check = compile_expected({"data_fields": ["bids", "asks", "t"], "min_bids": 1})
+        message = book_push()
+        message["result"]["data"] = [None]
+
+        failures = check(message)
+
+        assert failures == [
+            ("malformed", "data[0] 应该是字典，实际: NoneType"),
+            ("too_few_bids", "data[0] 买单档位数 0 < 1"),
+        ]
+
+    def test_no_declared_checks(self):
+        check = compile_expected({"subscription_success": False, "error_code": 40003})
+        assert check(book_push(bids=[], asks=[])) == []
+        assert check({"code": 0}) == [("malformed", "推送消息缺少 result 字段")]
+
+    def test_channels_and_cache(self):
+        case = OrderbookCases.CASES["TC_BOOK_005"]
+        assert case_channels(case) == {"book.BTCUSD-PERP.10": 10, "book.ETHUSD-PERP.10": 10}
+        assert set(compile_case(case)) == set(case_channels(case))
+
+        first = TestDataLoader.ws.get_compiled_checks("TC_BOOK_005")
+        assert TestDataLoader.ws.get_compiled_checks("TC_BOOK_005") is first
@@ -0,0 +1,123 @@
+"""
+tests/test_fused_validator.py
+融合 K 线验证器测试：一次遍历的结果与单项验证器一致（不访问交易所）
+"""
+import allure
+import pytest
+
+from utils.fused_validator import FusedCandlestickValidator
+from utils.test_helpers import TestHelpers
+from utils.validators import CandlestickValidator, DataCompletenessValidator
+
+
+CANDLESTICK_PARAMS = {"min_price": 90, "max_price": 110, "expected_interval": 60000, "tolerance": 1000}
+COMPLETENESS_PARAMS = {
+    "required_fields": TestHelpers.get_standard_candlestick_fields(),
+    "check_null_values": True,
+    "check_duplicate_timestamps": True,
+    "check_consistency": True,
+}
+
+
+def make_candles(count=20, interval=60000):
+    return [
+        {"t": 1700000000000 + i * interval, "o": "100", "h": "102", "l": "99", "c": "101", "v": "5"}
+        for i in range(count)
+    ]
+
+
+def error_message(func, *args, **kwargs):
+    with pytest.raises(AssertionError) as exc_info:
+        func(*args, **kwargs)
+    return str(exc_info.value)
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("融合 K线验证")
+class TestFusedCandlestickValidator:
+    """一次遍历、收集全部违规、单个附件"""
+
+    @allure.story("合法数据通过")
+    def test_valid_data_passes(self):
+        result = TestHelpers.fused_validation(
+            make_candles(), candlestick_params=CANDLESTICK_PARAMS, completeness_params=COMPLETENESS_PARAMS
+        )
+
+        assert result.passed
+        assert result.checks == [
+            "structure", "price_logic", "timestamps_order", "price_range", "time_interval",
+            "missing_fields", "null_values", "duplicate_timestamps", "consistency", "bad_value",
+        ]
+        assert result.metrics == {"order": "ascending", "interval_consistency_rate": 100.0}
+
+    @allure.story("收集全部违规，断言信息与单项验证器一致")
+    def test_collects_all_violations(self):
+        candles = make_candles()
+        candles[3]["h"] = "98"      # high < open / close / low
+        candles[8]["c"] = "150"     # 超出价格范围，同时 high < close
+        candles[12]["t"] = candles[11]["t"]
+
+        result = FusedCandlestickValidator.validate(candles, **CANDLESTICK_PARAMS, **COMPLETENESS_PARAMS)
+
+        assert not result.passed
+        assert result.failed_checks() == {"price_logic": 4, "price_range": 1, "duplicate_timestamps": 1}
+
+        for check, single in (
+            ("price_logic", lambda: CandlestickValidator.validate_price_logic(candles)),
+            ("price_range", lambda: CandlestickValidator.validate_price_range(candles, 90, 110)),
+            ("duplicate_timestamps", lambda: DataCompletenessValidator.validate_no_duplicate_timestamps(candles)),
+        ):
+            assert result.first_violation(check)["message"] == error_message(single)
+
+        message = error_message(result.assert_passed)
+        assert message.splitlines()[0] == "Candle 3: high (98.0) should >= open (100.0)"
+        assert "Found 1 duplicate timestamps" in message
+
+    @allure.story("缺失字段与空值按数量汇总")
+    def test_missing_and_null_summary(self):
+        candles = make_candles(count=5)
+        del candles[2]["v"]
+        candles[4]["o"] = None
+
+        result = FusedCandlestickValidator.validate(
+            candles, required_fields=COMPLETENESS_PARAMS["required_fields"], check_price_logic=False
+        )
+
+        message = error_message(result.assert_passed)
+        assert "Found 1 missing fields in data" in message
+        assert "Found 1 null values in data" in message
+        assert result.first_violation("consistency")["index"] == 2
+
+    @allure.story("未提供的参数组对应的检查不执行")
+    def test_disabled_groups(self):
+        candles = make_candles(count=5)
+        candles[1]["h"] = "1"
+
+        result = TestHelpers.fused_validation(candles, completeness_params=COMPLETENESS_PARAMS)
+        assert result.passed
+        assert "price_logic" not in result.checks
+
+    @allure.story("无法解析的时间戳与收盘价记为违规")
+    def test_unparseable_values_fail(self):
+        candles = make_candles(count=5)
+        candles[1]["t"] = "not-a-timestamp"
+        candles[3]["c"] = "abc"
+
+        result = FusedCandlestickValidator.validate(candles, min_price=90, max_price=110, check_price_logic=False)
+
+        assert not result.passed
+        assert result.failed_checks() == {"bad_value": 2}
+        assert [v["index"] for v in result.violations] == [1, 3]
+        assert result.first_violation("bad_value")["message"] == "Candle 1: invalid timestamp 'not-a-timestamp'"
+        assert "Candle 3: invalid close price 'abc'" in [v["message"] for v in result.violations]
+        with pytest.raises(AssertionError, match="invalid timestamp"):
+            result.assert_passed()
+
+        # 价格逻辑检查开启时，无效收盘价记在 price_logic 中
+        with_logic = FusedCandlestickValidator.validate(candles, min_price=90, max_price=110)
+        assert with_logic.failed_checks() == {"price_logic": 1, "bad_value": 1}
+
+    @allure.story("数据数量")
+    def test_data_count(self):
+        result = FusedCandlestickValidator.validate(make_candles(count=5), exact_count=3)
+        assert result.first_violation("data_count")["message"] == "Data count should = 3, got 5"
@@ -0,0 +1,136 @@
+"""
+tests/test_http_adapter.py
+连接池与重试测试（本地 HTTP 服务，不访问交易所）
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import allure
+import pytest
+
+from config.config import Config
+from utils.api_client import APIClient
+from utils.candle_cache import CandleCache
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """按 server.script 依次返回状态码（用完后返回 200），记录请求次数"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.hits += 1
+        status, headers = self.server.script.pop(0) if self.server.script else (200, {})
+        body = json.dumps({"code": 0 if status == 200 else status, "result": {"data": []}}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+    server.hits = 0
+    server.script = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(Config, "BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(Config, "RETRY_BACKOFF_FACTOR", 0)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(flaky_server):
+    client = APIClient()
+    yield client
+    client.close()
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("连接池与重试")
+class TestHTTPAdapter:
+    """只在连接层重试瞬时错误"""
+
+    @allure.story("5xx 重试后成功，重试次数写入结果")
+    def test_retry_on_5xx(self, flaky_server, client):
+        flaky_server.script = [(503, {}), (502, {})]
+
+        result = client.get_candlestick({"instrument_name": "BTCUSD-PERP", "timeframe": "1m"})
+
+        assert result["status_code"] == 200
+        assert result["retries"] == 2
+        assert flaky_server.hits == 3
+
+    @allure.story("429 按 Retry-After 重试")
+    def test_retry_on_429_with_retry_after(self, flaky_server, client):
+        flaky_server.script = [(429, {"Retry-After": "0"})]
+
+        result = client.get_candlestick({"instrument_name": "BTCUSD-PERP"})
+
+        assert result["status_code"] == 200
+        assert result["retries"] == 1
+
+    @allure.story("4xx 不重试")
+    def test_no_retry_on_client_error(self, flaky_server, client):
+        flaky_server.script = [(400, {})]
+
+        result = client.get_candlestick({"instrument_name": "INVALID"})
+
+        assert result["status_code"] == 400
+        assert result["retries"] == 0
+        assert flaky_server.hits == 1
+
+    @allure.story("重试耗尽后返回最后一次响应")
+    def test_retries_exhausted(self, flaky_server, client):
+        flaky_server.script = [(500, {})] * (Config.MAX_RETRIES + 1)
+
+        result = client.get_candlestick({"instrument_name": "BTCUSD-PERP"})
+
+        assert result["status_code"] == 500
+        assert result["retries"] == Config.MAX_RETRIES
+        assert flaky_server.hits == Config.MAX_RETRIES + 1
+
+    @allure.story("keep-alive 复用连接")
+    def test_connection_reused(self, flaky_server, client):
+        for _ in range(3):
+            client.get_candlestick({"instrument_name": "BTCUSD-PERP"})
+
+        pool = client.session.get_adapter(Config.BASE_URL).poolmanager.connection_from_url(Config.BASE_URL)
+        assert pool.num_connections == 1
+
+    @allure.story("已收盘窗口命中缓存，不再发请求")
+    def test_cache_hit_skips_network(self, flaky_server, tmp_path):
+        client = APIClient(cache=CandleCache(path=str(tmp_path / "candles.sqlite3")))
+        params = {"instrument_name": "BTCUSD-PERP", "timeframe": "1h", "count": 5, "end_ts": 3_600_000}
+
+        try:
+            first = client.get_candlestick(params)
+            second = client.get_candlestick(params)
+            uncached = client.get_candlestick(params, use_cache=False)
+        finally:
+            client.close()
+
+        assert not first["from_cache"] and second["from_cache"] and not uncached["from_cache"]
+        assert second["response"] == first["response"]
+        assert flaky_server.hits == 2
+
+    @allure.story("分阶段耗时：新连接含 connect，复用连接不含")
+    def test_phase_timings(self, flaky_server, client):
+        first = client.get_candlestick({"instrument_name": "BTCUSD-PERP"})
+        second = client.get_candlestick({"instrument_name": "BTCUSD-PERP"})
+
+        phases = {"connect_ms", "proxy_tunnel_ms", "tls_ms", "send_ms", "ttfb_ms", "transfer_ms", "decode_ms", "total_ms"}
+        assert phases <= set(first["timings"])
+        assert not first["timings"]["reused_connection"] and first["timings"]["connect_ms"] > 0
+        assert second["timings"]["reused_connection"] and second["timings"]["connect_ms"] == 0
+        assert second["timings"]["ttfb_ms"] > 0
+        assert first["timings"]["total_ms"] >= first["timings"]["ttfb_ms"]
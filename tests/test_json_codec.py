@@ -0,0 +1,43 @@
+"""
+tests/test_json_codec.py
+JSON 编解码器测试（不访问交易所）
+"""
+import allure
+import pytest
+
+from utils import json_codec
+
+
+BOOK_FRAME = (
+    '{"id":-1,"method":"subscribe","code":0,"result":{"instrument_name":"BTCUSD-PERP",'
+    '"subscription":"book.BTCUSD-PERP.10","channel":"book","depth":10,'
+    '"data":[{"bids":[["100.0","1","1"]],"asks":[["101.0","1","1"]],"t":1,"u":7}]}}'
+)
+
+
+@allure.epic("Crypto API 工具")
+@allure.feature("JSON 编解码器")
+class TestJsonCodec:
+    """各实现的解析结果必须与标准库一致"""
+
+    @allure.story("各实现解析结果一致")
+    @pytest.mark.parametrize("name", json_codec.available_backends())
+    def test_backends_agree_with_stdlib(self, name):
+        codec = json_codec.get_codec(name)
+        expected = json_codec.get_codec("json").loads(BOOK_FRAME)
+
+        assert codec.loads(BOOK_FRAME) == expected
+        assert codec.loads(BOOK_FRAME.encode("utf-8")) == expected
+        assert isinstance(codec.dumps(expected), str)
+        assert codec.loads(codec.dumps(expected)) == expected
+
+    @allure.story("解析失败抛出 DecodeError")
+    @pytest.mark.parametrize("name", json_codec.available_backends())
+    def test_invalid_json_raises_decode_error(self, name):
+        with pytest.raises(json_codec.DecodeError):
+            json_codec.get_codec(name).loads("{not json")
+
+    @allure.story("未安装的实现")
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="未安装"):
+            json_codec.get_codec("no-such-codec")
@@ -0,0 +1,40 @@
+"""
+tests/test_latency.py
+延迟直方图测试（不访问交易所）
+"""
+import allure
+import pytest
+
+from utils.latency import LatencyHistogram
+
+
+@allure.epic("Crypto API WebSocket 测试")
+@allure.feature("延迟统计")
+class TestLatencyHistogram:
+    """固定内存分位数估计"""
+
+    @allure.story("分位数相对误差约 1%")
+    def test_percentiles_within_precision(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 10001):
+            histogram.record(value / 10)  # 0.1ms ~ 1000ms 均匀分布
+
+        summary = histogram.summary()
+        assert summary["count"] == 10000
+        assert summary["p50"] == pytest.approx(500, rel=0.01)
+        assert summary["p99"] == pytest.approx(990, rel=0.01)
+        assert summary["p999"] == pytest.approx(999, rel=0.01)
+        assert summary["max"] == 1000
+
+    @allure.story("负值（本地时钟偏慢）与超出上限")
+    def test_underflow_and_overflow(self):
+        histogram = LatencyHistogram(max_value=1000)
+        histogram.record(-5)
+        histogram.record(50_000)
+
+        assert histogram.percentile(50) == -5
+        assert histogram.percentile(100) == 50_000
+
+    @allure.story("无样本")
+    def test_empty(self):
+        assert LatencyHistogram().summary()["p99"] is None
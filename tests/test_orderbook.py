@@ -171,4 +171,26 @@ class TestOrderbook:
             ws_client, test_logger, save_response, case, validator
         )
 
+    @allure.story("快照 + 增量订阅 - 本地重建订单簿")
+    @allure.severity(allure.severity_level.NORMAL)
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("orderbook_case", ["TC_BOOK_008"], indirect=True)
+    async def test_book_008_snapshot_and_update(
+            self,
+            ws_client,
+            test_logger,
+            save_response,
+            orderbook_case,
+            validator):
+        """TC_BOOK_008: 快照 + 增量订阅 - 本地重建订单簿"""
 
+        case = orderbook_case
+
+        with allure.step(f"执行测试用例: {case['case_id']} - {case['description']}"):
+            test_logger.info(f"测试用例: {case['case_id']}")
+            test_logger.info(f"描述: {case['description']}")
+            test_logger.info(f"请求参数: {case['params']}")
+
+        await WebSocketTestHelper.execute_delta_book_test(
+            ws_client, test_logger, save_response, case, validator
+        )
@@ -0,0 +1,108 @@
+"""
+tests/test_orderbook_engine.py
+本地订单簿引擎测试（离线数据，不访问交易所）
+"""
+import allure
+import pytest
+
+from utils.orderbook import OrderBook
+
+
+def snapshot_message(bids, asks, u=100, t=1):
+    return {
+        "method": "subscribe",
+        "result": {
+            "instrument_name": "BTCUSD-PERP",
+            "subscription": "book.BTCUSD-PERP.50",
+            "channel": "book",
+            "depth": 50,
+            "data": [{"bids": bids, "asks": asks, "t": t, "u": u}]
+        }
+    }
+
+
+def update_message(bids, asks, u, pu, t=2):
+    return {
+        "method": "subscribe",
+        "result": {
+            "instrument_name": "BTCUSD-PERP",
+            "subscription": "book.BTCUSD-PERP.50",
+            "channel": "book.update",
+            "depth": 50,
+            "data": [{"update": {"bids": bids, "asks": asks}, "t": t, "u": u, "pu": pu}]
+        }
+    }
+
+
+@pytest.fixture
+def book():
+    book = OrderBook("BTCUSD-PERP", depth=50)
+    book.apply_message(snapshot_message(
+        bids=[["100.0", "1", "1"], ["99.5", "2", "1"], ["99.0", "3", "2"]],
+        asks=[["100.5", "1", "1"], ["101.0", "2", "1"]],
+    ))
+    return book
+
+
+@allure.epic("Crypto API WebSocket 测试")
+@allure.feature("本地订单簿引擎")
+@pytest.mark.orderbook
+class TestOrderBookEngine:
+    """快照 + 增量重建订单簿"""
+
+    @allure.story("快照初始化")
+    def test_snapshot_top_of_book(self, book):
+        assert book.best_bid() == (100.0, 1.0)
+        assert book.best_ask() == (100.5, 1.0)
+        assert book.spread() == 0.5
+        assert [level[0] for level in book.bids()] == ["100.0", "99.5", "99.0"]
+        assert not book.is_crossed()
+
+    @allure.story("增量: 新增、修改、删除价位")
+    def test_apply_update(self, book):
+        applied = book.apply_message(update_message(
+            bids=[["100.2", "4", "1"], ["100.0", "0", "0"], ["99.5", "5", "3"]],
+            asks=[["100.5", "0", "0"], ["100.8", "1", "1"]],
+            u=101, pu=100,
+        ))
+
+        assert applied
+        assert book.best_bid() == (100.2, 4.0)
+        assert book.best_ask() == (100.8, 1.0)
+        assert [level[0] for level in book.bids()] == ["100.2", "99.5", "99.0"]
+        assert book.bids(1)[0][1] == "4"
+        assert book.last_sequence == 101
+        assert book.stats["updates"] == 1
+
+    @allure.story("序列号不连续")
+    def test_sequence_gap_marks_unsynced(self, book):
+        applied = book.apply_message(update_message(bids=[["100.2", "1", "1"]], asks=[], u=105, pu=103))
+
+        assert not applied
+        assert not book.synced
+        assert book.stats["sequence_gaps"] == 1
+        assert book.best_bid() == (100.0, 1.0)
+
+        # 未同步期间的增量被跳过，直到下一次快照
+        assert not book.apply_message(update_message(bids=[], asks=[], u=106, pu=105))
+        assert book.stats["skipped_updates"] == 1
+        book.apply_message(snapshot_message([["98.0", "1", "1"]], [["98.5", "1", "1"]], u=200))
+        assert book.synced
+        assert book.apply_message(update_message(bids=[], asks=[], u=201, pu=200))
+
+    @allure.story("序列号不连续 - 严格模式")
+    def test_sequence_gap_strict(self):
+        book = OrderBook("BTCUSD-PERP", strict=True)
+        book.apply_message(snapshot_message([["100.0", "1", "1"]], [["101.0", "1", "1"]], u=1))
+
+        with pytest.raises(AssertionError, match="序列号不连续"):
+            book.apply_message(update_message(bids=[], asks=[], u=3, pu=2))
+
+    @allure.story("倒挂检测与快照导出")
+    def test_crossed_book_and_export(self, book):
+        book.apply_message(update_message(bids=[["100.6", "1", "1"]], asks=[], u=101, pu=100))
+
+        assert book.is_crossed()
+        snapshot = book.to_snapshot()
+        assert snapshot["bids"][0][0] == "100.6"
+        assert snapshot["u"] == 101
@@ -0,0 +1,85 @@
+"""
+tests/test_orderbook_validator.py
+快速订单簿验证器测试（不连接交易所）
+"""
+import allure
+import pytest
+
+from utils.orderbook_validator import FastOrderBookValidator
+
+
+def make_book(depth=150, mid=50000.0, tick=0.5):
+    """深度为 depth 的合法订单簿（Crypto.com 三元素档位）"""
+    return {
+        "bids": [[str(mid - tick * (i + 1)), "0.25", "3"] for i in range(depth)],
+        "asks": [[str(mid + tick * (i + 1)), "0.5", "1"] for i in range(depth)],
+        "t": 1700000000000,
+    }
+
+
+def make_push(book, depth=150):
+    return {
+        "method": "subscribe",
+        "code": 0,
+        "result": {"instrument_name": "BTCUSD-PERP", "subscription": f"book.BTCUSD-PERP.{depth}",
+                   "channel": "book", "depth": depth, "data": [book]},
+    }
+
+
+def swap(levels, index):
+    levels[index], levels[index + 1] = levels[index + 1], levels[index]
+
+
+@allure.epic("Crypto API WebSocket 测试")
+@allure.feature("订单簿")
+@allure.story("快速订单簿验证")
+class TestFastOrderBookValidator:
+    """一次解析、向量化检查、计数器"""
+
+    def test_valid_depth_150_push(self):
+        validator = FastOrderBookValidator(expected_depth=150)
+
+        for _ in range(3):
+            assert validator.validate(make_push(make_book()))
+
+        assert validator.get_stats() == {"books": 3, "levels": 900, "failed_books": 0, "failures": {}}
+
+    def test_two_element_levels(self):
+        book = {"bids": [[100, 1], [99, 2]], "asks": [[101, 1], [102, 3]], "t": 1}
+        assert FastOrderBookValidator().check(book) == []
+
+    @pytest.mark.parametrize("mutate, failure", [
+        (lambda book: swap(book["bids"], 2), "bids_unsorted"),
+        (lambda book: book["asks"].reverse(), "asks_unsorted"),
+        (lambda book: book["bids"].insert(0, ["60000", "1", "1"]), "crossed"),
+        (lambda book: book["asks"][5].__setitem__(1, "0"), "non_positive"),
+        (lambda book: book["asks"].__setitem__(7, ["abc", "1", "1"]), "bad_level"),
+        (lambda book: book["bids"].__setitem__(7, ["1"]), "bad_level"),
+        (lambda book: book.__setitem__("asks", []), "empty_side"),
+        (lambda book: book.__setitem__("t", None), "bad_timestamp"),
+    ])
+    def test_failures_are_counted(self, mutate, failure):
+        book = make_book(depth=20)
+        mutate(book)
+        validator = FastOrderBookValidator()
+
+        failures = validator.check(make_push(book))
+
+        assert failure in [name for name, _ in failures]
+        assert validator.get_stats()["failures"][failure] == 1
+        assert validator.get_stats()["failed_books"] == 1
+        with pytest.raises(AssertionError, match=r"订单簿验证失败 \["):
+            validator.validate(book)
+
+    def test_unsorted_reports_first_position(self):
+        book = make_book(depth=10)
+        swap(book["asks"], 6)
+
+        failures = FastOrderBookValidator().check(book)
+
+        assert failures == [("asks_unsorted", "卖单价格应该升序排列（位置 6: 50004.0, 位置 7: 50003.5）")]
+
+    def test_depth_exceeded(self):
+        validator = FastOrderBookValidator(expected_depth=10)
+        failures = validator.check(make_book(depth=11))
+        assert [name for name, _ in failures] == ["depth_exceeded", "depth_exceeded"]
@@ -0,0 +1,159 @@
+"""
+tests/test_rate_limiter.py
+令牌桶限流与并发批量请求测试（本地 HTTP 服务，不访问交易所）
+"""
+import asyncio
+import json
+import multiprocessing
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import allure
+import pytest
+
+from config.config import Config
+from utils.api_client import APIClient
+from utils.rate_limiter import SharedTokenBucket, TokenBucket, get_rate_limiter
+
+
+class CandlestickHandler(BaseHTTPRequestHandler):
+    """按 instrument_name 返回的模拟 K 线接口，记录请求时间"""
+
+    def do_GET(self):
+        self.server.request_times.append(time.monotonic())
+        query = parse_qs(urlparse(self.path).query)
+        time.sleep(0.01)
+        body = json.dumps({
+            "id": -1,
+            "method": "public/get-candlestick",
+            "code": 0,
+            "result": {"instrument_name": query["instrument_name"][0], "data": []}
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def candlestick_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CandlestickHandler)
+    server.request_times = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(Config, "BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("令牌桶限流")
+class TestTokenBucket:
+    """速率控制"""
+
+    @allure.story("突发量之后按速率放行")
+    def test_paces_after_burst(self):
+        bucket = TokenBucket(rate=100, capacity=5)
+        start = time.monotonic()
+        for _ in range(25):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        # 5 个突发 + 20 个按 100/s 放行，约 0.2 秒
+        assert 0.18 <= elapsed < 0.5
+        assert bucket.stats["acquired"] == 25 and bucket.stats["waited"] == 20
+
+    @allure.story("协程与线程共用同一个桶")
+    async def test_async_and_threads_share_bucket(self):
+        bucket = TokenBucket(rate=200, capacity=1)
+        start = time.monotonic()
+
+        thread = threading.Thread(target=lambda: [bucket.acquire() for _ in range(10)])
+        thread.start()
+        await asyncio.gather(*(bucket.acquire_async() for _ in range(10)))
+        thread.join()
+
+        # 20 次共享 200/s 的速率，约 0.1 秒
+        assert time.monotonic() - start >= 0.09
+
+    @allure.story("非法速率")
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("K线数据接口")
+class TestMultipleCandlesticks:
+    """线程池批量请求"""
+
+    @allure.story("并发执行、按限流速率发出、结果顺序与参数一致")
+    def test_parallel_batch_in_order(self, candlestick_server):
+        client = APIClient()
+        client.rate_limiter = TokenBucket(rate=100, capacity=1)
+        params_list = [{"instrument_name": f"INST{i}-PERP", "timeframe": "1m"} for i in range(30)]
+
+        try:
+            results = client.get_multiple_candlesticks(params_list, max_workers=8)
+        finally:
+            client.close()
+
+        assert [r["response"]["result"]["instrument_name"] for r in results] == \
+               [p["instrument_name"] for p in params_list]
+        times = candlestick_server.request_times
+        # 30 个请求、100/s：约 0.29 秒发完，明显快于原来的串行 + 0.1 秒间隔
+        assert 0.25 <= times[-1] - times[0] < 1.5
+
+
+def _drain_shared_bucket(state_dir, count):
+    bucket = SharedTokenBucket("test:shared", rate=100, capacity=1, state_dir=state_dir)
+    for _ in range(count):
+        bucket.acquire()
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("令牌桶限流")
+class TestSharedTokenBucket:
+    """跨进程共享速率"""
+
+    @allure.story("多个进程合计不超过共享速率")
+    def test_processes_share_rate(self, tmp_path):
+        context = multiprocessing.get_context("spawn")
+        workers = [context.Process(target=_drain_shared_bucket, args=(str(tmp_path), 20)) for _ in range(3)]
+
+        start = time.monotonic()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+        elapsed = time.monotonic() - start
+
+        assert all(worker.exitcode == 0 for worker in workers)
+        # 3 个进程共 60 次，100/s 的共享速率至少需要约 0.59 秒（单独限流只需约 0.2 秒）
+        assert elapsed >= 0.55
+
+    @allure.story("同一进程内的线程同样串行")
+    def test_threads_share_file_bucket(self, tmp_path):
+        bucket = SharedTokenBucket("test:threads", rate=200, capacity=1, state_dir=str(tmp_path))
+        start = time.monotonic()
+        threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(10)]) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert time.monotonic() - start >= 0.14
+        bucket.close()
+
+    @allure.story("按键获取：REST 端点与 WS 方法")
+    def test_get_rate_limiter_keys(self):
+        assert get_rate_limiter("rest:candlestick") is get_rate_limiter("rest:candlestick")
+        assert get_rate_limiter("ws:subscribe") is not None
+        assert get_rate_limiter("ws:public/respond-heartbeat") is None
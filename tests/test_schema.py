@@ -0,0 +1,110 @@
+"""
+tests/test_schema.py
+结构校验编译器测试（不连接交易所）
+"""
+import allure
+import pytest
+
+from utils.schema import Field, SchemaError, compile_schema
+from utils.validators import ResponseValidator
+from utils.ws_validators import WebSocketValidator
+
+
+def book_push(**result_fields):
+    result = {
+        "instrument_name": "BTCUSD-PERP",
+        "subscription": "book.BTCUSD-PERP.10",
+        "channel": "book",
+        "depth": 10,
+        "data": [{"bids": [["100.0", "1", "1"]], "asks": [["101.0", "1", "1"]], "t": 1}],
+    }
+    result.update(result_fields)
+    return {"method": "subscribe", "code": 0, "result": result}
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("结构校验")
+@allure.story("结构校验编译")
+class TestCompileSchema:
+    """声明式结构 → 专用校验函数"""
+
+    SHAPE = {
+        "code": Field(int, equals=0),
+        "result": {
+            "data": Field([{"bids": [list], "t": (int, float)}], nonempty=True),
+            "note": Field(str, required=False),
+        },
+    }
+
+    def test_valid_value_passes(self):
+        validate = compile_schema(self.SHAPE)
+        assert validate({"code": 0, "result": {"data": [{"bids": [[1, 2]], "t": 1.5}]}}) is None
+        assert "def validate(value):" in validate.__schema_source__
+
+    @pytest.mark.parametrize("value, path, message", [
+        ([], "消息", "消息 应该是 字典（实际: list）"),
+        ({"result": {}}, "code", "缺少 code 字段"),
+        ({"code": 1, "result": {}}, "code", "code 应该是 0（实际: 1）"),
+        ({"code": 0, "result": {}}, "result.data", "result 缺少 data 字段"),
+        ({"code": 0, "result": {"data": []}}, "result.data", "result.data 不应为空"),
+        ({"code": 0, "result": {"data": [{"bids": [], "t": 1}, {"bids": [[1], {}], "t": 2}]}},
+         "result.data[1].bids[1]", "result.data[1].bids[1] 应该是 列表（实际: dict）"),
+        ({"code": 0, "result": {"data": [{"bids": [], "t": "1"}]}},
+         "result.data[0].t", "result.data[0].t 应该是 int 或 float（实际: str）"),
+        ({"code": 0, "result": {"data": [{"bids": []}], "note": 3}},
+         "result.data[0].t", "result.data[0] 缺少 t 字段"),
+    ])
+    def test_error_paths(self, value, path, message):
+        with pytest.raises(SchemaError) as exc_info:
+            compile_schema(self.SHAPE)(value)
+        assert str(exc_info.value) == message
+        assert exc_info.value.path == path
+
+    def test_optional_field_is_still_type_checked(self):
+        with pytest.raises(SchemaError, match="result.note 应该是 str"):
+            compile_schema(self.SHAPE)({"code": 0, "result": {"data": [{"bids": [], "t": 1}], "note": 3}})
+
+    def test_custom_messages(self):
+        validate = compile_schema(
+            {"data": Field(list, nonempty=True, message="no data", type_message="not a list",
+                           empty_message="empty")}
+        )
+        for value, message in [({}, "no data"), ({"data": {}}, "not a list"), ({"data": []}, "empty")]:
+            with pytest.raises(AssertionError, match=f"^{message}$"):
+                validate(value)
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("结构校验")
+@allure.story("验证器接入编译后的结构校验")
+class TestValidatorsOnSchema:
+    """validate_data_exists / validate_subscription_response / validate_book_push_message"""
+
+    def test_validate_data_exists_keeps_messages(self):
+        assert ResponseValidator.validate_data_exists({"result": {"data": [1]}}) == [1]
+        for response, message in [
+            ({}, "Response should contain 'result' field"),
+            ({"result": {}}, "Result should contain 'data' field"),
+            ({"result": {"data": {}}}, "Data should be a list"),
+            ({"result": {"data": []}}, "Data should not be empty"),
+        ]:
+            with pytest.raises(AssertionError, match=f"^{message}$"):
+                ResponseValidator.validate_data_exists(response)
+
+    def test_subscription_response(self):
+        validator = WebSocketValidator()
+        assert validator.validate_subscription_response({"id": 1, "method": "subscribe", "code": 0})
+        with pytest.raises(AssertionError, match="^缺少 code 字段$"):
+            validator.validate_subscription_response({"id": 1, "method": "subscribe"})
+        with pytest.raises(AssertionError, match="method 应该是 'subscribe'"):
+            validator.validate_subscription_response({"id": 1, "method": "public/heartbeat", "code": 0})
+
+    def test_book_push_message(self):
+        validator = WebSocketValidator()
+        assert validator.validate_book_push_message(book_push(), "book.BTCUSD-PERP.10", 10)
+        with pytest.raises(AssertionError, match=r"result.data\[0\].asks 应该是 列表"):
+            validator.validate_book_push_message(
+                book_push(data=[{"bids": [], "asks": None, "t": 1}]), "book.BTCUSD-PERP.10", 10
+            )
+        with pytest.raises(AssertionError, match="depth 不匹配"):
+            validator.validate_book_push_message(book_push(depth=50), "book.BTCUSD-PERP.10", 10)
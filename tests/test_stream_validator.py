@@ -0,0 +1,94 @@
+"""
+tests/test_stream_validator.py
+流式验证器测试：挂在模拟连接的读取路径上逐帧验证（不访问交易所）
+"""
+import allure
+import pytest
+
+from utils.stream_validator import StreamingValidator
+from utils.ws_client import WebSocketClient
+from tests.test_ws_client_stream import FakeWebSocket, book_push
+
+
+CHANNEL = "book.BTCUSD-PERP.10"
+
+
+def crossed_push(t):
+    message = book_push(CHANNEL, t=t)
+    message["result"]["data"][0]["bids"] = [["102.0", "1", "1"]]
+    return message
+
+
+@pytest.fixture
+async def fake_client():
+    client = WebSocketClient(ws_url="wss://fake", timeout=1)
+    fake = FakeWebSocket()
+    client._attach_socket(fake)
+    yield client, fake
+    await client.disconnect()
+
+
+@allure.epic("Crypto API WebSocket 测试")
+@allure.feature("WebSocket 客户端")
+@allure.story("流式验证")
+@pytest.mark.websocket
+class TestStreamingValidator:
+    """逐帧验证、累计计数、有限样本"""
+
+    async def test_validates_every_frame_without_consumer(self, fake_client):
+        client, fake = fake_client
+        client._register_channel(CHANNEL)
+        stream = StreamingValidator.for_orderbook(expected_depth=10, name=CHANNEL)
+        client.add_frame_listener(stream, CHANNEL)
+
+        for i in range(200):
+            fake.push(book_push(CHANNEL, t=i + 1))
+        frames = await stream.wait(frames=200, seconds=2)
+
+        assert frames == 200
+        stream.assert_clean(min_frames=200)
+        assert stream.get_stats()["violations"] == {}
+
+    async def test_counts_violations_with_bounded_samples(self, fake_client):
+        client, fake = fake_client
+        stream = StreamingValidator.for_orderbook(name=CHANNEL, sample_size=3)
+        client.add_frame_listener(stream, CHANNEL)
+        client._register_channel(CHANNEL)
+
+        fake.push({"id": 1, "method": "subscribe", "code": 0, "result": {"subscription": CHANNEL}})
+        for i in range(50):
+            fake.push(crossed_push(i + 1) if i % 5 == 0 else book_push(CHANNEL, t=i + 1))
+        await stream.wait(frames=50, seconds=2)
+
+        stats = stream.get_stats()
+        assert stats["frames"] == 50 and stats["skipped"] == 1
+        assert stats["failed_frames"] == 10 and stats["violations"] == {"crossed": 10}
+        assert [sample["frame"] for sample in stream.samples] == [1, 6, 11]
+
+        with pytest.raises(AssertionError, match=r"10/50 帧验证失败"):
+            stream.assert_clean()
+        stream.assert_clean(max_failure_rate=0.2)
+
+    def test_check_error_counts_as_violation(self):
+        def broken(message):
+            raise TypeError("boom")
+
+        stream = StreamingValidator(broken, name="broken", sample_size=1)
+        stream(book_push(CHANNEL))
+        stream(book_push(CHANNEL, t=2))
+
+        stats = stream.get_stats()
+        assert stats["frames"] == 2 and stats["failed_frames"] == 2
+        assert stats["violations"] == {"check_error": 2}
+        assert stream.samples[0]["failures"] == [("check_error", "检查函数出错: TypeError: boom")]
+        with pytest.raises(AssertionError, match="check_error"):
+            stream.assert_clean(min_frames=2)
+
+    async def test_wait_by_time(self):
+        stream = StreamingValidator(lambda message: [], name="idle")
+        assert await stream.wait(seconds=0.05) == 0
+
+        with pytest.raises(AssertionError, match="只验证了 0/1 帧"):
+            stream.assert_clean()
+        with pytest.raises(ValueError):
+            await stream.wait()
@@ -0,0 +1,112 @@
+"""
+tests/test_vector_validators.py
+向量化 K 线验证器测试：断言信息与逐条验证的原实现一致（不访问交易所）
+"""
+import allure
+import pytest
+
+from utils.candle_frame import CandleFrame, np
+from utils.validators import CandlestickValidator, DataCompletenessValidator
+from utils.vector_validators import VectorizedCandlestickValidator
+
+
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(np is None, reason="NumPy 未安装"))]
+
+
+def make_candles(count=50, interval=60000):
+    return [
+        {"t": 1700000000000 + i * interval, "o": "100", "h": "102", "l": "99", "c": "101", "v": "5"}
+        for i in range(count)
+    ]
+
+
+def error_message(func, *args, **kwargs):
+    with pytest.raises(AssertionError) as exc_info:
+        func(*args, **kwargs)
+    return str(exc_info.value)
+
+
+def assert_same_failure(name, candles, use_numpy, original=CandlestickValidator, **kwargs):
+    """原实现与向量化实现报告相同的错误信息"""
+    frame = CandleFrame.from_candles(candles, use_numpy=use_numpy)
+    expected = error_message(getattr(original, name), candles, **kwargs)
+    actual = error_message(getattr(VectorizedCandlestickValidator, name), frame, **kwargs)
+    assert actual == expected
+    return actual
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("向量化 K线验证")
+class TestVectorizedCandlestickValidator:
+    """与 CandlestickValidator / DataCompletenessValidator 的结果对比"""
+
+    @allure.story("合法数据全部通过")
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_valid_data_passes(self, use_numpy):
+        frame = CandleFrame.from_candles(make_candles(), use_numpy=use_numpy)
+
+        VectorizedCandlestickValidator.validate_price_logic(frame)
+        VectorizedCandlestickValidator.validate_timestamps_order(frame)
+        VectorizedCandlestickValidator.validate_time_interval(frame, expected_interval=60000)
+        VectorizedCandlestickValidator.validate_price_range(frame, min_price=100, max_price=101)
+        VectorizedCandlestickValidator.validate_no_duplicate_timestamps(frame)
+
+    @allure.story("价格逻辑：报告第一根违规 K 线及其第一项失败的检查")
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    @pytest.mark.parametrize("index, overrides", [
+        (0, {"h": "98"}),               # high < open，同时 high < low
+        (7, {"l": "101.5"}),            # low > open
+        (12, {"v": "-1"}),
+        (30, {"o": "-1", "l": "-2"}),   # 价格为负
+    ])
+    def test_price_logic_first_offender(self, use_numpy, index, overrides):
+        candles = make_candles()
+        candles[index].update(overrides)
+        candles[40].update({"c": "103"})  # 更靠后的违规不应被报告
+
+        message = assert_same_failure("validate_price_logic", candles, use_numpy)
+        assert message.startswith(f"Candle {index}:")
+
+    @allure.story("时间戳顺序")
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_timestamps_order(self, use_numpy):
+        candles = make_candles()
+        descending = CandleFrame.from_candles(list(reversed(candles)), use_numpy=use_numpy)
+        VectorizedCandlestickValidator.validate_timestamps_order(descending)
+
+        candles[10], candles[11] = candles[11], candles[10]
+        assert_same_failure("validate_timestamps_order", candles, use_numpy)
+
+    @allure.story("时间间隔一致率")
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_time_interval(self, use_numpy):
+        candles = make_candles(count=10)
+        for index in (3, 6):
+            candles[index]["t"] += 30000  # 各影响前后两个间隔
+
+        message = assert_same_failure("validate_time_interval", candles, use_numpy, expected_interval=60000)
+        assert message == "Time interval consistency rate 55.6% < 80%"
+
+    @allure.story("价格范围：报告第一根超出范围的 K 线")
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_price_range(self, use_numpy):
+        candles = make_candles()
+        candles[20]["c"] = "150"
+        candles[25]["c"] = "50"
+        message = assert_same_failure("validate_price_range", candles, use_numpy, min_price=90, max_price=110)
+        assert message == "Candle 20: price 150.0 > max 110"
+
+        candles[3]["c"] = "10"
+        assert_same_failure("validate_price_range", candles, use_numpy, min_price=90, max_price=110)
+
+    @allure.story("重复时间戳计数")
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_duplicate_timestamps(self, use_numpy):
+        candles = make_candles()
+        candles[5]["t"] = candles[4]["t"]
+        candles[9]["t"] = candles[4]["t"]
+
+        message = assert_same_failure(
+            "validate_no_duplicate_timestamps", candles, use_numpy, original=DataCompletenessValidator
+        )
+        assert message == "Found 2 duplicate timestamps"
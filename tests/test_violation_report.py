@@ -0,0 +1,173 @@
+"""
+tests/test_violation_report.py
+违规汇总报告与验证器收集模式测试（不连接交易所）
+"""
+import allure
+import pytest
+
+from utils.validators import CandlestickValidator, DataCompletenessValidator
+from utils.violation_report import ViolationReport
+from utils.ws_validators import WebSocketValidator
+
+
+def make_candles(count=20, start=1700000000000, interval=60000):
+    return [
+        {"t": start + i * interval, "o": "100", "h": "101", "l": "99", "c": "100.5", "v": "1"}
+        for i in range(count)
+    ]
+
+
+def make_levels(side, depth=5, mid=100.0):
+    sign = -1 if side == "bids" else 1
+    return [[str(mid + sign * (i + 1)), "1"] for i in range(depth)]
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("违规汇总")
+@allure.story("ViolationReport")
+class TestViolationReport:
+    """按规则计数、前 K 个位置、蓄水池抽样"""
+
+    def test_counts_first_k_and_sample(self):
+        report = ViolationReport("demo", first_k=3, sample_size=5, seed=1)
+        for i in range(100):
+            report.record("odd" if i % 2 else "even", i, f"item {i}")
+
+        result = report.to_dict()
+
+        assert result["total"] == 100 and not result["passed"]
+        assert result["counts"] == {"even": 50, "odd": 50}
+        assert result["first_indices"] == {"even": [0, 2, 4], "odd": [1, 3, 5]}
+        assert result["first_messages"] == {"even": "item 0", "odd": "item 1"}
+        assert len(result["sample"]) == 5
+        assert len({entry["index"] for entry in result["sample"]}) == 5
+
+    def test_reservoir_is_not_just_the_head(self):
+        report = ViolationReport(sample_size=10, seed=7)
+        for i in range(10000):
+            report.record("rule", i, "x")
+        assert max(entry["index"] for entry in report.sample) >= 10
+
+    def test_assert_clean(self):
+        report = ViolationReport("clean")
+        report.assert_clean()
+
+        report.record("gap", 3, "Candle 3: gap")
+        with pytest.raises(AssertionError, match=r"\[clean\] 共 1 处违规: gap x1 \(首个 3: Candle 3: gap\)"):
+            report.assert_clean()
+
+
+@allure.epic("Crypto API 测试")
+@allure.feature("违规汇总")
+@allure.story("K线验证器收集模式")
+class TestCandleCollectMode:
+    """收集模式记录全部违规；不传 report 时行为不变"""
+
+    def test_fail_fast_unchanged(self):
+        data = make_candles()
+        data[4]["h"] = "98"
+        data[9]["h"] = "98"
+        with pytest.raises(AssertionError, match=r"^Candle 4: high \(98.0\) should >= open \(100.0\)$"):
+            CandlestickValidator.validate_price_logic(data)
+
+    def test_price_logic_collects_every_candle(self):
+        data = make_candles()
+        for i in (4, 9, 15):
+            data[i]["h"] = "98"
+        data[12]["c"] = None
+        report = ViolationReport("candles")
+
+        CandlestickValidator.validate_price_logic(data, report=report)
+        CandlestickValidator.validate_price_range(data, min_price=50, max_price=100.2, report=report)
+
+        assert report.first_indices["high_below_open"] == [4, 9, 15]
+        assert report.counts["high_below_close"] == 3
+        assert report.counts["bad_value"] == 2
+        assert report.counts["price_above_max"] == 19
+
+    def test_timestamp_rules(self):
+        data = make_candles()
+        data[5]["t"], data[6]["t"] = data[6]["t"], data[5]["t"]
+        data[11]["t"] = data[10]["t"]
+        data[14]["t"] = None
+        report = ViolationReport("timestamps")
+
+        CandlestickValidator.validate_timestamps_order(data, report=report)
+        DataCompletenessValidator.validate_no_duplicate_timestamps(data, report=report)
+
+        assert report.first_indices["timestamps_unordered"] == [6]
+        assert report.first_indices["duplicate_timestamp"] == [11]
+        assert report.counts["bad_timestamp"] == 2
+
+    def test_interval_rules_only_record_when_rate_fails(self):
+        data = make_candles(count=11)
+        report = ViolationReport("interval")
+        data[3]["t"] += 30000
+        CandlestickValidator.validate_time_interval(data, expected_interval=60000, report=report)
+        assert report.passed
+
+        for i in range(4, 8):
+            data[i]["t"] += 30000 * (i % 2)
+        CandlestickValidator.validate_time_interval(data, expected_interval=60000, report=report)
+        DataCompletenessValidator.validate_continuous_data(data, expected_interval=60000, report=report)
+
+        assert report.counts["interval_mismatch"] == report.counts["gap"] == 6
+        assert report.first_indices["gap"] == [2, 3, 4, 5, 6, 7]
+
+    def test_completeness_rules(self):
+        data = make_candles(count=5)
+        del data[1]["o"]
+        data[3]["v"] = None
+        data[4]["extra"] = 1
+        report = ViolationReport("completeness")
+
+        DataCompletenessValidator.validate_no_missing_fields(data, [("o", "open"), ("t", "timestamp")], report=report)
+        DataCompletenessValidator.validate_no_null_values(data, report=report)
+        DataCompletenessValidator.validate_data_consistency(data, report=report)
+        CandlestickValidator.validate_data_count(data, max_count=3, report=report)
+
+        assert report.counts == {"missing_field": 1, "null_value": 1, "inconsistent_fields": 2, "count_exceeded": 1}
+        assert report.first_indices["inconsistent_fields"] == [1, 4]
+        assert report.first_indices["count_exceeded"] == [None]
+
+
+@allure.epic("Crypto API WebSocket 测试")
+@allure.feature("违规汇总")
+@allure.story("订单簿验证器收集模式")
+class TestOrderbookCollectMode:
+    """validate_orderbook_data(report=...)"""
+
+    def test_valid_book(self):
+        report = ViolationReport("book")
+        data = [{"bids": make_levels("bids"), "asks": make_levels("asks"), "t": 1}]
+        assert WebSocketValidator().validate_orderbook_data(data, expected_depth=5, report=report)
+        assert report.passed
+
+    def test_collects_levels_across_items(self):
+        bids = make_levels("bids")
+        bids[1], bids[2] = bids[2], bids[1]
+        asks = make_levels("asks")
+        asks[3] = ["abc", "1"]
+        asks[4][1] = "0"
+        data = [
+            {"bids": bids, "asks": asks, "t": 1},
+            {"bids": make_levels("bids"), "asks": make_levels("asks", mid=90.0), "t": 0},
+            {"bids": [], "asks": []},
+        ]
+        report = ViolationReport("book")
+
+        assert not WebSocketValidator().validate_orderbook_data(data, expected_depth=4, report=report)
+
+        assert report.counts == {
+            "depth_exceeded": 4, "bad_level": 1, "non_positive": 1, "bids_unsorted": 1,
+            "crossed": 1, "bad_timestamp": 1, "missing_field": 1,
+        }
+        assert report.first_indices["bad_level"] == ["data[0].asks[3]"]
+        assert report.first_indices["bids_unsorted"] == ["data[0].bids[1]"]
+        assert report.first_messages["missing_field"] == "订单簿数据项 2 缺少 t (时间戳) 字段"
+
+    def test_fail_fast_unchanged(self):
+        bids = make_levels("bids")
+        bids[1], bids[2] = bids[2], bids[1]
+        with pytest.raises(AssertionError, match=r"^买单价格应该降序排列（位置 1: 97.0, 位置 2: 98.0）$"):
+            WebSocketValidator().validate_orderbook_data([{"bids": bids, "asks": make_levels("asks"), "t": 1}])
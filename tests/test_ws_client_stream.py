@@ -0,0 +1,447 @@
+"""
+tests/test_ws_client_stream.py
+WebSocketClient 后台读取与频道分发测试（使用本地模拟连接，不访问交易所）
+"""
+import asyncio
+import json
+import time
+
+import allure
+import pytest
+from websockets.exceptions import ConnectionClosedError
+
+from config.config import Config
+from utils.ws_client import WebSocketClient
+
+
+class FakeWebSocket:
+    """模拟 websockets 连接：recv 从队列取帧，send 记录发送内容"""
+
+    def __init__(self):
+        self.frames = asyncio.Queue()
+        self.sent = []
+        self.closed = False
+
+    def push(self, message):
+        self.frames.put_nowait(json.dumps(message))
+
+    def drop(self):
+        """模拟交易所主动断开"""
+        self.frames.put_nowait(None)
+
+    async def recv(self):
+        frame = await self.frames.get()
+        if frame is None:
+            self.closed = True
+            raise ConnectionClosedError(None, None)
+        return frame
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+    async def close(self):
+        self.closed = True
+
+
+def book_push(channel, t=1):
+    return {
+        "id": -1,
+        "method": "subscribe",
+        "code": 0,
+        "result": {
+            "instrument_name": channel.split(".")[1],
+            "subscription": channel,
+            "channel": "book",
+            "depth": 10,
+            "data": [{"bids": [["100.0", "1", "1"]], "asks": [["101.0", "1", "1"]], "t": t}]
+        }
+    }
+
+
+@pytest.fixture
+async def fake_client():
+    client = WebSocketClient(ws_url="wss://fake", timeout=1)
+    fake = FakeWebSocket()
+    client._attach_socket(fake)
+    yield client, fake
+    await client.disconnect()
+
+
+@allure.epic("Crypto API WebSocket 测试")
+@allure.feature("WebSocket 客户端")
+@pytest.mark.websocket
+class TestWebSocketClientStream:
+    """后台读取任务与频道队列"""
+
+    @allure.story("按频道分发推送消息")
+    async def test_stream_routes_by_subscription(self, fake_client):
+        client, fake = fake_client
+        btc, eth = "book.BTCUSD-PERP.10", "book.ETHUSD-PERP.10"
+        client._register_channel(btc)
+        client._register_channel(eth)
+
+        for i in range(3):
+            fake.push(book_push(btc, t=i))
+            fake.push(book_push(eth, t=i))
+
+        async def take(channel, n):
+            received = []
+            async for message in client.stream(channel, timeout=1):
+                received.append(message)
+                if len(received) == n:
+                    break
+            return received
+
+        btc_msgs, eth_msgs = await asyncio.gather(take(btc, 3), take(eth, 3))
+
+        assert [m["result"]["data"][0]["t"] for m in btc_msgs] == [0, 1, 2]
+        assert all(m["result"]["subscription"] == eth for m in eth_msgs)
+
+    @allure.story("未注册频道的消息进入 receive_message")
+    async def test_unregistered_messages_go_to_inbox(self, fake_client):
+        client, fake = fake_client
+        fake.push({"id": 7, "method": "subscribe", "code": 0, "channel": "book.BTCUSD-PERP.10"})
+        fake.push(book_push("book.XRPUSD-PERP.10"))
+
+        ack = await client.receive_message(timeout=1)
+        push = await client.receive_message(timeout=1)
+
+        assert ack["id"] == 7
+        assert push["result"]["subscription"] == "book.XRPUSD-PERP.10"
+
+    @allure.story("非 JSON 对象的帧被丢弃，不中断读取任务")
+    async def test_non_object_frames_dropped(self, fake_client):
+        client, fake = fake_client
+        fake.push([1, 2, 3])
+        fake.push("text")
+        fake.frames.put_nowait("{not json")
+        fake.push({"id": 7, "method": "subscribe", "code": 0})
+
+        ack = await client.receive_message(timeout=1)
+
+        assert ack["id"] == 7
+        assert client._reader_task is not None and not client._reader_task.done()
+        assert client.get_reconnect_stats()["disconnects"] == 0
+
+    @allure.story("断开连接后 stream 结束")
+    async def test_stream_ends_on_disconnect(self, fake_client):
+        client, fake = fake_client
+        channel = "book.BTCUSD-PERP.10"
+        client._register_channel(channel)
+
+        async def consume():
+            return [message async for message in client.stream(channel)]
+
+        task = asyncio.ensure_future(consume())
+        fake.push(book_push(channel))
+        await asyncio.sleep(0.05)
+        await client.disconnect()
+
+        assert len(await asyncio.wait_for(task, timeout=1)) == 1
+
+    @allure.story("按 id 关联的流水线订阅")
+    async def test_subscribe_many_resolves_out_of_order_acks(self, fake_client):
+        client, fake = fake_client
+        channels = [f"book.INST{i}-PERP.10" for i in range(5)]
+
+        task = asyncio.ensure_future(client.subscribe_many(channels, timeout=1))
+        await asyncio.sleep(0.05)
+
+        # 全部请求已在途，再以乱序回复确认，中间夹杂推送和心跳
+        requests = {m["params"]["channels"][0]: m["id"] for m in fake.sent}
+        assert len(requests) == len(channels)
+        fake.push({"id": 1000, "method": "public/heartbeat", "code": 0})
+        for channel in reversed(channels):
+            fake.push(book_push(channels[0]))
+            fake.push({"id": requests[channel], "method": "subscribe", "code": 0, "channel": channel})
+
+        responses = await asyncio.wait_for(task, timeout=1)
+
+        assert all(responses[c]["id"] == requests[c] for c in channels)
+        assert not client._pending
+
+    @allure.story("订阅错误码同样按 id 返回")
+    async def test_subscribe_error_response(self, fake_client):
+        client, fake = fake_client
+        channel = "book.INVALID_PAIR.10"
+
+        task = asyncio.ensure_future(client.subscribe([channel], timeout=1))
+        await asyncio.sleep(0.05)
+        fake.push({"id": fake.sent[-1]["id"], "method": "subscribe", "code": 40003, "message": "INVALID"})
+
+        response = await asyncio.wait_for(task, timeout=1)
+
+        assert response["code"] == 40003
+        assert channel not in client._channel_queues
+
+    @allure.story("重复订阅失败不影响已有订阅的频道队列")
+    async def test_failed_resubscribe_keeps_existing_queue(self, fake_client):
+        client, fake = fake_client
+        channel = "book.BTCUSD-PERP.10"
+
+        task = asyncio.ensure_future(client.subscribe([channel], timeout=1))
+        await asyncio.sleep(0.05)
+        fake.push({"id": fake.sent[-1]["id"], "method": "subscribe", "code": 0, "channel": channel})
+        await task
+        queue = client._channel_queues[channel]
+
+        task = asyncio.ensure_future(client.subscribe([channel, "book.INVALID_PAIR.10"], timeout=1))
+        await asyncio.sleep(0.05)
+        fake.push({"id": fake.sent[-1]["id"], "method": "subscribe", "code": 40003, "message": "INVALID"})
+        assert (await task)["code"] == 40003
+
+        assert client._channel_queues.get(channel) is queue and not queue.closed
+        assert "book.INVALID_PAIR.10" not in client._channel_queues
+        fake.push(book_push(channel, t=5))
+        message = await client.stream(channel, timeout=1).__anext__()
+        assert message["result"]["data"][0]["t"] == 5
+
+    @allure.story("心跳由读取任务立即回复")
+    async def test_heartbeat_answered_without_consumer(self, fake_client):
+        client, fake = fake_client
+        channel = "book.BTCUSD-PERP.10"
+        client._register_channel(channel)
+
+        # 消费者完全不读取，推送积压在队列中，心跳仍应被回复
+        for i in range(50):
+            fake.push(book_push(channel, t=i))
+        fake.push({"id": 1700000000001, "method": "public/heartbeat", "code": 0})
+        fake.push({"id": 1700000000002, "method": "public/heartbeat", "code": 0})
+        await asyncio.sleep(0.05)
+
+        replies = [m for m in fake.sent if m["method"] == "public/respond-heartbeat"]
+        stats = client.get_heartbeat_stats()
+
+        assert [m["id"] for m in replies] == [1700000000001, 1700000000002]
+        assert stats["received"] == stats["responded"] == 2
+        assert stats["avg_response_ms"] is not None
+        assert stats["last_interval_s"] is not None
+
+    @allure.story("block 队列已满时读取任务仍回复心跳并分发其他频道")
+    async def test_heartbeat_answered_with_full_block_queue(self, fake_client):
+        client, fake = fake_client
+        btc, eth = "book.BTCUSD-PERP.10", "book.ETHUSD-PERP.10"
+        client._register_channel(btc, policy="block", maxsize=5)
+        client._register_channel(eth)
+
+        for i in range(2000):
+            fake.push(book_push(btc, t=i))
+        fake.push({"id": 1700000000001, "method": "public/heartbeat", "code": 0})
+        fake.push(book_push(eth, t=1))
+        await asyncio.sleep(0.2)
+
+        replies = [m for m in fake.sent if m["method"] == "public/respond-heartbeat"]
+        assert [m["id"] for m in replies] == [1700000000001]
+        eth_msg = await client.stream(eth, timeout=1).__anext__()
+        assert eth_msg["result"]["data"][0]["t"] == 1
+
+        stats = client.get_queue_stats()[btc]
+        assert stats["depth"] == 2000 and stats["overflow"] == 1995 and stats["dropped"] == 0
+        btc_msg = await client.stream(btc, timeout=1).__anext__()
+        assert btc_msg["result"]["data"][0]["t"] == 0
+
+    @allure.story("block 溢出区满时关闭队列，stream 报错而不是无限积压")
+    async def test_block_overflow_closes_stream(self, fake_client, monkeypatch):
+        client, fake = fake_client
+        monkeypatch.setattr(Config, "WS_QUEUE_OVERFLOW_MAXSIZE", 10)
+        channel = "book.BTCUSD-PERP.10"
+        client._register_channel(channel, policy="block", maxsize=5)
+
+        for i in range(5000):
+            fake.push(book_push(channel, t=i))
+        fake.push({"id": 1700000000001, "method": "public/heartbeat", "code": 0})
+        await asyncio.sleep(0.3)
+
+        stats = client.get_queue_stats()[channel]
+        assert stats["overflowed"] and stats["depth"] == 15 and stats["max_depth"] == 15
+        assert [m["id"] for m in fake.sent if m["method"] == "public/respond-heartbeat"] == [1700000000001]
+
+        received = []
+        with pytest.raises(RuntimeError, match="溢出区已满"):
+            async for message in client.stream(channel, timeout=1):
+                received.append(message["result"]["data"][0]["t"])
+        assert received == list(range(15))
+
+        # 重新订阅时换新队列
+        task = asyncio.ensure_future(client.subscribe([channel], timeout=1))
+        await asyncio.sleep(0.05)
+        fake.push({"id": fake.sent[-1]["id"], "method": "subscribe", "code": 0, "channel": channel})
+        await task
+        assert not client.get_queue_stats()[channel]["overflowed"]
+
+    @allure.story("被动断开后自动重连并重放订阅")
+    async def test_reconnect_replays_subscriptions(self, fake_client, monkeypatch):
+        client, fake = fake_client
+        monkeypatch.setattr(Config, "WS_RECONNECT_BASE_DELAY", 0.01)
+        channel = "book.BTCUSD-PERP.10"
+
+        task = asyncio.ensure_future(client.subscribe([channel], timeout=1))
+        await asyncio.sleep(0.05)
+        fake.push({"id": fake.sent[-1]["id"], "method": "subscribe", "code": 0, "channel": channel})
+        assert (await task)["code"] == 0
+
+        new_fake = FakeWebSocket()
+
+        async def open_socket():
+            return new_fake
+
+        monkeypatch.setattr(client, "_open_socket", open_socket)
+
+        received = []
+
+        async def consume():
+            async for message in client.stream(channel, timeout=2):
+                received.append(message)
+                if len(received) == 2:
+                    return
+
+        consumer = asyncio.ensure_future(consume())
+        fake.push(book_push(channel, t=1))
+        fake.drop()
+        await asyncio.sleep(0.1)
+
+        # 新连接上收到重放的订阅请求，确认后继续推送
+        replay = [m for m in new_fake.sent if m["method"] == "subscribe"]
+        assert replay and replay[0]["params"]["channels"] == [channel]
+        new_fake.push({"id": replay[0]["id"], "method": "subscribe", "code": 0, "channel": channel})
+        new_fake.push(book_push(channel, t=2))
+        await asyncio.wait_for(consumer, timeout=1)
+
+        stats = client.get_reconnect_stats()
+        assert [m["result"]["data"][0]["t"] for m in received] == [1, 2]
+        assert stats["disconnects"] == 1 and stats["reconnects"] == 1
+        assert stats["last_time_to_first_message_ms"] is not None
+
+    @allure.story("重连退避期间主动 connect：取消重连，新连接有读取任务")
+    async def test_connect_during_reconnect_backoff(self, fake_client, monkeypatch):
+        client, fake = fake_client
+        monkeypatch.setattr(WebSocketClient, "_backoff_delay", staticmethod(lambda attempt: 0.2))
+        sockets = []
+
+        async def open_socket():
+            sockets.append(FakeWebSocket())
+            return sockets[-1]
+
+        monkeypatch.setattr(client, "_open_socket", open_socket)
+
+        fake.drop()
+        await asyncio.sleep(0.05)
+        assert not await client.is_connected() and client._reconnect_task is not None
+
+        assert await client.connect()
+        await asyncio.sleep(0.3)
+
+        assert len(sockets) == 1 and client.ws is sockets[0]
+        assert client.get_reconnect_stats()["reconnects"] == 0
+        task = asyncio.ensure_future(client.subscribe(["book.BTCUSD-PERP.10"], timeout=1))
+        await asyncio.sleep(0.05)
+        sockets[0].push({"id": sockets[0].sent[-1]["id"], "method": "subscribe", "code": 0})
+        assert (await task)["code"] == 0
+
+    @allure.story("更换连接时关闭旧连接并在新连接上启动读取任务")
+    async def test_attach_socket_replaces_reader(self, fake_client):
+        client, fake = fake_client
+        old_reader = client._reader_task
+        new_fake = FakeWebSocket()
+
+        client._attach_socket(new_fake, keep_queues=True)
+        await asyncio.sleep(0.05)
+
+        assert fake.closed and old_reader.cancelled()
+        new_fake.push({"id": 7, "method": "subscribe", "code": 0})
+        assert (await client.receive_message(timeout=1))["id"] == 7
+
+    @allure.story("重连退避上限")
+    def test_backoff_delay_is_bounded(self):
+        for attempt in range(1, 20):
+            delay = WebSocketClient._backoff_delay(attempt)
+            ceiling = min(Config.WS_RECONNECT_MAX_DELAY, Config.WS_RECONNECT_BASE_DELAY * 2 ** (attempt - 1))
+            assert 0 <= delay <= ceiling
+
+    @allure.story("频道队列策略: 慢消费者只拿到最新快照")
+    async def test_subscribe_with_conflation(self, fake_client):
+        client, fake = fake_client
+        channel = "book.BTCUSD-PERP.10"
+
+        task = asyncio.ensure_future(client.subscribe([channel], timeout=1, queue_policy="conflate_latest"))
+        await asyncio.sleep(0.05)
+        fake.push({"id": fake.sent[-1]["id"], "method": "subscribe", "code": 0, "channel": channel})
+        await task
+
+        for i in range(20):
+            fake.push(book_push(channel, t=i))
+        await asyncio.sleep(0.05)
+
+        message = await client.stream(channel, timeout=1).__anext__()
+        stats = client.get_queue_stats()[channel]
+
+        assert message["result"]["data"][0]["t"] == 19
+        assert stats["conflated"] == 19 and stats["policy"] == "conflate_latest"
+
+    @allure.story("增量订阅不允许合并")
+    async def test_conflation_rejected_for_delta_subscription(self, fake_client):
+        client, _ = fake_client
+        with pytest.raises(ValueError, match="conflate_latest"):
+            await client.subscribe(
+                ["book.BTCUSD-PERP.50"],
+                extra_params={"book_subscription_type": "SNAPSHOT_AND_UPDATE"},
+                queue_policy="conflate_latest",
+            )
+
+    @allure.story("按频道记录交易所→本地延迟与解码耗时")
+    async def test_latency_stats_per_subscription(self, fake_client):
+        client, fake = fake_client
+        channel = "book.BTCUSD-PERP.10"
+        client._register_channel(channel)
+
+        now_ms = int(time.time() * 1000)
+        for i in range(10):
+            fake.push(book_push(channel, t=now_ms - 100))
+        await asyncio.sleep(0.05)
+
+        stats = client.get_latency_stats()[channel]
+        assert stats["exchange_to_client"]["count"] == 10
+        assert 100 <= stats["exchange_to_client"]["p50"] < 1000
+        assert stats["decode"]["p99"] is not None
+
+        client.reset_latency_stats()
+        assert client.get_latency_stats() == {}
+
+    @allure.story("data 不是列表的推送不记录延迟，也不中断读取任务")
+    async def test_latency_ignores_non_list_data(self, fake_client):
+        client, fake = fake_client
+        channel = "book.BTCUSD-PERP.10"
+        client._register_channel(channel)
+        message = book_push(channel)
+        message["result"]["data"] = {"t": 1}
+
+        fake.push(message)
+        received = await client.stream(channel, timeout=1).__anext__()
+
+        assert received["result"]["data"] == {"t": 1}
+        assert client.get_latency_stats() == {}
+        assert client.get_reconnect_stats()["disconnects"] == 0
+
+    @allure.story("帧监听器在入队前看到每一帧（包括被合并的帧）")
+    async def test_frame_listener_sees_every_frame(self, fake_client):
+        client, fake = fake_client
+        channel = "book.BTCUSD-PERP.10"
+        client._register_channel(channel, policy="conflate_latest")
+        seen, everything = [], []
+        client.add_frame_listener(lambda message: seen.append(message["result"]["data"][0]["t"]), channel)
+        client.add_frame_listener(lambda message: everything.append(message))
+        client.add_frame_listener(lambda message: 1 / 0, channel)  # 监听器异常不影响读取任务
+
+        for i in range(20):
+            fake.push(book_push(channel, t=i))
+        fake.push(book_push("book.ETHUSD-PERP.10"))
+        await asyncio.sleep(0.05)
+
+        assert seen == list(range(20))
+        assert len(everything) == 21
+        assert client.get_queue_stats()[channel]["conflated"] == 19
+
+        client._release_channel(channel)
+        fake.push(book_push(channel, t=99))
+        await asyncio.sleep(0.05)
+        assert seen[-1] == 19
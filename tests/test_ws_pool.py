@@ -0,0 +1,106 @@
+"""
+tests/test_ws_pool.py
+WebSocket 连接池分片测试（使用本地模拟连接，不访问交易所）
+"""
+import json
+
+import allure
+import pytest
+
+from tests.test_ws_client_stream import FakeWebSocket, book_push
+from utils.ws_client import WebSocketClient
+from utils.ws_pool import WebSocketPool
+
+
+class AckingWebSocket(FakeWebSocket):
+    """收到 subscribe / unsubscribe 后立即回复确认"""
+
+    async def send(self, message):
+        await super().send(message)
+        request = json.loads(message)
+        if request["method"] in ("subscribe", "unsubscribe"):
+            self.push({"id": request["id"], "method": request["method"], "code": 0})
+
+
+@pytest.fixture
+async def pool(monkeypatch):
+    sockets = []
+
+    async def open_socket(self):
+        sockets.append(AckingWebSocket())
+        return sockets[-1]
+
+    monkeypatch.setattr(WebSocketClient, "_open_socket", open_socket)
+    pool = WebSocketPool("wss://fake", timeout=1, max_sockets=3, max_channels_per_socket=4)
+    yield pool, sockets
+    await pool.close()
+
+
+@allure.epic("Crypto API WebSocket 测试")
+@allure.feature("WebSocket 连接池")
+@pytest.mark.websocket
+class TestWebSocketPool:
+    """频道分片与统一 stream 接口"""
+
+    @allure.story("最少负载分配")
+    async def test_channels_spread_across_sockets(self, pool):
+        pool, sockets = pool
+        channels = [f"book.INST{i}-PERP.10" for i in range(10)]
+
+        responses = await pool.subscribe(channels)
+
+        assert all(response["code"] == 0 for response in responses.values())
+        assert len(sockets) == 3
+        assert sorted(stat["channels"] for stat in pool.get_stats()) == [3, 3, 4]
+
+    @allure.story("超出容量")
+    async def test_pool_full(self, pool):
+        pool, _ = pool
+        await pool.subscribe([f"book.INST{i}-PERP.10" for i in range(pool.capacity - 1)])
+        owners = dict(pool._owners)
+        placements = [set(channels) for channels in pool._placements]
+
+        # 第一个新频道能分配，第二个超出容量：整批回退
+        with pytest.raises(ValueError, match="连接池已满"):
+            await pool.subscribe(["book.INST0-PERP.10", "book.EXTRA-PERP.10", "book.EXTRA2-PERP.10"])
+
+        assert pool._owners == owners
+        assert pool._placements == placements
+
+    @allure.story("重复订阅失败不释放已生效的频道")
+    async def test_failed_duplicate_subscribe_keeps_channel(self, pool, monkeypatch):
+        pool, sockets = pool
+        channel = "book.INST0-PERP.10"
+        await pool.subscribe([channel])
+        owner = pool.owner_of(channel)
+
+        async def reject(message):
+            request = json.loads(message)
+            sockets[0].sent.append(request)
+            sockets[0].push({"id": request["id"], "method": request["method"], "code": 40003})
+
+        monkeypatch.setattr(sockets[0], "send", reject)
+        responses = await pool.subscribe([channel])
+
+        assert responses[channel]["code"] == 40003
+        assert pool.owner_of(channel) is owner
+        assert channel in pool._placements[0]
+
+    @allure.story("统一 stream 接口")
+    async def test_stream_through_pool(self, pool):
+        pool, sockets = pool
+        channels = [f"book.INST{i}-PERP.10" for i in range(6)]
+        await pool.subscribe(channels)
+
+        target = channels[5]
+        socket = sockets[pool.clients.index(pool.owner_of(target))]
+        socket.push(book_push(target, t=42))
+
+        async for message in pool.stream(target, timeout=1):
+            assert message["result"]["data"][0]["t"] == 42
+            break
+
+        await pool.unsubscribe([target])
+        assert pool.owner_of(target) is None
+        with pytest.raises(KeyError):
+            pool.stream(target)
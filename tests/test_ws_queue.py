@@ -0,0 +1,104 @@
+"""
+tests/test_ws_queue.py
+频道队列策略测试（不访问交易所）
+"""
+import asyncio
+
+import allure
+import pytest
+
+from utils.ws_queue import QueuePolicy, SubscriptionQueue, STREAM_CLOSED
+
+
+async def drain(queue):
+    items = []
+    while len(queue):
+        items.append(await queue.get())
+    return items
+
+
+@allure.epic("Crypto API WebSocket 测试")
+@allure.feature("频道队列策略")
+@pytest.mark.websocket
+class TestSubscriptionQueue:
+    """block / drop_oldest / conflate_latest"""
+
+    @allure.story("drop_oldest: 保留最新的 maxsize 条")
+    async def test_drop_oldest(self):
+        queue = SubscriptionQueue(maxsize=3, policy=QueuePolicy.DROP_OLDEST)
+        for i in range(10):
+            await queue.put(i)
+
+        assert await drain(queue) == [7, 8, 9]
+        assert queue.stats["dropped"] == 7
+        assert queue.stats["max_depth"] == 3
+
+    @allure.story("conflate_latest: 只保留最新快照")
+    async def test_conflate_latest(self):
+        queue = SubscriptionQueue(policy=QueuePolicy.CONFLATE_LATEST)
+        for i in range(5):
+            await queue.put(i)
+        assert await queue.get() == 4
+
+        await queue.put(5)
+        assert await queue.get() == 5
+        assert queue.stats["conflated"] == 4
+        assert queue.stats["delivered"] == 2
+
+    @allure.story("block: 队列满时生产者等待消费者")
+    async def test_block_until_consumed(self):
+        queue = SubscriptionQueue(maxsize=2, policy=QueuePolicy.BLOCK)
+        await queue.put(0)
+        await queue.put(1)
+
+        producer = asyncio.ensure_future(queue.put(2))
+        await asyncio.sleep(0.01)
+        assert not producer.done()
+        assert queue.stats["blocked"] == 1
+
+        assert await queue.get() == 0
+        await asyncio.wait_for(producer, timeout=1)
+        assert await drain(queue) == [1, 2]
+        assert queue.stats["dropped"] == 0
+
+    @allure.story("block: put_nowait 不等待，超出容量的消息按顺序补入")
+    async def test_block_put_nowait_overflows_in_order(self):
+        queue = SubscriptionQueue(maxsize=2, policy=QueuePolicy.BLOCK, overflow_maxsize=10)
+        for i in range(5):
+            queue.put_nowait(i)
+
+        stats = queue.get_stats()
+        assert stats["depth"] == 5 and stats["overflow"] == 3 and stats["blocked"] == 0
+        assert await drain(queue) == [0, 1, 2, 3, 4]
+        assert queue.stats["dropped"] == 0
+
+    @allure.story("block: 溢出区有上限，满时关闭队列")
+    async def test_block_overflow_is_bounded(self):
+        queue = SubscriptionQueue(maxsize=100, policy=QueuePolicy.BLOCK, overflow_maxsize=50)
+        for i in range(100_000):
+            queue.put_nowait(i)
+
+        stats = queue.get_stats()
+        assert queue.overflowed and queue.closed
+        assert len(queue) == stats["max_depth"] == 150
+        assert stats["received"] == 151 and stats["dropped"] == 1
+        assert await drain(queue) == list(range(150))
+        assert await queue.get() is STREAM_CLOSED
+
+    @allure.story("关闭后先取完剩余消息再结束，阻塞的生产者被唤醒")
+    async def test_close(self):
+        queue = SubscriptionQueue(maxsize=1, policy=QueuePolicy.BLOCK)
+        await queue.put("a")
+        producer = asyncio.ensure_future(queue.put("b"))
+        await asyncio.sleep(0.01)
+
+        queue.close()
+        await asyncio.wait_for(producer, timeout=1)
+
+        assert await queue.get() == "a"
+        assert await queue.get() is STREAM_CLOSED
+
+    @allure.story("未知策略")
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError, match="未知的队列策略"):
+            SubscriptionQueue(policy="drop_newest")
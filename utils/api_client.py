@@ -5,17 +5,28 @@ import requests
 import logging
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 from config.config import Config
+from utils import json_codec
+from utils.candle_cache import CandleCache
+from utils.http_adapter import create_session, get_phase_timings, get_retry_count
+from utils.rate_limiter import get_rate_limiter
 
 
 class APIClient:
     """API 客户端类"""
 
-    def __init__(self):
+    def __init__(self, cache: Optional[CandleCache] = None):
+        """
+        Args:
+            cache: K 线响应缓存，None 时按 Config.CANDLE_CACHE_ENABLED 决定是否启用默认缓存
+        """
         self.base_url = Config.BASE_URL
         self.timeout = Config.TIMEOUT
-        self.session = requests.Session()
+        self.session = create_session()
+        self.rate_limiter = get_rate_limiter("rest:candlestick")
+        self.cache = cache if cache is not None else (CandleCache() if Config.CANDLE_CACHE_ENABLED else None)
         self.logger = self._setup_logger()
 
     def _setup_logger(self):
@@ -36,20 +47,35 @@ class APIClient:
     def get_candlestick(
             self,
             params: Dict[str, Any],
-            headers: Optional[Dict[str, str]] = None
+            headers: Optional[Dict[str, str]] = None,
+            use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         获取 K线数据
 
         Args:
             params: 请求参数
-            headers: 请求头
+            headers: 请求头（指定自定义请求头时不使用缓存）
+            use_cache: 是否使用缓存（性能测试等需要真实网络耗时的场景传 False）
 
         Returns:
-            响应数据字典，包含 response、status_code、response_time 等
+            响应数据字典，包含 response、status_code、response_time、retries 等
+            （连接错误、429、5xx 已按 Config.MAX_RETRIES 在连接层重试），from_cache 标记是否来自缓存，
+            timings 为分阶段耗时（connect/proxy_tunnel/tls/send/ttfb/transfer/decode/total，毫秒）
         """
         url = Config.get_full_url("candlestick")
 
+        cacheable = self.cache is not None and use_cache and headers is None
+        if cacheable:
+            lookup_start = time.time()
+            cached = self.cache.get(params)
+            if cached is not None:
+                cached["response_time"] = (time.time() - lookup_start) * 1000
+                cached["from_cache"] = True
+                cached["timings"] = {}
+                self.logger.info(f"Cache hit: {url} {params}")
+                return cached
+
         if headers is None:
             headers = {
                 "Content-Type": "application/json",
@@ -59,35 +85,62 @@ class APIClient:
         self.logger.info(f"Request URL: {url}")
         self.logger.info(f"Request Params: {json.dumps(params, indent=2)}")
 
+        # 按端点限流，等待时间不计入响应时间
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
         start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         try:
+            # stream=True：先只读响应头，响应体单独计时
             response = self.session.get(
                 url,
                 params=params,
                 headers=headers,
-                timeout=self.timeout
+                timeout=self.timeout,
+                stream=True
             )
+            timings = get_phase_timings(response)
+
+            transfer_start_ns = time.perf_counter_ns()
+            content = response.content
+            timings["transfer_ms"] = (time.perf_counter_ns() - transfer_start_ns) / 1e6
 
             response_time = (time.time() - start_time) * 1000  # ms
 
             self.logger.info(f"Response Status: {response.status_code}")
             self.logger.info(f"Response Time: {response_time:.2f}ms")
 
+            retries = get_retry_count(response)
+            if retries:
+                self.logger.warning(f"Request succeeded after {retries} retries")
+
             # 尝试解析 JSON
+            decode_start_ns = time.perf_counter_ns()
             try:
-                response_json = response.json()
-            except json.JSONDecodeError:
+                response_json = json_codec.loads(content)
+            except json_codec.DecodeError:
                 response_json = {"error": "Invalid JSON response"}
+            end_ns = time.perf_counter_ns()
+            timings["decode_ms"] = (end_ns - decode_start_ns) / 1e6
+            timings["total_ms"] = (end_ns - start_ns) / 1e6
+            self.logger.info(f"Timings: {timings}")
 
-            return {
+            result = {
                 "response": response_json,
                 "status_code": response.status_code,
                 "response_time": response_time,
                 "headers": dict(response.headers),
                 "url": response.url,
-                "request_params": params
+                "request_params": params,
+                "retries": retries,
+                "from_cache": False,
+                "timings": timings
             }
+            if cacheable:
+                self.cache.put(params, result)
+            return result
 
         except requests.exceptions.Timeout:
             self.logger.error(f"Request timeout after {self.timeout}s")
@@ -105,24 +158,28 @@ class APIClient:
                 "request_params": params
             }
 
-    def get_multiple_candlesticks(self, params_list: list) -> list:
+    def get_multiple_candlesticks(self, params_list: list, max_workers: Optional[int] = None) -> list:
         """
         批量获取 K线数据
 
+        请求在线程池中并发执行，速率由端点共享的令牌桶控制（Config.RATE_LIMITS）
+
         Args:
             params_list: 参数列表
+            max_workers: 线程数，None 表示使用 Config.REST_MAX_WORKERS
 
         Returns:
-            响应列表
+            响应列表（与 params_list 顺序一致）
         """
-        results = []
-        for params in params_list:
-            result = self.get_candlestick(params)
-            results.append(result)
-            time.sleep(0.1)  # 避免请求过快
+        if not params_list:
+            return []
 
-        return results
+        workers = min(max_workers or Config.REST_MAX_WORKERS, len(params_list))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="candlestick") as executor:
+            return list(executor.map(self.get_candlestick, params_list))
 
     def close(self):
         """关闭会话"""
-        self.session.close()
\ No newline at end of file
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
\ No newline at end of file
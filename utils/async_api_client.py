@@ -0,0 +1,173 @@
+"""
+异步 API 客户端封装（aiohttp）
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import aiohttp
+
+from config.config import Config
+from utils import json_codec
+from utils.rate_limiter import get_rate_limiter
+
+
+class AsyncAPIClient:
+    """
+    异步 API 客户端类
+
+    与 APIClient.get_candlestick 返回相同结构的结果字典，区别在于：
+    - 请求之间可以并发，同时在途的数量由信号量限制
+    - 复用同一个 ClientSession，连接保持 keep-alive
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, connection_limit: Optional[int] = None):
+        """
+        初始化异步客户端（会话在第一次请求时创建，需在事件循环中使用）
+
+        Args:
+            max_concurrency: 同时在途的请求数，None 表示使用 Config.ASYNC_MAX_CONCURRENCY
+            connection_limit: 连接池大小，None 表示使用 Config.ASYNC_CONNECTION_LIMIT
+        """
+        self.base_url = Config.BASE_URL
+        self.timeout = Config.TIMEOUT
+        self.max_concurrency = max_concurrency or Config.ASYNC_MAX_CONCURRENCY
+        self.connection_limit = connection_limit or Config.ASYNC_CONNECTION_LIMIT
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # 与 APIClient 共用同一个端点令牌桶
+        self.rate_limiter = get_rate_limiter("rest:candlestick")
+        self.logger = self._setup_logger()
+
+    def _setup_logger(self):
+        """设置日志"""
+        logger = logging.getLogger(__name__)
+        logger.setLevel(logging.INFO)
+
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+
+        return logger
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """获取（必要时创建）共享会话"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.connection_limit, keepalive_timeout=30)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                # 与 requests 一致：读取 HTTP(S)_PROXY 环境变量
+                trust_env=True
+            )
+        return self.session
+
+    @staticmethod
+    def _encode_params(params: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """
+        按 requests 的规则编码查询参数：None 省略，列表展开为重复参数，其余转为字符串
+        """
+        encoded = []
+        for key, value in params.items():
+            if value is None:
+                continue
+            values = value if isinstance(value, (list, tuple)) else [value]
+            encoded.extend((key, str(item)) for item in values if item is not None)
+        return encoded
+
+    async def get_candlestick(
+            self,
+            params: Dict[str, Any],
+            headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        获取 K线数据
+
+        Args:
+            params: 请求参数
+            headers: 请求头
+
+        Returns:
+            响应数据字典，包含 response、status_code、response_time 等（与 APIClient 相同）
+        """
+        url = Config.get_full_url("candlestick")
+
+        if headers is None:
+            headers = {
+                "Content-Type": "application/json",
+                "User-Agent": "CryptoAPI-Test/1.0"
+            }
+
+        async with self._semaphore:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+
+            self.logger.info(f"Request URL: {url} | Params: {params}")
+
+            # 从拿到并发名额开始计时，排队时间不计入响应时间
+            start_time = time.time()
+
+            try:
+                async with self._get_session().get(
+                        url,
+                        params=self._encode_params(params),
+                        headers=headers
+                ) as response:
+                    body = await response.read()
+                    response_time = (time.time() - start_time) * 1000  # ms
+
+                    self.logger.info(f"Response Status: {response.status} | Response Time: {response_time:.2f}ms")
+
+                    # 尝试解析 JSON
+                    try:
+                        response_json = json_codec.loads(body)
+                    except json_codec.DecodeError:
+                        response_json = {"error": "Invalid JSON response"}
+
+                    return {
+                        "response": response_json,
+                        "status_code": response.status,
+                        "response_time": response_time,
+                        "headers": dict(response.headers),
+                        "url": str(response.url),
+                        "request_params": params
+                    }
+
+            except asyncio.TimeoutError:
+                self.logger.error(f"Request timeout after {self.timeout}s")
+                return {
+                    "error": "Timeout",
+                    "response_time": (time.time() - start_time) * 1000,
+                    "request_params": params
+                }
+
+            except aiohttp.ClientError as e:
+                self.logger.error(f"Request failed: {str(e)}")
+                return {
+                    "error": str(e),
+                    "response_time": (time.time() - start_time) * 1000,
+                    "request_params": params
+                }
+
+    async def get_multiple_candlesticks(self, params_list: list) -> list:
+        """
+        并发获取 K线数据（并发数受信号量限制，速率受端点令牌桶限制）
+
+        Args:
+            params_list: 参数列表
+
+        Returns:
+            响应列表（与 params_list 顺序一致）
+        """
+        return list(await asyncio.gather(*(self.get_candlestick(params) for params in params_list)))
+
+    async def close(self):
+        """关闭会话"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
@@ -0,0 +1,174 @@
+"""
+utils/candle_cache.py
+K 线响应缓存（SQLite）- 已收盘的时间窗口永久缓存，包含当前时间的窗口短 TTL，按 LRU 淘汰
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from config.config import Config
+from utils import json_codec
+
+
+class CandleCache:
+    """
+    K 线响应缓存
+
+    缓存键为 (instrument_name, timeframe, count, start_ts, end_ts)：
+    - end_ts（含）早于当前未收盘 K 线的开盘时间：窗口内所有 K 线都已收盘，永久缓存
+    - 其他情况（未指定 end_ts、窗口包含当前时间、周期未知）：缓存 open_ttl 秒
+    - 总大小超过 max_bytes 时，按最近访问时间淘汰（LRU）
+    """
+
+    KEY_FIELDS = ("instrument_name", "timeframe", "count", "start_ts", "end_ts")
+
+    def __init__(
+            self,
+            path: Optional[str] = None,
+            max_bytes: Optional[int] = None,
+            open_ttl: Optional[float] = None
+    ):
+        """
+        Args:
+            path: SQLite 文件路径，None 表示使用 Config.CANDLE_CACHE_PATH（":memory:" 为内存缓存）
+            max_bytes: 缓存总大小上限（字节），None 表示使用 Config.CANDLE_CACHE_MAX_BYTES
+            open_ttl: 未收盘窗口的缓存时间（秒），None 表示使用 Config.CANDLE_CACHE_OPEN_TTL
+        """
+        self.path = path or Config.CANDLE_CACHE_PATH
+        self.max_bytes = max_bytes if max_bytes is not None else Config.CANDLE_CACHE_MAX_BYTES
+        self.open_ttl = open_ttl if open_ttl is not None else Config.CANDLE_CACHE_OPEN_TTL
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # 批量请求在线程池中执行，共用一个连接并加锁
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS candles ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_candles_last_access ON candles(last_access)")
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    # ==================== 缓存键与有效期 ====================
+
+    @classmethod
+    def make_key(cls, params: Dict[str, Any]) -> str:
+        """由请求参数生成缓存键"""
+        return json.dumps([params.get(field) for field in cls.KEY_FIELDS])
+
+    @staticmethod
+    def is_closed_window(params: Dict[str, Any], now_ms: Optional[int] = None) -> bool:
+        """
+        窗口内的 K 线是否都已收盘（此后不会再变化）
+
+        Args:
+            params: 请求参数
+            now_ms: 当前时间（毫秒），None 表示取系统时间
+
+        Returns:
+            bool: end_ts 早于当前 K 线的开盘时间时为 True（end_ts 为闭区间端点，
+                  等于开盘时间时窗口包含未收盘的 K 线）
+        """
+        end_ts = params.get("end_ts")
+        timeframe_ms = Config.TIMEFRAME_MS.get(params.get("timeframe"))
+        if not isinstance(end_ts, int) or timeframe_ms is None:
+            return False
+
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        current_candle_open = now_ms - now_ms % timeframe_ms
+        return end_ts < current_candle_open
+
+    # ==================== 读写 ====================
+
+    def get(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存
+
+        Returns:
+            Dict: 缓存的结果字典，未命中或已过期返回 None
+        """
+        key = self.make_key(params)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM candles WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or (row[1] is not None and row[1] <= now):
+                self.stats["misses"] += 1
+                return None
+
+            self._conn.execute("UPDATE candles SET last_access = ? WHERE key = ?", (now, key))
+            self.stats["hits"] += 1
+
+        return json_codec.loads(row[0])
+
+    def put(self, params: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        """
+        写入缓存（只缓存 HTTP 200 且 code == 0 的响应）
+
+        Returns:
+            bool: 是否写入
+        """
+        response = result.get("response")
+        if result.get("status_code") != 200 or not isinstance(response, dict) or response.get("code") != 0:
+            return False
+
+        value = json_codec.dumps(result).encode("utf-8")
+        now = time.time()
+        expires_at = None if self.is_closed_window(params) else now + self.open_ttl
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO candles (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (self.make_key(params), value, len(value), expires_at, now)
+            )
+            self.stats["stores"] += 1
+            self._evict()
+        return True
+
+    def _evict(self):
+        """删除过期条目，总大小仍超限时按最近访问时间淘汰（调用方需持有 _lock）"""
+        self._conn.execute("DELETE FROM candles WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM candles").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in self._conn.execute("SELECT key, size FROM candles ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM candles WHERE key = ?", (key,))
+            total -= size
+            self.stats["evictions"] += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM candles").fetchone()[0]
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM candles")
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
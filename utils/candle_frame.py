@@ -0,0 +1,144 @@
+"""
+utils/candle_frame.py
+K 线列式存储 - 一次解析为连续的定长数组（t: int64；o/h/l/c/v: float64）
+"""
+from array import array
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 没有 NumPy 时使用标准库 array
+    np = None
+
+
+# (列名, 短字段名, 长字段名)
+CANDLE_FIELDS: Tuple[Tuple[str, str, str], ...] = (
+    ("t", "t", "timestamp"),
+    ("o", "o", "open"),
+    ("h", "h", "high"),
+    ("l", "l", "low"),
+    ("c", "c", "close"),
+    ("v", "v", "volume"),
+)
+PRICE_COLUMNS = ("o", "h", "l", "c", "v")
+
+
+class CandleFrame:
+    """
+    K 线列式数据
+
+    从 List[Dict] 解析一次，之后各校验直接使用列：
+    - 短/长字段名（t/timestamp、o/open ...）按第一条数据确定一次，个别缺失的行再查另一个名字
+    - 价格缺失或无法解析时记为 NaN，时间戳缺失或无法解析时抛出 ValueError
+    - 有 NumPy 时列为 ndarray（支持向量化运算），否则为 array('q') / array('d')
+
+    每根 K 线占 6 × 8 = 48 字节。
+    """
+
+    def __init__(self, columns: Dict[str, Sequence]):
+        """
+        Args:
+            columns: {"t": 时间戳列, "o"/"h"/"l"/"c"/"v": 价格/成交量列}，长度必须一致
+        """
+        lengths = {name: len(column) for name, column in columns.items()}
+        if len(set(lengths.values())) > 1:
+            raise ValueError(f"各列长度不一致: {lengths}")
+
+        self.columns = columns
+        self.t = columns["t"]
+        self.o = columns["o"]
+        self.h = columns["h"]
+        self.l = columns["l"]
+        self.c = columns["c"]
+        self.v = columns["v"]
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    @property
+    def uses_numpy(self) -> bool:
+        """列是否为 NumPy 数组"""
+        return np is not None and isinstance(self.t, np.ndarray)
+
+    @property
+    def nbytes(self) -> int:
+        """列数据占用的字节数"""
+        return sum(len(column) * column.itemsize for column in self.columns.values())
+
+    # ==================== 构建 ====================
+
+    @staticmethod
+    def _resolve_key(first: Dict[str, Any], short: str, long: str) -> Tuple[str, str]:
+        """按第一条数据确定字段名，返回 (主字段名, 备用字段名)"""
+        return (short, long) if short in first else (long, short)
+
+    @staticmethod
+    def _to_float(value: Any) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return float("nan")
+
+    @classmethod
+    def from_candles(cls, candles: List[Dict[str, Any]], use_numpy: Optional[bool] = None) -> "CandleFrame":
+        """
+        从 K 线字典列表构建
+
+        Args:
+            candles: K 线列表（响应中的 result.data）
+            use_numpy: 是否使用 NumPy，None 表示已安装时使用
+
+        Raises:
+            ValueError: 时间戳缺失或无法解析（错误信息包含行号）
+        """
+        use_numpy = np is not None if use_numpy is None else (use_numpy and np is not None)
+        first = candles[0] if candles else {}
+        raw: Dict[str, List[Any]] = {}
+
+        for column, short, long in CANDLE_FIELDS:
+            key, fallback = cls._resolve_key(first, short, long)
+            values = [candle.get(key) for candle in candles]
+            for i, value in enumerate(values):
+                if value is None:
+                    values[i] = candles[i].get(fallback)
+            raw[column] = values
+
+        timestamps = []
+        for i, value in enumerate(raw["t"]):
+            try:
+                timestamps.append(int(value))
+            except (TypeError, ValueError):
+                raise ValueError(f"Candle {i}: invalid timestamp {value!r}")
+
+        prices = {column: [cls._to_float(value) for value in raw[column]] for column in PRICE_COLUMNS}
+
+        if use_numpy:
+            columns = {"t": np.array(timestamps, dtype=np.int64)}
+            columns.update({column: np.array(values, dtype=np.float64) for column, values in prices.items()})
+        else:
+            columns = {"t": array("q", timestamps)}
+            columns.update({column: array("d", values) for column, values in prices.items()})
+        return cls(columns)
+
+    @classmethod
+    def from_response(cls, response: Dict[str, Any], use_numpy: Optional[bool] = None) -> "CandleFrame":
+        """
+        从接口响应（或 APIClient 的结果字典）构建
+
+        Args:
+            response: {"result": {"data": [...]}} 或 {"response": {"result": {"data": [...]}}}
+        """
+        if "response" in response and isinstance(response["response"], dict):
+            response = response["response"]
+        return cls.from_candles(response.get("result", {}).get("data", []), use_numpy=use_numpy)
+
+    # ==================== 访问 ====================
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """第 index 根 K 线（短字段名，数值类型）"""
+        return {column: self.columns[column][index].item() if self.uses_numpy else self.columns[column][index]
+                for column in self.columns}
+
+    def to_candles(self) -> List[Dict[str, Any]]:
+        """转换回字典列表（短字段名，数值类型）"""
+        return [self.row(i) for i in range(len(self))]
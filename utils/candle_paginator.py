@@ -0,0 +1,294 @@
+"""
+utils/candle_paginator.py
+历史 K 线分页抓取 - 按周期对齐切分窗口、并发抓取、拼接去重、断点续传
+"""
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Tuple
+
+import allure
+
+from config.config import Config
+from utils.validators import DataCompletenessValidator
+
+
+class CandlePaginator:
+    """
+    历史 K 线分页器
+
+    get-candlestick 单次最多返回 300 根（TC_BND_002），长区间需要分多次请求：
+    - 区间按周期对齐后切成每段 window_count 根的窗口
+    - 窗口在线程池中并发抓取，速率由 APIClient 的端点令牌桶控制
+    - 结果按时间戳排序，去掉窗口边界处重复的 K 线，并裁剪到请求区间内
+    - 每完成一个窗口写一次断点文件；失败后用相同参数重新调用，只抓取缺失的窗口
+    """
+
+    MAX_WINDOW_COUNT = 300
+
+    def __init__(
+            self,
+            api_client,
+            checkpoint_path: Optional[str] = None,
+            max_workers: Optional[int] = None,
+            window_count: int = MAX_WINDOW_COUNT
+    ):
+        """
+        Args:
+            api_client: APIClient（或提供相同 get_candlestick 接口的对象）
+            checkpoint_path: 断点文件路径，None 表示不保存断点
+            max_workers: 并发线程数，None 表示使用 Config.REST_MAX_WORKERS
+            window_count: 每个窗口的 K 线根数（不超过 300）
+        """
+        if not 0 < window_count <= self.MAX_WINDOW_COUNT:
+            raise ValueError(f"window_count 必须在 1 ~ {self.MAX_WINDOW_COUNT} 之间: {window_count}")
+
+        self.api_client = api_client
+        self.checkpoint_path = checkpoint_path
+        self.max_workers = max_workers or Config.REST_MAX_WORKERS
+        self.window_count = window_count
+        self.logger = self._setup_logger()
+
+    def _setup_logger(self):
+        """设置日志"""
+        logger = logging.getLogger(__name__)
+        logger.setLevel(logging.INFO)
+
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+
+        return logger
+
+    @staticmethod
+    def get_timeframe_ms(timeframe: str) -> int:
+        """
+        周期长度（毫秒）
+
+        Raises:
+            ValueError: 周期不在 Config.TIMEFRAME_MS 中（如长度不固定的 1M）
+        """
+        timeframe_ms = Config.TIMEFRAME_MS.get(timeframe)
+        if timeframe_ms is None:
+            raise ValueError(f"不支持分页的周期: {timeframe}")
+        return timeframe_ms
+
+    def plan_windows(self, timeframe: str, start_ts: int, end_ts: int) -> List[Tuple[int, int]]:
+        """
+        把 [start_ts, end_ts) 切分为按周期对齐的窗口
+
+        Returns:
+            List: [(窗口开始, 窗口结束)]，窗口结束为最后一根 K 线开盘时间 + 周期 - 1（闭区间）
+        """
+        if start_ts >= end_ts:
+            raise ValueError(f"start_ts 必须小于 end_ts: {start_ts} >= {end_ts}")
+
+        timeframe_ms = self.get_timeframe_ms(timeframe)
+        window_ms = timeframe_ms * self.window_count
+        aligned_start = start_ts - start_ts % timeframe_ms
+
+        windows = []
+        window_start = aligned_start
+        while window_start < end_ts:
+            window_end = min(window_start + window_ms, end_ts) - 1
+            windows.append((window_start, window_end))
+            window_start += window_ms
+        return windows
+
+    # ==================== 断点 ====================
+
+    def _checkpoint_key(self, instrument_name: str, timeframe: str, start_ts: int, end_ts: int) -> Dict[str, Any]:
+        return {
+            "instrument_name": instrument_name,
+            "timeframe": timeframe,
+            "start_ts": start_ts,
+            "end_ts": end_ts,
+            "window_count": self.window_count,
+        }
+
+    def _load_checkpoint(self, key: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """读取断点中已完成的窗口（参数不一致时忽略）"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"⚠️ 断点文件无法读取，重新抓取: {e}")
+            return {}
+
+        if checkpoint.get("key") != key:
+            self.logger.warning("⚠️ 断点文件参数不一致，重新抓取")
+            return {}
+        return checkpoint.get("windows", {})
+
+    def _save_checkpoint(self, key: Dict[str, Any], windows: Dict[str, List[Dict[str, Any]]]):
+        """原子写入断点文件"""
+        if not self.checkpoint_path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.checkpoint_path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "windows": windows}, f)
+        os.replace(temp_path, self.checkpoint_path)
+
+    # ==================== 抓取 ====================
+
+    def _fetch_window(self, instrument_name: str, timeframe: str, window: Tuple[int, int]):
+        """抓取一个窗口，返回 (K 线列表或 None, 错误信息)"""
+        params = {
+            "instrument_name": instrument_name,
+            "timeframe": timeframe,
+            "count": self.window_count,
+            "start_ts": window[0],
+            "end_ts": window[1],
+        }
+        result = self.api_client.get_candlestick(params)
+
+        if "error" in result:
+            return None, result["error"]
+        response = result.get("response", {})
+        if result.get("status_code") != 200 or response.get("code") != 0:
+            return None, f"status_code={result.get('status_code')}, code={response.get('code')}"
+        return response.get("result", {}).get("data", []), None
+
+    def fetch(self, instrument_name: str, timeframe: str, start_ts: int, end_ts: int) -> Dict[str, Any]:
+        """
+        抓取 [start_ts, end_ts) 区间的全部 K 线
+
+        Args:
+            instrument_name: 交易对
+            timeframe: 周期
+            start_ts: 开始时间（毫秒，含）
+            end_ts: 结束时间（毫秒，不含）
+
+        Returns:
+            Dict: {
+                "data": 按时间排序、去重后的 K 线,
+                "complete": 是否所有窗口都已抓取,
+                "windows": 窗口总数,
+                "fetched": 本次抓取的窗口数,
+                "resumed": 从断点恢复的窗口数,
+                "failed_windows": [{"start_ts", "end_ts", "error"}],
+                "duplicates_removed": 去掉的重复 K 线数（含窗口边界重叠）,
+                "window_duplicates": 其中同一窗口响应内重复的 K 线数,
+                "invalid_candles": 跳过的时间戳缺失或无效的 K 线数
+            }
+        """
+        windows = self.plan_windows(timeframe, start_ts, end_ts)
+        key = self._checkpoint_key(instrument_name, timeframe, start_ts, end_ts)
+        done = self._load_checkpoint(key)
+        pending = [window for window in windows if str(window[0]) not in done]
+
+        self.logger.info(
+            f"📚 {instrument_name} {timeframe}: 共 {len(windows)} 个窗口，"
+            f"断点已完成 {len(windows) - len(pending)} 个，待抓取 {len(pending)} 个"
+        )
+
+        failed = []
+        if pending:
+            workers = min(self.max_workers, len(pending))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="paginator") as executor:
+                futures = {
+                    executor.submit(self._fetch_window, instrument_name, timeframe, window): window
+                    for window in pending
+                }
+                for future in as_completed(futures):
+                    window = futures[future]
+                    try:
+                        candles, error = future.result()
+                    except Exception as e:
+                        candles, error = None, f"{type(e).__name__}: {e}"
+
+                    if candles is None:
+                        failed.append({"start_ts": window[0], "end_ts": window[1], "error": error})
+                        self.logger.error(f"❌ 窗口 {window} 抓取失败: {error}")
+                        continue
+
+                    done[str(window[0])] = candles
+                    self._save_checkpoint(key, done)
+
+        data, counts = self.merge(done.values(), start_ts, end_ts)
+        complete = not failed
+
+        if complete and self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        self.logger.info(
+            f"{'✅' if complete else '⚠️'} 抓取结束: {len(data)} 根 K 线，"
+            f"失败窗口 {len(failed)} 个，去重 {counts['duplicates_removed']} 根，"
+            f"跳过无效时间戳 {counts['invalid_candles']} 根"
+        )
+        return {
+            "data": data,
+            "complete": complete,
+            "windows": len(windows),
+            "fetched": len(pending) - len(failed),
+            "resumed": len(windows) - len(pending),
+            "failed_windows": sorted(failed, key=lambda item: item["start_ts"]),
+            **counts,
+        }
+
+    @staticmethod
+    def merge(window_candles, start_ts: int, end_ts: int) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        合并各窗口的 K 线：裁剪到 [start_ts, end_ts)、按时间戳去重并排序
+
+        时间戳缺失或无法解析的 K 线跳过并计数，不中断整段抓取。
+
+        Returns:
+            (K 线列表, 计数 {"duplicates_removed": 去掉的重复数（含窗口边界重叠）,
+                            "window_duplicates": 其中同一窗口内重复的数量,
+                            "invalid_candles": 跳过的无效时间戳 K 线数})
+        """
+        by_timestamp: Dict[int, Dict[str, Any]] = {}
+        counts = {"duplicates_removed": 0, "window_duplicates": 0, "invalid_candles": 0}
+        for candles in window_candles:
+            seen_in_window = set()
+            for candle in candles:
+                try:
+                    timestamp = int(candle.get("t") or candle.get("timestamp"))
+                except (AttributeError, TypeError, ValueError):
+                    counts["invalid_candles"] += 1
+                    continue
+                if not start_ts <= timestamp < end_ts:
+                    continue
+                if timestamp in seen_in_window:
+                    counts["window_duplicates"] += 1
+                seen_in_window.add(timestamp)
+                if timestamp in by_timestamp:
+                    counts["duplicates_removed"] += 1
+                    continue
+                by_timestamp[timestamp] = candle
+
+        return [by_timestamp[timestamp] for timestamp in sorted(by_timestamp)], counts
+
+    def validate(self, result: Dict[str, Any], timeframe: str, logger=None):
+        """
+        校验整段区间：所有窗口已抓取、单个窗口响应内无重复时间戳、无无效时间戳、时间连续
+
+        窗口边界处的重叠在 merge 中正常去重，不视为失败；合并后的数据已去重，
+        因此重复检查针对各窗口的原始响应（window_duplicates）。
+
+        Raises:
+            AssertionError: 校验失败
+        """
+        assert result["complete"], f"存在抓取失败的窗口，可用相同参数重试续传: {result['failed_windows']}"
+        with allure.step("验证数据完整性 - 窗口响应内无重复时间戳"):
+            assert result["window_duplicates"] == 0, \
+                f"Found {result['window_duplicates']} duplicate timestamps within window responses"
+            assert result["invalid_candles"] == 0, \
+                f"Found {result['invalid_candles']} candles with missing or invalid timestamps"
+            if logger:
+                logger.info(f"✓ 数据完整性验证通过：窗口响应内无重复时间戳（验证了 {len(result['data'])} 条数据）")
+        DataCompletenessValidator.validate_continuous_data(
+            result["data"],
+            expected_interval=self.get_timeframe_ms(timeframe),
+            logger=logger
+        )
@@ -0,0 +1,125 @@
+"""
+utils/case_compiler.py
+用例 expected 编译器 - 把数据驱动用例的 expected 声明编译为逐帧检查闭包
+"""
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from utils.orderbook_validator import FastOrderBookValidator
+
+
+Failures = List[Tuple[str, str]]
+FrameCheck = Callable[[Dict[str, Any]], Failures]
+
+
+def _required_fields_step(fields: Tuple[str, ...]):
+    def step(result: Dict[str, Any], failures: Failures):
+        for field in fields:
+            if field not in result:
+                failures.append(("missing_field", f"result 缺少 {field} 字段"))
+    return step
+
+
+def _data_fields_step(fields: Tuple[str, ...]):
+    def step(result: Dict[str, Any], failures: Failures):
+        for i, item in enumerate(result.get("data") or ()):
+            if not isinstance(item, dict):
+                failures.append(("malformed", f"data[{i}] 应该是字典，实际: {type(item).__name__}"))
+                continue
+            for field in fields:
+                if field not in item:
+                    failures.append(("missing_data_field", f"data[{i}] 缺少 {field} 字段"))
+    return step
+
+
+def _min_levels_step(side: str, minimum: int):
+    name = "买单" if side == "bids" else "卖单"
+
+    def step(result: Dict[str, Any], failures: Failures):
+        for i, item in enumerate(result.get("data") or ()):
+            levels = len(item.get(side) or ()) if isinstance(item, dict) else 0
+            if levels < minimum:
+                failures.append((f"too_few_{side}", f"data[{i}] {name}档位数 {levels} < {minimum}"))
+    return step
+
+
+def _book_content_step(expected_depth: Optional[int]):
+    check_book = FastOrderBookValidator(expected_depth=expected_depth).check_book
+
+    def step(result: Dict[str, Any], failures: Failures):
+        for item in result.get("data") or ():
+            # 非字典项已由 data_fields 检查报告
+            if isinstance(item, dict):
+                failures.extend(check_book(item))
+    return step
+
+
+def compile_expected(expected: Dict[str, Any], expected_depth: Optional[int] = None) -> FrameCheck:
+    """
+    把用例的 expected 编译为逐帧检查闭包
+
+    只为声明了的字段生成检查步骤，字段列表预先转为元组，
+    运行时不再读取 expected，也不判断哪些检查需要执行：
+    - required_fields: result 必须包含的字段
+    - data_fields: result.data 每一项必须包含的字段；包含 bids/asks 时追加订单簿内容检查
+      （价格为正、排序、不倒挂，FastOrderBookValidator）
+    - min_bids / min_asks: 每一项的最少档位数
+
+    Args:
+        expected: 用例的 expected 字典
+        expected_depth: 订阅深度（订单簿内容检查中的最大档位数）
+
+    Returns:
+        Callable: check(message) -> [(违规类型, 说明)]，与 StreamingValidator 的 check 接口一致
+    """
+    steps = []
+    if expected.get("required_fields"):
+        steps.append(_required_fields_step(tuple(expected["required_fields"])))
+    if expected.get("data_fields"):
+        data_fields = tuple(expected["data_fields"])
+        steps.append(_data_fields_step(data_fields))
+        if "bids" in data_fields and "asks" in data_fields:
+            steps.append(_book_content_step(expected_depth))
+    for side in ("bids", "asks"):
+        if expected.get(f"min_{side}"):
+            steps.append(_min_levels_step(side, expected[f"min_{side}"]))
+    steps = tuple(steps)
+
+    def check(message: Dict[str, Any]) -> Failures:
+        result = message.get("result")
+        if not isinstance(result, dict):
+            return [("malformed", "推送消息缺少 result 字段")]
+        failures: Failures = []
+        for step in steps:
+            step(result, failures)
+        return failures
+
+    return check
+
+
+def case_channels(case: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    """
+    用例订阅的订单簿频道
+
+    Returns:
+        Dict: {频道: 深度}，单频道用例为 params.instrument_name/depth，多频道用例为 params.channels
+    """
+    params = case.get("params", {})
+    configs = params.get("channels") or [params]
+    return {
+        f"book.{config['instrument_name']}.{config['depth']}": config.get("depth")
+        for config in configs if "instrument_name" in config and "depth" in config
+    }
+
+
+def compile_case(case: Dict[str, Any]) -> Dict[str, FrameCheck]:
+    """
+    编译一个用例：每个订阅频道一个检查闭包
+
+    Returns:
+        Dict: {频道: check}
+    """
+    expected = case.get("expected", {})
+    return {
+        channel: compile_expected(expected, expected_depth=depth)
+        for channel, depth in case_channels(case).items()
+    }
@@ -0,0 +1,308 @@
+"""
+utils/fused_validator.py
+融合 K 线验证器 - 一次遍历完成 CandlestickValidator / DataCompletenessValidator 的全部检查
+"""
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+import allure
+
+
+STANDARD_FIELDS: List[Tuple[str, str]] = [
+    ("t", "timestamp"),
+    ("o", "open"),
+    ("h", "high"),
+    ("l", "low"),
+    ("c", "close"),
+    ("v", "volume"),
+]
+
+# 结构检查只看前几条（与 CandlestickValidator.validate_candlestick_structure 一致）
+STRUCTURE_SAMPLE_SIZE = 3
+
+# 单项验证器按数量汇总报告的检查
+SUMMARY_MESSAGES = {
+    "missing_fields": "Found {count} missing fields in data",
+    "null_values": "Found {count} null values in data",
+}
+
+
+class ValidationResult:
+    """
+    融合验证结果
+
+    violations 中每一项为 {"check": 检查名, "index": K 线序号（整体检查为 None）, "message": 断言信息}，
+    断言信息与对应的单项验证器相同。
+    """
+
+    def __init__(self, checks: List[str], count: int):
+        """
+        Args:
+            checks: 启用的检查（按执行顺序）
+            count: 验证的数据条数
+        """
+        self.checks = checks
+        self.count = count
+        self.violations: List[Dict[str, Any]] = []
+        self.metrics: Dict[str, Any] = {}
+
+    def add(self, check: str, message: str, index: Optional[int] = None):
+        """记录一条违规"""
+        self.violations.append({"check": check, "index": index, "message": message})
+
+    @property
+    def passed(self) -> bool:
+        return not self.violations
+
+    def failed_checks(self) -> Dict[str, int]:
+        """各检查的违规数（按检查顺序）"""
+        counts = {}
+        for violation in self.violations:
+            counts[violation["check"]] = counts.get(violation["check"], 0) + 1
+        return {check: counts[check] for check in self.checks if check in counts}
+
+    def first_violation(self, check: str) -> Optional[Dict[str, Any]]:
+        """某项检查的第一条违规"""
+        return next((violation for violation in self.violations if violation["check"] == check), None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "passed": self.passed,
+            "count": self.count,
+            "checks": self.checks,
+            "failed_checks": self.failed_checks(),
+            "metrics": self.metrics,
+            "violations": self.violations,
+        }
+
+    def attach(self, name: str = "K线融合验证结果"):
+        """写入一个 Allure 附件（全部检查的结果）"""
+        allure.attach(
+            json.dumps(self.to_dict(), indent=2, ensure_ascii=False),
+            name=name,
+            attachment_type=allure.attachment_type.JSON
+        )
+
+    def assert_passed(self):
+        """
+        有违规时抛出 AssertionError
+
+        每个失败检查一行，内容与单项验证器的断言信息相同（逐条检查取第一条违规，汇总检查取数量）
+        """
+        if self.passed:
+            return
+        raise AssertionError("\n".join(
+            SUMMARY_MESSAGES[check].format(count=count) if check in SUMMARY_MESSAGES
+            else self.first_violation(check)["message"]
+            for check, count in self.failed_checks().items()
+        ))
+
+
+class FusedCandlestickValidator:
+    """
+    融合 K 线验证器
+
+    TestHelpers.validate_candlestick_data + validate_data_completeness 会对数据遍历 8 次以上，
+    每次重复取字段、转换 float，并各自打开 allure.step。
+    这里在一次遍历中计算所有启用的检查，收集全部违规后统一报告，只写一个 Allure 附件。
+    """
+
+    @staticmethod
+    def _number(candle: Dict[str, Any], short: str, long: str, convert=float):
+        """取字段并转换（字段名规则与单项验证器相同），失败返回 None"""
+        try:
+            return convert(candle.get(short) or candle.get(long))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def validate(
+            data: List[Dict[str, Any]],
+            min_price: float = None,
+            max_price: float = None,
+            expected_interval: int = None,
+            tolerance: int = None,
+            max_count: int = None,
+            exact_count: int = None,
+            required_fields: List[Tuple[str, str]] = None,
+            check_structure: bool = True,
+            check_price_logic: bool = True,
+            check_timestamps_order: bool = True,
+            check_null_values: bool = True,
+            check_duplicate_timestamps: bool = True,
+            check_consistency: bool = True,
+            logger=None
+    ) -> ValidationResult:
+        """
+        一次遍历执行全部启用的检查
+
+        Args:
+            data: K线数据列表
+            min_price / max_price: 收盘价范围（validate_price_range）
+            expected_interval / tolerance: 时间间隔（validate_time_interval，容差默认 10%）
+            max_count / exact_count: 数据数量（validate_data_count）
+            required_fields: 必需字段（validate_no_missing_fields），None 表示不检查
+            check_structure: 前 3 条的字段结构（validate_candlestick_structure）
+            check_price_logic: 价格逻辑（validate_price_logic）
+            check_timestamps_order: 时间戳顺序（validate_timestamps_order）
+            check_null_values: 无空值（validate_no_null_values）
+            check_duplicate_timestamps: 无重复时间戳（validate_no_duplicate_timestamps）
+            check_consistency: 字段结构一致（validate_data_consistency）
+            logger: 日志记录器
+
+        Returns:
+            ValidationResult: 验证结果（不抛出断言，调用方用 assert_passed() 判定）
+        """
+        check_range = min_price is not None or max_price is not None
+        check_interval = expected_interval is not None
+        check_count = max_count is not None or exact_count is not None
+        check_missing = required_fields is not None
+        need_timestamps = check_timestamps_order or check_interval or check_duplicate_timestamps
+        # 无法解析的时间戳/收盘价：单项验证器会抛出异常，这里记为违规而不是跳过
+        # （价格逻辑检查开启时收盘价无效已记在 price_logic 中）
+        check_bad_values = need_timestamps or (check_range and not check_price_logic)
+
+        enabled = [
+            ("structure", check_structure),
+            ("price_logic", check_price_logic),
+            ("timestamps_order", check_timestamps_order),
+            ("price_range", check_range),
+            ("time_interval", check_interval),
+            ("data_count", check_count),
+            ("missing_fields", check_missing),
+            ("null_values", check_null_values),
+            ("duplicate_timestamps", check_duplicate_timestamps),
+            ("consistency", check_consistency),
+            ("bad_value", check_bad_values),
+        ]
+        result = ValidationResult([name for name, on in enabled if on], len(data))
+        if check_interval and tolerance is None:
+            tolerance = expected_interval * 0.1  # 默认允许 10% 误差
+
+        number = FusedCandlestickValidator._number
+
+        ascending = descending = True
+        previous_ts = None
+        valid_intervals = interval_count = 0
+        seen_timestamps = set()
+        duplicate_count = 0
+        first_fields = None
+
+        with allure.step(f"K线数据融合验证（{len(result.checks)} 项检查）"):
+            for i, candle in enumerate(data):
+                # 字段结构
+                if check_structure and i < STRUCTURE_SAMPLE_SIZE:
+                    for field1, field2 in STANDARD_FIELDS:
+                        if field1 not in candle and field2 not in candle:
+                            result.add("structure", f"Candle {i} should have '{field1}' or '{field2}' field", i)
+
+                if check_missing:
+                    for field1, field2 in required_fields:
+                        if field1 not in candle and field2 not in candle:
+                            result.add("missing_fields", f"Candle {i} 缺失字段: {field1}/{field2}", i)
+
+                if check_null_values:
+                    for field, value in candle.items():
+                        if value is None:
+                            result.add("null_values", f"Candle {i} 字段 '{field}' 为空值", i)
+
+                if check_consistency:
+                    fields = set(candle.keys())
+                    if first_fields is None:
+                        first_fields = fields
+                    elif fields != first_fields:
+                        result.add(
+                            "consistency",
+                            f"Candle {i} has different fields: {fields.symmetric_difference(first_fields)}", i
+                        )
+
+                # 价格：每条只转换一次
+                if check_price_logic or check_range:
+                    close_price = number(candle, "c", "close")
+
+                    if check_price_logic:
+                        open_price = number(candle, "o", "open")
+                        high_price = number(candle, "h", "high")
+                        low_price = number(candle, "l", "low")
+                        volume = number(candle, "v", "volume")
+
+                        if None in (open_price, high_price, low_price, close_price, volume):
+                            result.add("price_logic", f"Candle {i}: price or volume is missing or invalid", i)
+                        else:
+                            for ok, message in (
+                                (high_price >= open_price, f"high ({high_price}) should >= open ({open_price})"),
+                                (high_price >= close_price, f"high ({high_price}) should >= close ({close_price})"),
+                                (high_price >= low_price, f"high ({high_price}) should >= low ({low_price})"),
+                                (low_price <= open_price, f"low ({low_price}) should <= open ({open_price})"),
+                                (low_price <= close_price, f"low ({low_price}) should <= close ({close_price})"),
+                                (open_price > 0, "open price should > 0"),
+                                (high_price > 0, "high price should > 0"),
+                                (low_price > 0, "low price should > 0"),
+                                (close_price > 0, "close price should > 0"),
+                                (volume >= 0, "volume should >= 0"),
+                            ):
+                                if not ok:
+                                    result.add("price_logic", f"Candle {i}: {message}", i)
+
+                    if check_range and close_price is None and not check_price_logic:
+                        result.add("bad_value", f"Candle {i}: invalid close price "
+                                                f"{candle.get('c') or candle.get('close')!r}", i)
+                    elif check_range and close_price is not None:
+                        if min_price is not None and not close_price >= min_price:
+                            result.add("price_range", f"Candle {i}: price {close_price} < min {min_price}", i)
+                        if max_price is not None and not close_price <= max_price:
+                            result.add("price_range", f"Candle {i}: price {close_price} > max {max_price}", i)
+
+                # 时间戳：顺序、间隔、重复
+                if need_timestamps:
+                    timestamp = number(candle, "t", "timestamp", convert=int)
+                    if timestamp is None:
+                        result.add("bad_value", f"Candle {i}: invalid timestamp "
+                                                f"{candle.get('t') or candle.get('timestamp')!r}", i)
+                        continue
+
+                    if previous_ts is not None:
+                        ascending = ascending and previous_ts <= timestamp
+                        descending = descending and previous_ts >= timestamp
+                        interval_count += 1
+                        if check_interval and abs(abs(timestamp - previous_ts) - expected_interval) <= tolerance:
+                            valid_intervals += 1
+                    previous_ts = timestamp
+
+                    if check_duplicate_timestamps:
+                        if timestamp in seen_timestamps:
+                            duplicate_count += 1
+                        else:
+                            seen_timestamps.add(timestamp)
+
+            # 整体检查
+            if check_timestamps_order and interval_count and not (ascending or descending):
+                result.add("timestamps_order", "Timestamps should be in order (ascending or descending)")
+            if check_timestamps_order and interval_count:
+                result.metrics["order"] = "ascending" if ascending else "descending" if descending else "unordered"
+
+            if check_interval and interval_count:
+                consistency_rate = valid_intervals / interval_count * 100
+                result.metrics["interval_consistency_rate"] = round(consistency_rate, 1)
+                if consistency_rate < 80:
+                    result.add("time_interval", f"Time interval consistency rate {consistency_rate:.1f}% < 80%")
+
+            if check_count:
+                if exact_count is not None and len(data) != exact_count:
+                    result.add("data_count", f"Data count should = {exact_count}, got {len(data)}")
+                elif exact_count is None and len(data) > max_count:
+                    result.add("data_count", f"Data count should <= {max_count}, got {len(data)}")
+
+            if check_duplicate_timestamps and duplicate_count:
+                result.metrics["duplicate_timestamps"] = duplicate_count
+                result.add("duplicate_timestamps", f"Found {duplicate_count} duplicate timestamps")
+
+            result.attach()
+
+        if logger:
+            if result.passed:
+                logger.info(f"✓ K线数据融合验证通过（{len(data)} 条数据，{len(result.checks)} 项检查）")
+            else:
+                logger.error(f"❌ K线数据融合验证失败: {result.failed_checks()}")
+
+        return result
@@ -0,0 +1,182 @@
+"""
+utils/http_adapter.py
+HTTP 连接池与重试配置（requests + urllib3），以及按阶段计时的连接类
+"""
+import time
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from config.config import Config
+
+
+# ==================== 按阶段计时的连接 ====================
+
+class TimedConnectionMixin:
+    """
+    在 urllib3 连接的各个阶段记录耗时（perf_counter_ns）
+
+    - connect: DNS 解析 + TCP 建连（直连时为到交易所，走代理时为到代理）
+    - proxy_tunnel: 代理 CONNECT 隧道
+    - tls: TLS 握手（connect() 总耗时减去上面两项）
+    - send: 发送请求行、请求头
+    - ttfb: 请求发出到响应头解析完成（服务端处理 + 一个往返）
+
+    复用的 keep-alive 连接没有 connect / proxy_tunnel / tls。
+    每次 getresponse() 把本次请求的计时挂到响应对象的 phase_timings_ns 上，然后清零。
+    """
+
+    def _record_phase(self, phase: str, start_ns: int):
+        timings = self.__dict__.setdefault("_phase_timings_ns", {})
+        timings[phase] = timings.get(phase, 0) + time.perf_counter_ns() - start_ns
+
+    def _new_conn(self):
+        start = time.perf_counter_ns()
+        sock = super()._new_conn()
+        self._record_phase("connect", start)
+        return sock
+
+    def _tunnel(self):
+        start = time.perf_counter_ns()
+        super()._tunnel()
+        self._record_phase("proxy_tunnel", start)
+
+    def connect(self):
+        start = time.perf_counter_ns()
+        super().connect()
+        self._record_phase("connect_total", start)
+
+    def request(self, *args, **kwargs):
+        start = time.perf_counter_ns()
+        super().request(*args, **kwargs)
+        self._record_phase("send", start)
+        self._sent_at_ns = time.perf_counter_ns()
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        timings = self.__dict__.pop("_phase_timings_ns", {})
+        timings["ttfb"] = time.perf_counter_ns() - self.__dict__.pop("_sent_at_ns", time.perf_counter_ns())
+
+        connect_total = timings.pop("connect_total", None)
+        if connect_total is not None:
+            timings["tls"] = max(0, connect_total - timings.get("connect", 0) - timings.get("proxy_tunnel", 0))
+        timings["reused_connection"] = connect_total is None
+
+        response.phase_timings_ns = timings
+        return response
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+TIMED_POOL_CLASSES = {
+    "http": TimedHTTPConnectionPool,
+    "https": TimedHTTPSConnectionPool,
+}
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """直连与代理连接池都使用计时连接类"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        # pool_classes_by_scheme 默认指向模块级字典，替换为本实例自己的映射
+        self.poolmanager.pool_classes_by_scheme = dict(TIMED_POOL_CLASSES)
+        self.poolmanager.key_fn_by_scheme = dict(self.poolmanager.key_fn_by_scheme)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        manager.pool_classes_by_scheme = dict(TIMED_POOL_CLASSES)
+        return manager
+
+
+def get_phase_timings(response: requests.Response) -> Dict[str, Any]:
+    """
+    读取本次请求在连接层记录的阶段耗时（毫秒）
+
+    Args:
+        response: requests 响应（需在读取响应体之前调用）
+
+    Returns:
+        Dict: connect_ms / proxy_tunnel_ms / tls_ms / send_ms / ttfb_ms 与 reused_connection，
+              未使用计时连接时为空字典
+    """
+    timings: Optional[Dict[str, Any]] = getattr(response.raw, "phase_timings_ns", None)
+    if timings is None:
+        return {}
+
+    result = {f"{phase}_ms": timings.get(phase, 0) / 1e6 for phase in ("connect", "proxy_tunnel", "tls", "send", "ttfb")}
+    result["reused_connection"] = timings["reused_connection"]
+    return result
+
+
+def build_retry() -> Retry:
+    """
+    构建重试策略
+
+    - 只重试幂等的 GET
+    - 连接失败 / 连接被重置 / 读取失败，以及 Config.RETRY_STATUS_CODES 中的状态码（429、5xx）
+    - 指数退避：backoff_factor * 2^(n-1) 秒；429/503 带 Retry-After 时按服务端要求等待
+    - 重试耗尽后返回最后一次的响应，不抛出异常（由调用方按状态码断言）
+    """
+    return Retry(
+        total=Config.MAX_RETRIES,
+        connect=Config.MAX_RETRIES,
+        read=Config.MAX_RETRIES,
+        status=Config.MAX_RETRIES,
+        redirect=0,
+        allowed_methods=frozenset(["GET"]),
+        status_forcelist=Config.RETRY_STATUS_CODES,
+        backoff_factor=Config.RETRY_BACKOFF_FACTOR,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def create_session() -> requests.Session:
+    """
+    创建带连接池与重试策略的会话
+
+    Returns:
+        requests.Session: http:// 与 https:// 均挂载同一个 TimedHTTPAdapter，连接 keep-alive 复用
+    """
+    adapter = TimedHTTPAdapter(
+        pool_connections=Config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+        max_retries=build_retry(),
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_retry_count(response: requests.Response) -> int:
+    """
+    响应经历的重试次数
+
+    Args:
+        response: requests 响应
+
+    Returns:
+        int: 重试次数（urllib3 Retry.history 的长度）
+    """
+    retries = getattr(response.raw, "retries", None)
+    return len(retries.history) if retries is not None else 0
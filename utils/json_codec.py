@@ -0,0 +1,97 @@
+"""
+utils/json_codec.py
+JSON 编解码器 - 优先使用已安装的高性能实现（orjson / simdjson / ujson），否则回退到标准库 json
+"""
+import json
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from config.config import Config
+
+
+# 各实现的解析错误都是 ValueError 的子类（json.JSONDecodeError 同样如此）
+DecodeError = ValueError
+
+
+class JsonCodec:
+    """一种 JSON 实现：loads 接受 str / bytes，dumps 始终返回 str（WebSocket 需要文本帧）"""
+
+    def __init__(self, name: str, loads: Callable[[Union[str, bytes]], Any], dumps: Callable[[Any], str]):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self):
+        return f"JsonCodec({self.name})"
+
+
+def _build_backends() -> Dict[str, JsonCodec]:
+    """按优先级探测已安装的实现"""
+    backends: Dict[str, JsonCodec] = {}
+
+    try:
+        import orjson
+        backends["orjson"] = JsonCodec("orjson", orjson.loads, lambda obj: orjson.dumps(obj).decode("utf-8"))
+    except ImportError:
+        pass
+
+    try:
+        import simdjson
+        backends["simdjson"] = JsonCodec("simdjson", simdjson.loads, json.dumps)
+    except ImportError:
+        pass
+
+    try:
+        import ujson
+        backends["ujson"] = JsonCodec("ujson", ujson.loads, ujson.dumps)
+    except ImportError:
+        pass
+
+    backends["json"] = JsonCodec("json", json.loads, json.dumps)
+    return backends
+
+
+_BACKENDS = _build_backends()
+
+
+def available_backends() -> List[str]:
+    """已安装的实现名称（按优先级排序）"""
+    return list(_BACKENDS)
+
+
+def get_codec(name: Optional[str] = None) -> JsonCodec:
+    """
+    获取编解码器
+
+    Args:
+        name: 实现名称，None 或 "auto" 表示按 Config.JSON_CODEC 选择，仍为 auto 时取优先级最高的实现
+
+    Returns:
+        JsonCodec: 编解码器
+
+    Raises:
+        ValueError: 指定的实现未安装
+    """
+    name = name or Config.JSON_CODEC
+    if name == "auto":
+        return next(iter(_BACKENDS.values()))
+    if name not in _BACKENDS:
+        raise ValueError(f"JSON 实现 '{name}' 未安装（可用: {available_backends()}）")
+    return _BACKENDS[name]
+
+
+_codec = get_codec()
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """使用当前编解码器解析 JSON"""
+    return _codec.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """使用当前编解码器序列化为 JSON 字符串"""
+    return _codec.dumps(obj)
+
+
+def codec_name() -> str:
+    """当前编解码器名称"""
+    return _codec.name
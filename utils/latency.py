@@ -0,0 +1,89 @@
+"""
+utils/latency.py
+固定内存的延迟直方图（对数分桶，相对误差约 1%）
+"""
+import math
+from typing import Dict, Any, Optional
+
+
+class LatencyHistogram:
+    """
+    延迟直方图
+
+    按对数分桶计数，内存占用与样本数量无关：
+    - 第 i 个桶覆盖 [min_value * r^i, min_value * r^(i+1))，r = 1 + precision
+    - 小于 min_value（含负数，如本地时钟慢于交易所）计入下溢桶，大于 max_value 计入最后一个桶
+    - 分位数取所在桶的几何中点，并限制在实际最小/最大值之间
+    """
+
+    def __init__(self, min_value: float = 0.001, max_value: float = 100_000.0, precision: float = 0.01):
+        """
+        Args:
+            min_value: 最小可分辨的值（毫秒）
+            max_value: 最大可分辨的值（毫秒）
+            precision: 相对精度（桶宽度）
+        """
+        self.min_value = min_value
+        self._log_base = math.log1p(precision)
+        self._bucket_count = int(math.ceil(math.log(max_value / min_value) / self._log_base)) + 1
+        self._buckets = [0] * self._bucket_count
+        self._underflow = 0
+
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, value: float):
+        """记录一个样本（毫秒）"""
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        if value < self.min_value:
+            self._underflow += 1
+            return
+        index = int(math.log(value / self.min_value) / self._log_base)
+        self._buckets[min(index, self._bucket_count - 1)] += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        分位数
+
+        Args:
+            p: 百分位（0-100），如 99.9
+
+        Returns:
+            float: 近似分位值（毫秒），无样本返回 None
+        """
+        if self.count == 0:
+            return None
+
+        rank = max(1, int(math.ceil(self.count * p / 100)))
+        seen = self._underflow
+        if seen >= rank:
+            return self.min
+
+        for index, bucket in enumerate(self._buckets):
+            seen += bucket
+            if seen >= rank:
+                if index == self._bucket_count - 1:
+                    return self.max
+                midpoint = self.min_value * math.exp((index + 0.5) * self._log_base)
+                return min(max(midpoint, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """样本数、最小/最大/平均值和 p50/p99/p999"""
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+        }
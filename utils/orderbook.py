@@ -0,0 +1,213 @@
+"""
+utils/orderbook.py
+本地订单簿引擎（适配 Crypto.com SNAPSHOT_AND_UPDATE 订阅）
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class PriceLevels:
+    """
+    单边价位簿
+
+    价格保存在升序列表中（二分查找定位），档位数据保存在 {price: level} 字典中：
+    - 查找 / 更新已有价位: O(1)
+    - 新增 / 删除价位: O(log n) 定位 + 连续内存移动
+    - 最优价: 列表首尾，O(1)
+    """
+
+    def __init__(self, descending: bool):
+        """
+        Args:
+            descending: True 表示买盘（最优价为最高价），False 表示卖盘
+        """
+        self.descending = descending
+        self._prices: List[float] = []
+        self._levels: Dict[float, List[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def clear(self):
+        self._prices.clear()
+        self._levels.clear()
+
+    def apply(self, level: List[Any]):
+        """
+        应用一个价位 [price, quantity, number_of_orders]，数量为 0 表示删除该价位
+        """
+        price = float(level[0])
+        quantity = float(level[1])
+
+        if quantity == 0:
+            if self._levels.pop(price, None) is not None:
+                index = bisect_left(self._prices, price)
+                del self._prices[index]
+            return
+
+        if price not in self._levels:
+            insort(self._prices, price)
+        self._levels[price] = level
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        """最优价位 (price, quantity)，空盘返回 None"""
+        if not self._prices:
+            return None
+        price = self._prices[-1] if self.descending else self._prices[0]
+        return price, float(self._levels[price][1])
+
+    def top(self, n: Optional[int] = None) -> List[List[Any]]:
+        """从最优价开始的前 n 档（原始档位格式）"""
+        prices = reversed(self._prices) if self.descending else iter(self._prices)
+        result = []
+        for price in prices:
+            if n is not None and len(result) >= n:
+                break
+            result.append(self._levels[price])
+        return result
+
+
+class OrderBook:
+    """
+    本地订单簿
+
+    用 book 快照初始化，再按顺序应用 book.update 增量：
+    - 快照: result.channel == "book"，data[0] = {"bids", "asks", "t", "u"}
+    - 增量: result.channel == "book.update"，data[0] = {"update": {"bids", "asks"}, "t", "u", "pu"}
+
+    增量的 pu 必须等于上一条消息的 u，否则视为序列号不连续，
+    订单簿进入未同步状态，需要等待下一次快照。
+    """
+
+    def __init__(self, instrument_name: str, depth: Optional[int] = None, strict: bool = False):
+        """
+        Args:
+            instrument_name: 合约名称
+            depth: 订阅深度（用于 bids/asks 默认截取档数）
+            strict: True 时序列号不连续直接抛出 AssertionError
+        """
+        self.instrument_name = instrument_name
+        self.depth = depth
+        self.strict = strict
+
+        self.bids_side = PriceLevels(descending=True)
+        self.asks_side = PriceLevels(descending=False)
+
+        self.last_sequence: Optional[int] = None
+        self.timestamp: Optional[int] = None
+        self.synced = False
+
+        self.stats = {
+            "snapshots": 0,
+            "updates": 0,
+            "sequence_gaps": 0,
+            "skipped_updates": 0,
+        }
+
+    # ==================== 消息应用 ====================
+
+    def apply_message(self, message: Dict[str, Any]) -> bool:
+        """
+        应用一条推送消息（快照或增量）
+
+        Returns:
+            bool: 所有数据是否都已成功应用
+        """
+        result = message.get("result", {})
+        is_update = result.get("channel") == "book.update"
+
+        applied = True
+        for entry in result.get("data", []):
+            if is_update:
+                applied = self.apply_update(entry) and applied
+            else:
+                self.apply_snapshot(entry)
+        return applied
+
+    def apply_snapshot(self, entry: Dict[str, Any]):
+        """用全量快照重建订单簿"""
+        self.bids_side.clear()
+        self.asks_side.clear()
+
+        for level in entry.get("bids", []):
+            self.bids_side.apply(level)
+        for level in entry.get("asks", []):
+            self.asks_side.apply(level)
+
+        self.last_sequence = entry.get("u")
+        self.timestamp = entry.get("t")
+        self.synced = True
+        self.stats["snapshots"] += 1
+
+    def apply_update(self, entry: Dict[str, Any]) -> bool:
+        """
+        应用增量更新
+
+        Returns:
+            bool: 是否应用成功（未同步或序列号不连续时返回 False）
+        """
+        if not self.synced:
+            self.stats["skipped_updates"] += 1
+            return False
+
+        previous = entry.get("pu")
+        if previous is not None and self.last_sequence is not None and previous != self.last_sequence:
+            self.stats["sequence_gaps"] += 1
+            self.synced = False
+            error_text = (f"{self.instrument_name} 订单簿序列号不连续"
+                          f"（上一条 u: {self.last_sequence}, 本条 pu: {previous}）")
+            if self.strict:
+                raise AssertionError(error_text)
+            return False
+
+        update = entry.get("update", {})
+        for level in update.get("bids", []):
+            self.bids_side.apply(level)
+        for level in update.get("asks", []):
+            self.asks_side.apply(level)
+
+        self.last_sequence = entry.get("u", self.last_sequence)
+        self.timestamp = entry.get("t", self.timestamp)
+        self.stats["updates"] += 1
+        return True
+
+    # ==================== 查询 ====================
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        """买一 (price, quantity)"""
+        return self.bids_side.best()
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        """卖一 (price, quantity)"""
+        return self.asks_side.best()
+
+    def spread(self) -> Optional[float]:
+        """买卖价差，任一边为空返回 None"""
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def is_crossed(self) -> bool:
+        """买一价 >= 卖一价（订单簿倒挂）"""
+        spread = self.spread()
+        return spread is not None and spread <= 0
+
+    def bids(self, n: Optional[int] = None) -> List[List[Any]]:
+        """买盘前 n 档（默认订阅深度）"""
+        return self.bids_side.top(n if n is not None else self.depth)
+
+    def asks(self, n: Optional[int] = None) -> List[List[Any]]:
+        """卖盘前 n 档（默认订阅深度）"""
+        return self.asks_side.top(n if n is not None else self.depth)
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        """
+        导出为与 book 推送 data[0] 相同的结构，可直接交给 WebSocketValidator 校验
+        """
+        return {
+            "bids": self.bids(),
+            "asks": self.asks(),
+            "t": self.timestamp,
+            "u": self.last_sequence,
+        }
@@ -0,0 +1,242 @@
+"""
+utils/orderbook_validator.py
+快速订单簿验证器 - 每边只解析一次为定长数组，向量化检查排序与倒挂，用计数器代替逐条日志
+"""
+import logging
+from array import array
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 没有 NumPy 时使用标准库 array 逐元素检查
+    np = None
+
+
+# 失败类型（计数器的键）
+FAILURE_TYPES = (
+    "malformed",        # 缺少 bids/asks/t 或类型错误
+    "empty_side",       # 买盘或卖盘为空
+    "depth_exceeded",   # 档位数超过订阅深度
+    "bad_level",        # 档位不是 [price, quantity] / [price, quantity, count]，或无法转换为数字
+    "non_positive",     # 价格或数量 <= 0
+    "bids_unsorted",    # 买盘未按价格降序
+    "asks_unsorted",    # 卖盘未按价格升序
+    "crossed",          # 买一价 >= 卖一价
+    "bad_timestamp",    # 时间戳缺失或 <= 0
+)
+
+
+class FastOrderBookValidator:
+    """
+    快速订单簿验证器
+
+    WebSocketValidator.validate_orderbook_data 对每个价格最多调用三次 float()，
+    validate_orderbook_content 再解析一遍，并且每个快照都打印 INFO 日志。
+    这里每边只解析一次（有 NumPy 时整边一次转换为 float64 数组），
+    排序与倒挂检查为数组比较，结果累计到计数器中，可以对深度 150 的每条推送做验证。
+
+    档位格式支持 [price, quantity] 和 Crypto.com 的 [price, quantity, number_of_orders]。
+    """
+
+    def __init__(self, expected_depth: Optional[int] = None):
+        """
+        Args:
+            expected_depth: 订阅深度，档位数超过时计为 depth_exceeded；None 表示不检查
+        """
+        self.expected_depth = expected_depth
+        self.logger = self._setup_logger()
+        self.reset()
+
+    def _setup_logger(self):
+        """设置日志"""
+        logger = logging.getLogger(__name__)
+        logger.setLevel(logging.INFO)
+
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+
+        return logger
+
+    def reset(self):
+        """清空计数器"""
+        self.stats = {
+            "books": 0,
+            "levels": 0,
+            "failed_books": 0,
+            "failures": {name: 0 for name in FAILURE_TYPES},
+        }
+
+    # ==================== 解析 ====================
+
+    @staticmethod
+    def parse_side(levels: List[List[Any]]) -> Tuple[Any, Any]:
+        """
+        把一边的档位解析为 (价格数组, 数量数组)
+
+        Raises:
+            ValueError: 档位格式错误或无法转换为数字（信息包含档位序号）
+        """
+        if np is not None:
+            try:
+                parsed = np.asarray(levels, dtype=np.float64)
+            except (TypeError, ValueError):
+                parsed = None  # 长度不一致或含非数字，逐档定位错误
+            if parsed is not None and parsed.ndim == 2 and parsed.shape[1] in (2, 3):
+                return parsed[:, 0], parsed[:, 1]
+
+        prices, quantities = array("d"), array("d")
+        for j, level in enumerate(levels):
+            if not isinstance(level, (list, tuple)) or len(level) not in (2, 3):
+                raise ValueError(f"档位 {j} 应该是 [price, quantity] 或 [price, quantity, count]: {level!r}")
+            try:
+                prices.append(float(level[0]))
+                quantities.append(float(level[1]))
+            except (TypeError, ValueError):
+                raise ValueError(f"档位 {j} 价格或数量无法转换为数字: {level!r}")
+        if np is not None:
+            return np.frombuffer(prices, dtype=np.float64), np.frombuffer(quantities, dtype=np.float64)
+        return prices, quantities
+
+    @staticmethod
+    def _first_position(values, descending: bool) -> Optional[int]:
+        """第一个破坏排序的位置 j（values[j] 与 values[j + 1] 顺序错误），有序返回 None"""
+        if np is not None and isinstance(values, np.ndarray):
+            wrong = values[1:] > values[:-1] if descending else values[1:] < values[:-1]
+            hits = np.flatnonzero(wrong)
+            return int(hits[0]) if hits.size else None
+        for j in range(len(values) - 1):
+            if (values[j + 1] > values[j]) if descending else (values[j + 1] < values[j]):
+                return j
+        return None
+
+    @staticmethod
+    def _all_positive(values) -> bool:
+        if np is not None and isinstance(values, np.ndarray):
+            return bool((values > 0).all())
+        return all(value > 0 for value in values)
+
+    # ==================== 验证 ====================
+
+    @staticmethod
+    def _books(message: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """推送消息取 result.data，订单簿数据本身直接返回"""
+        if isinstance(message, dict) and "bids" not in message and "result" in message:
+            return message.get("result", {}).get("data", []) or []
+        return [message]
+
+    def check_book(self, book: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """
+        检查一个订单簿并更新计数器
+
+        Returns:
+            List: [(失败类型, 说明)]，通过时为空
+        """
+        failures: List[Tuple[str, str]] = []
+        self.stats["books"] += 1
+
+        if not isinstance(book, dict) or not isinstance(book.get("bids"), list) \
+                or not isinstance(book.get("asks"), list):
+            failures.append(("malformed", "订单簿数据应该是包含 bids/asks 列表的字典"))
+        else:
+            bids, asks = book["bids"], book["asks"]
+            self.stats["levels"] += len(bids) + len(asks)
+            sides = {}
+
+            for side, levels, name in (("bids", bids, "买单"), ("asks", asks, "卖单")):
+                if not levels:
+                    failures.append(("empty_side", f"{name}数据为空"))
+                    continue
+                if self.expected_depth and len(levels) > self.expected_depth:
+                    failures.append((
+                        "depth_exceeded", f"{name}深度超出预期（预期: {self.expected_depth}, 实际: {len(levels)}）"
+                    ))
+                try:
+                    prices, quantities = self.parse_side(levels)
+                except ValueError as e:
+                    failures.append(("bad_level", f"{name}{e}"))
+                    continue
+                if not (self._all_positive(prices) and self._all_positive(quantities)):
+                    failures.append(("non_positive", f"{name}价格和数量应该大于 0"))
+                sides[side] = prices
+
+            for side, descending, failure, name, order in (
+                    ("bids", True, "bids_unsorted", "买单", "降序"),
+                    ("asks", False, "asks_unsorted", "卖单", "升序"),
+            ):
+                prices = sides.get(side)
+                if prices is None:
+                    continue
+                j = self._first_position(prices, descending)
+                if j is not None:
+                    failures.append((
+                        failure,
+                        f"{name}价格应该{order}排列（位置 {j}: {prices[j]}, 位置 {j + 1}: {prices[j + 1]}）"
+                    ))
+
+            if "bids" in sides and "asks" in sides and not sides["bids"][0] < sides["asks"][0]:
+                failures.append((
+                    "crossed", f"最高买价应该小于最低卖价（买: {sides['bids'][0]}, 卖: {sides['asks'][0]}）"
+                ))
+
+            try:
+                timestamp_ok = int(book.get("t")) > 0
+            except (TypeError, ValueError):
+                timestamp_ok = False
+            if not timestamp_ok:
+                failures.append(("bad_timestamp", f"时间戳应该是大于 0 的整数（实际: {book.get('t')!r}）"))
+
+        if failures:
+            self.stats["failed_books"] += 1
+            for failure, _ in failures:
+                self.stats["failures"][failure] += 1
+        return failures
+
+    def check(self, message: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """
+        检查一条推送消息（或订单簿数据）中的全部订单簿
+
+        Returns:
+            List: [(失败类型, 说明)]
+        """
+        books = self._books(message)
+        if not books:
+            self.stats["failed_books"] += 1
+            self.stats["failures"]["malformed"] += 1
+            return [("malformed", "推送消息中没有订单簿数据")]
+
+        failures = []
+        for book in books:
+            failures.extend(self.check_book(book))
+        return failures
+
+    def validate(self, message: Dict[str, Any]) -> bool:
+        """
+        检查并在失败时抛出 AssertionError（信息为第一项失败）
+
+        Raises:
+            AssertionError: 验证失败
+        """
+        failures = self.check(message)
+        if failures:
+            raise AssertionError(f"❌ 订单簿验证失败 [{failures[0][0]}]: {failures[0][1]}")
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """验证计数（只包含出现过的失败类型）"""
+        return {
+            **self.stats,
+            "failures": {name: count for name, count in self.stats["failures"].items() if count},
+        }
+
+    def log_stats(self, logger=None):
+        """输出一行汇总日志"""
+        stats = self.get_stats()
+        (logger or self.logger).info(
+            f"📊 订单簿验证: {stats['books']} 个快照, {stats['levels']} 个档位, "
+            f"失败 {stats['failed_books']} 个 {stats['failures'] or ''}"
+        )
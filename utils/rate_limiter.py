@@ -0,0 +1,205 @@
+"""
+utils/rate_limiter.py
+令牌桶限流 - 按端点 / WS 方法共享，线程、协程与多进程（pytest-xdist）均可使用
+"""
+import asyncio
+import logging
+import os
+import struct
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from config.config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows：没有 flock，退回进程内限流
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    令牌桶
+
+    以 rate 个/秒的速度补充令牌，最多积累 capacity 个（允许的突发量）。
+    采用预约方式：取令牌时立即扣减（余额可以为负），调用方按欠额等待，
+    因此多个线程/协程按到达顺序排队，整体速率不超过 rate。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: 每秒补充的令牌数（即持续请求速率）
+            capacity: 桶容量（突发量），None 表示等于 rate
+        """
+        if rate <= 0:
+            raise ValueError(f"令牌补充速率必须大于 0: {rate}")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "acquired": 0,
+            "waited": 0,
+            "total_wait_s": 0.0,
+        }
+
+    def _take(self, tokens: float, available: float, updated: float, now: float):
+        """
+        补充并扣减令牌
+
+        Returns:
+            (剩余令牌, 需要等待的秒数)
+        """
+        available = min(self.capacity, available + max(0.0, now - updated) * self.rate) - tokens
+        wait = -available / self.rate if available < 0 else 0.0
+
+        self.stats["acquired"] += 1
+        if wait > 0:
+            self.stats["waited"] += 1
+            self.stats["total_wait_s"] += wait
+        return available, wait
+
+    def _reserve(self, tokens: float) -> float:
+        """扣减令牌并返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens, wait = self._take(tokens, self._tokens, self._updated, now)
+            self._updated = now
+            return wait
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        获取令牌（阻塞当前线程直到可用）
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """
+        获取令牌（协程版本，等待期间不阻塞事件循环）
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        """限流统计"""
+        return {**self.stats, "rate": self.rate, "capacity": self.capacity}
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    跨进程共享的令牌桶
+
+    桶状态（剩余令牌、上次更新时间）保存在 state_dir 下以 key 命名的文件中，
+    每次取令牌时用 flock 加排他锁读改写，所有进程（如 xdist worker）共用同一个速率。
+    时间使用 time.time()，因为 monotonic 时钟在进程之间不可比较。
+    """
+
+    _STATE = struct.Struct("dd")
+
+    def __init__(self, key: str, rate: float, capacity: Optional[float] = None, state_dir: Optional[str] = None):
+        """
+        Args:
+            key: 限流键（如 rest:candlestick、ws:subscribe），同一个键的所有进程共享速率
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（突发量），None 表示等于 rate
+            state_dir: 状态文件目录，None 表示使用 Config.RATE_LIMIT_STATE_DIR
+        """
+        super().__init__(rate, capacity)
+        self.key = key
+        state_dir = state_dir or Config.RATE_LIMIT_STATE_DIR
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, key.replace(":", "_").replace("/", "_") + ".bucket")
+
+        self._fd: Optional[int] = None
+        self._fd_pid: Optional[int] = None
+
+    def _file(self) -> int:
+        """
+        打开状态文件（每个进程一个文件描述符）
+
+        flock 的锁属于打开的文件描述，fork 出的子进程若沿用父进程的描述符会共享锁，
+        因此进程号变化时重新打开。
+        """
+        if self._fd is None or self._fd_pid != os.getpid():
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+            self._fd_pid = os.getpid()
+        return self._fd
+
+    def _reserve(self, tokens: float) -> float:
+        """在文件锁内扣减令牌并返回需要等待的秒数"""
+        # flock 对同一进程内的线程不互斥，先用线程锁串行化
+        with self._lock:
+            fd = self._file()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(fd, self._STATE.size, 0)
+                now = time.time()
+                if len(raw) == self._STATE.size:
+                    available, updated = self._STATE.unpack(raw)
+                else:
+                    available, updated = self.capacity, now
+
+                available, wait = self._take(tokens, available, updated, now)
+                os.pwrite(fd, self._STATE.pack(available, now), 0)
+                return wait
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def close(self):
+        """关闭状态文件"""
+        if self._fd is not None and self._fd_pid == os.getpid():
+            os.close(self._fd)
+        self._fd = None
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str) -> Optional[TokenBucket]:
+    """
+    获取限流键对应的令牌桶（同一进程内所有客户端共用）
+
+    Config.RATE_LIMIT_SHARED 为 True 且系统支持 flock 时返回跨进程共享的 SharedTokenBucket，
+    否则返回进程内的 TokenBucket。
+
+    Args:
+        key: Config.RATE_LIMITS 中的限流键，REST 为 "rest:<端点>"，WebSocket 为 "ws:<方法>"
+
+    Returns:
+        TokenBucket: 令牌桶，Config.RATE_LIMITS 中未配置该键时返回 None
+    """
+    limit = Config.RATE_LIMITS.get(key)
+    if limit is None:
+        return None
+
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            if Config.RATE_LIMIT_SHARED and fcntl is not None:
+                bucket = SharedTokenBucket(key, rate=limit["rate"], capacity=limit.get("burst"))
+            else:
+                if Config.RATE_LIMIT_SHARED:
+                    logger.warning(f"⚠️ 当前系统不支持 flock，{key} 只在进程内限流")
+                bucket = TokenBucket(rate=limit["rate"], capacity=limit.get("burst"))
+            _buckets[key] = bucket
+        return bucket
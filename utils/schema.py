@@ -0,0 +1,200 @@
+"""
+utils/schema.py
+结构校验编译器 - 把声明式结构（字段、类型、嵌套列表）编译为专用的校验函数，错误信息包含精确路径
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+
+class SchemaError(AssertionError):
+    """结构校验失败（AssertionError 子类，与原有断言式验证器的异常类型一致）"""
+
+    def __init__(self, message: str, path: str):
+        super().__init__(message)
+        self.path = path
+
+
+_UNSET = object()
+
+
+class Field:
+    """
+    字段声明
+
+    spec 可以是：
+    - 类型或类型元组：isinstance 检查
+    - dict：{字段名: spec}，对象及其字段
+    - list：[spec]，列表，每个元素按 spec 检查（[] 表示只检查是列表）
+    - Field：带附加约束的 spec
+    """
+
+    def __init__(
+            self,
+            spec: Any,
+            required: bool = True,
+            nonempty: bool = False,
+            equals: Any = _UNSET,
+            message: Optional[str] = None,
+            type_message: Optional[str] = None,
+            empty_message: Optional[str] = None
+    ):
+        """
+        Args:
+            spec: 结构声明
+            required: 字段是否必须存在
+            nonempty: 列表/字典/字符串不能为空
+            equals: 值必须等于该常量
+            message: 字段缺失时的错误信息（默认 "<父路径> 缺少 <字段> 字段"）
+            type_message: 类型错误时的错误信息
+            empty_message: 为空时的错误信息
+        """
+        self.spec = spec
+        self.required = required
+        self.nonempty = nonempty
+        self.equals = equals
+        self.message = message
+        self.type_message = type_message
+        self.empty_message = empty_message
+
+
+class _Generator:
+    """生成校验函数源码"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.lines: List[str] = []
+        self.constants: Dict[str, Any] = {}
+        self.counter = 0
+
+    def name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def const(self, value: Any) -> str:
+        """常量作为闭包变量传入生成的函数，返回变量名（简单字面量直接内联）"""
+        if type(value) in (str, int, float, bool, type(None)):
+            return repr(value)
+        name = self.name("_c")
+        self.constants[name] = value
+        return name
+
+    def emit(self, indent: int, line: str):
+        self.lines.append("    " * indent + line)
+
+    def fail(self, indent: int, message_expr: str, path_expr: str):
+        self.emit(indent, f"raise SchemaError({message_expr}, {path_expr})")
+
+    @staticmethod
+    def _escape(text: str) -> str:
+        return text.replace("{", "{{").replace("}", "}}").replace('"', '\\"')
+
+    _TYPE_NAMES = {dict: "字典", list: "列表"}
+
+    @classmethod
+    def _type_name(cls, spec) -> str:
+        types = spec if isinstance(spec, tuple) else (spec,)
+        return " 或 ".join(cls._TYPE_NAMES.get(t, t.__name__) for t in types)
+
+    def node(self, spec: Any, var: str, path: str, indent: int):
+        """
+        生成一个节点的检查代码
+
+        Args:
+            spec: 结构声明
+            var: 当前值的变量名
+            path: 当前路径（f-string 片段，列表下标为 {i} 占位）
+            indent: 缩进层级
+        """
+        field = spec if isinstance(spec, Field) else Field(spec)
+        spec = field.spec
+        label = path or self.root
+        path_expr = f'f"{label}"'
+
+        if isinstance(spec, dict):
+            expected_type = dict
+        elif isinstance(spec, list):
+            expected_type = list
+        else:
+            expected_type = spec
+        type_name = self._type_name(expected_type)
+
+        # 声明了常量值时相等比较已经约束了取值，省去类型检查
+        if expected_type is not object and field.equals is _UNSET:
+            type_const = self.const(expected_type)
+            self.emit(indent, f"if not isinstance({var}, {type_const}):")
+            message = (repr(field.type_message) if field.type_message
+                       else f'f"{label} 应该是 {type_name}（实际: {{type({var}).__name__}}）"')
+            self.fail(indent + 1, message, path_expr)
+
+        if field.equals is not _UNSET:
+            value_const = self.const(field.equals)
+            self.emit(indent, f"if {var} != {value_const}:")
+            self.fail(indent + 1, f'f"{label} 应该是 {{{value_const}!r}}（实际: {{{var}!r}}）"', path_expr)
+
+        if field.nonempty:
+            self.emit(indent, f"if not {var}:")
+            message = repr(field.empty_message) if field.empty_message else f'f"{label} 不应为空"'
+            self.fail(indent + 1, message, path_expr)
+
+        if isinstance(spec, dict):
+            for key, child in spec.items():
+                child_field = child if isinstance(child, Field) else Field(child)
+                child_var = self.name("_v")
+                child_path = f"{path}.{self._escape(key)}" if path else self._escape(key)
+                key_const = repr(key)
+
+                if child_field.required:
+                    # 字段存在时 try 没有额外开销，比 .get() 少一次方法调用
+                    message = (repr(child_field.message) if child_field.message
+                               else f'f"{(path + " ") if path else ""}缺少 {self._escape(key)} 字段"')
+                    self.emit(indent, "try:")
+                    self.emit(indent + 1, f"{child_var} = {var}[{key_const}]")
+                    self.emit(indent, "except KeyError:")
+                    self.emit(indent + 1, f"raise SchemaError({message}, f\"{child_path}\") from None")
+                    self.node(child_field, child_var, child_path, indent)
+                else:
+                    self.emit(indent, f"{child_var} = {var}.get({key_const}, _UNSET)")
+                    self.emit(indent, f"if {child_var} is not _UNSET:")
+                    self.node(child_field, child_var, child_path, indent + 1)
+
+        elif isinstance(spec, list) and spec:
+            index, item = self.name("_i"), self.name("_v")
+            self.emit(indent, f"for {index}, {item} in enumerate({var}):")
+            self.node(spec[0], item, f"{path}[{{{index}}}]", indent + 1)
+
+
+def compile_schema(shape: Any, name: str = "validate", root: str = "消息") -> Callable[[Any], None]:
+    """
+    把结构声明编译为校验函数
+
+    生成的函数按声明顺序逐项检查，第一处不符合时抛出 SchemaError（信息包含路径，如
+    "result.data[3].bids 应该是列表（实际: dict）"），全部符合时返回 None。
+    生成的源码保存在函数的 __schema_source__ 属性中，便于排查。
+
+    Args:
+        shape: 结构声明（见 Field）
+        name: 生成的函数名
+        root: 顶层值的名称（用于顶层的错误信息）
+
+    Returns:
+        Callable: validate(value) -> None
+    """
+    generator = _Generator(root)
+    generator.node(shape, "value", "", 2)
+
+    # 外层工厂把常量和内置函数绑定为闭包变量，校验函数内部不再查找全局/内置命名空间
+    free_vars = ["SchemaError", "_UNSET", "isinstance", "type", "enumerate", *generator.constants]
+    source = "\n".join([
+        f"def _make_{name}({', '.join(free_vars)}):",
+        f"    def {name}(value):",
+        *generator.lines,
+        "        return None",
+        f"    return {name}",
+    ])
+
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<schema {name}>", "exec"), namespace)
+    function = namespace[f"_make_{name}"](
+        SchemaError, _UNSET, isinstance, type, enumerate, *generator.constants.values()
+    )
+    function.__schema_source__ = source
+    return function
@@ -0,0 +1,153 @@
+"""
+utils/stream_validator.py
+流式验证器 - 挂在 WebSocket 读取路径上逐帧验证，累计违规计数并保留有限的失败帧样本
+"""
+import asyncio
+import json
+import time
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+import allure
+
+from utils.orderbook_validator import FastOrderBookValidator
+
+
+class StreamingValidator:
+    """
+    流式验证器
+
+    作为帧监听器注册到 WebSocketClient（add_frame_listener），读取任务每收到一帧推送就调用一次：
+    - check(message) 返回 [(违规类型, 说明)]，通过时为空列表
+    - 累计帧数、失败帧数、各违规类型计数
+    - 只保留前 sample_size 个失败帧（内存占用固定）
+    - 用例用 wait() 等待 N 秒或 M 帧，然后用 assert_clean() 对整体结果断言
+
+    没有 result.data 的帧（订阅确认等）不参与验证，只计入 skipped。
+    check 抛出的异常记为 check_error 违规（该帧计为失败帧），不会被读取任务吞掉。
+    """
+
+    def __init__(
+            self,
+            check: Callable[[Dict[str, Any]], List[Tuple[str, str]]],
+            name: str = "stream",
+            sample_size: int = 5
+    ):
+        """
+        Args:
+            check: 单帧检查函数，返回 [(违规类型, 说明)]
+            name: 名称（日志与附件）
+            sample_size: 保留的失败帧样本数
+        """
+        self.check = check
+        self.name = name
+        self.sample_size = sample_size
+
+        self.frames = 0
+        self.failed_frames = 0
+        self.skipped = 0
+        self.violations: Dict[str, int] = {}
+        self.samples: List[Dict[str, Any]] = []
+        self.started_at = time.monotonic()
+        self.last_frame_at: Optional[float] = None
+
+        self._target_frames: Optional[int] = None
+        self._target_reached = asyncio.Event()
+
+    @classmethod
+    def for_orderbook(cls, expected_depth: Optional[int] = None, name: str = "book", sample_size: int = 5):
+        """订单簿推送的流式验证器（逐帧使用 FastOrderBookValidator 检查）"""
+        return cls(FastOrderBookValidator(expected_depth=expected_depth).check, name=name, sample_size=sample_size)
+
+    def __call__(self, message: Dict[str, Any]):
+        """帧监听器入口"""
+        result = message.get("result")
+        if not isinstance(result, dict) or not result.get("data"):
+            self.skipped += 1
+            return
+
+        self.frames += 1
+        self.last_frame_at = time.monotonic()
+        try:
+            failures = self.check(message)
+        except Exception as e:
+            failures = [("check_error", f"检查函数出错: {type(e).__name__}: {e}")]
+
+        if failures:
+            self.failed_frames += 1
+            for failure, _ in failures:
+                self.violations[failure] = self.violations.get(failure, 0) + 1
+            if len(self.samples) < self.sample_size:
+                self.samples.append({"frame": self.frames, "failures": failures, "message": message})
+
+        if self._target_frames is not None and self.frames >= self._target_frames:
+            self._target_reached.set()
+
+    async def wait(self, frames: Optional[int] = None, seconds: Optional[float] = None) -> int:
+        """
+        等待收到 frames 帧或经过 seconds 秒（先到者为准）
+
+        Args:
+            frames: 目标帧数，None 表示只按时间等待
+            seconds: 最长等待时间（秒），None 表示只按帧数等待
+
+        Returns:
+            int: 已验证的帧数
+        """
+        if frames is None and seconds is None:
+            raise ValueError("frames 和 seconds 至少指定一个")
+
+        if frames is not None:
+            self._target_frames = frames
+            if self.frames >= frames:
+                return self.frames
+            self._target_reached.clear()
+            try:
+                await asyncio.wait_for(self._target_reached.wait(), timeout=seconds)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await asyncio.sleep(seconds)
+        return self.frames
+
+    def get_stats(self) -> Dict[str, Any]:
+        """整体统计"""
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "name": self.name,
+            "frames": self.frames,
+            "failed_frames": self.failed_frames,
+            "skipped": self.skipped,
+            "violations": dict(self.violations),
+            "elapsed_s": round(elapsed, 3),
+            "frames_per_s": round(self.frames / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+    def attach(self):
+        """统计与失败帧样本写入一个 Allure 附件"""
+        allure.attach(
+            json.dumps({**self.get_stats(), "samples": self.samples}, indent=2, ensure_ascii=False),
+            name=f"流式验证结果 [{self.name}]",
+            attachment_type=allure.attachment_type.JSON
+        )
+
+    def assert_clean(self, min_frames: int = 1, max_failure_rate: float = 0.0):
+        """
+        对整体结果断言
+
+        Args:
+            min_frames: 至少验证的帧数
+            max_failure_rate: 允许的失败帧比例（0 表示不允许任何失败）
+
+        Raises:
+            AssertionError: 帧数不足或失败比例超限（信息包含违规计数与第一个失败样本）
+        """
+        assert self.frames >= min_frames, \
+            f"[{self.name}] 只验证了 {self.frames}/{min_frames} 帧"
+
+        failure_rate = self.failed_frames / self.frames if self.frames else 0.0
+        if failure_rate > max_failure_rate:
+            first = self.samples[0] if self.samples else {}
+            raise AssertionError(
+                f"[{self.name}] {self.failed_frames}/{self.frames} 帧验证失败 {self.violations}，"
+                f"第一个失败帧 #{first.get('frame')}: {first.get('failures')}"
+            )
@@ -2,6 +2,7 @@
 utils/test_helpers.py
 测试辅助方法 - 提供可复用的测试逻辑
 """
+import json
 import allure
 from typing import Dict, Any, List
 from utils.validators import (
@@ -9,6 +10,8 @@ from utils.validators import (
     CandlestickValidator,
     DataCompletenessValidator
 )
+from utils.fused_validator import FusedCandlestickValidator, ValidationResult
+from utils.violation_report import ViolationReport, log_outcome, report_mark
 
 
 class TestHelpers:
@@ -59,7 +62,8 @@ class TestHelpers:
     tolerance: int = None,
     max_count: int = None,
     exact_count: int = None,
-    logger = None
+    logger = None,
+    report: ViolationReport = None
     ):
         """
         K线数据综合验证 - 包含 CandlestickValidator 的所有验证
@@ -73,16 +77,20 @@ class TestHelpers:
             max_count: 最大数据数量
             exact_count: 精确数据数量
             logger: 日志记录器
+            report: 违规汇总报告（收集模式：记录全部违规而不是在第一处失败，
+                由调用方最后 report.attach() / report.assert_clean()）
         """
         with allure.step("K线数据综合验证"):
+            mark = report_mark(report)
+
             # 1. 验证 K线数据结构
-            CandlestickValidator.validate_candlestick_structure(data, logger)
+            CandlestickValidator.validate_candlestick_structure(data, logger, report=report)
 
             # 2. 验证 K线价格逻辑
-            CandlestickValidator.validate_price_logic(data, logger)
+            CandlestickValidator.validate_price_logic(data, logger, report=report)
 
             # 3. 验证时间戳顺序
-            CandlestickValidator.validate_timestamps_order(data, logger)
+            CandlestickValidator.validate_timestamps_order(data, logger, report=report)
 
             # 4. 验证价格范围（如果提供）
             if min_price is not None or max_price is not None:
@@ -90,7 +98,8 @@ class TestHelpers:
                     data,
                     min_price=min_price,
                     max_price=max_price,
-                    logger=logger
+                    logger=logger,
+                    report=report
                 )
 
             # 5. 验证时间间隔（如果提供）
@@ -99,7 +108,8 @@ class TestHelpers:
                     data,
                     expected_interval=expected_interval,
                     tolerance=tolerance,
-                    logger=logger
+                    logger=logger,
+                    report=report
                 )
 
             # 6. 验证数据数量（如果提供）
@@ -108,11 +118,11 @@ class TestHelpers:
                     data,
                     max_count=max_count,
                     exact_count=exact_count,
-                    logger=logger
+                    logger=logger,
+                    report=report
                 )
 
-            if logger:
-                logger.info("✓ K线数据综合验证全部通过")
+            log_outcome(logger, report, mark, "✓ K线数据综合验证全部通过")
 
 
 # ==================== 3. 数据完整性综合验证 ====================
@@ -124,7 +134,8 @@ class TestHelpers:
     check_null_values: bool = True,
     check_duplicate_timestamps: bool = True,
     check_consistency: bool = True,
-    logger = None
+    logger = None,
+    report: ViolationReport = None
     ):
         """
         数据完整性综合验证 - 包含 DataCompletenessValidator 的所有验证
@@ -136,14 +147,18 @@ class TestHelpers:
             check_duplicate_timestamps: 是否检查重复时间戳
             check_consistency: 是否检查数据一致性
             logger: 日志记录器
+            report: 违规汇总报告（收集模式，同 validate_candlestick_data）
         """
         with allure.step("数据完整性综合验证"):
+            mark = report_mark(report)
+
             # 1. 验证无缺失字段（如果提供）
             if required_fields is not None:
                 DataCompletenessValidator.validate_no_missing_fields(
                     data,
                     required_fields,
-                    logger
+                    logger,
+                    report=report
                 )
 
             # 2. 验证无空值
@@ -151,25 +166,69 @@ class TestHelpers:
                 DataCompletenessValidator.validate_no_null_values(
                     data,
                     fields_to_check=None,
-                    logger=logger
+                    logger=logger,
+                    report=report
                 )
 
             # 3. 验证无重复时间戳
             if check_duplicate_timestamps:
                 DataCompletenessValidator.validate_no_duplicate_timestamps(
                     data,
-                    logger
+                    logger,
+                    report=report
                 )
 
             # 4. 验证数据一致性
             if check_consistency:
                 DataCompletenessValidator.validate_data_consistency(
                     data,
-                    logger
+                    logger,
+                    report=report
                 )
 
-            if logger:
-                logger.info("✓ 数据完整性综合验证全部通过")
+            log_outcome(logger, report, mark, "✓ 数据完整性综合验证全部通过")
+
+
+    @staticmethod
+    def fused_validation(
+            data: List[Dict[str, Any]],
+            candlestick_params: Dict[str, Any] = None,
+            completeness_params: Dict[str, Any] = None,
+            logger=None
+    ) -> ValidationResult:
+        """
+        融合验证 - 一次遍历完成 validate_candlestick_data + validate_data_completeness 的检查
+
+        未提供 candlestick_params 时跳过 K线结构/价格逻辑/时间戳顺序，
+        未提供 completeness_params 时跳过空值/重复时间戳/一致性检查（与分别调用两个方法时相同）
+
+        Args:
+            data: K线数据列表
+            candlestick_params: K线验证参数（min_price、max_price、expected_interval、tolerance、max_count、exact_count）
+            completeness_params: 完整性验证参数（required_fields、check_null_values、check_duplicate_timestamps、check_consistency）
+            logger: 日志记录器
+
+        Returns:
+            ValidationResult: 验证结果
+
+        Raises:
+            AssertionError: 任一检查失败（每个失败检查一行）
+        """
+        checks = {}
+        if not candlestick_params:
+            checks.update(check_structure=False, check_price_logic=False, check_timestamps_order=False)
+        if not completeness_params:
+            checks.update(check_null_values=False, check_duplicate_timestamps=False, check_consistency=False)
+
+        result = FusedCandlestickValidator.validate(
+            data,
+            **(candlestick_params or {}),
+            **(completeness_params or {}),
+            **checks,
+            logger=logger
+        )
+        result.assert_passed()
+        return result
 
 
 # ==================== 4. 基础数据验证 ====================
@@ -241,6 +300,38 @@ class TestHelpers:
             logger.info(f"Response status: {result['status_code']}")
             logger.info(f"Response code: {result['response'].get('code')}")
 
+        TestHelpers.attach_timings(result, logger)
+
+
+    @staticmethod
+    def attach_timings(result: Dict[str, Any], logger=None):
+        """
+        附加分阶段耗时到 Allure 报告
+
+        connect/proxy_tunnel/tls 属于本端网络路径，ttfb 主要是交易所处理时间，
+        transfer/decode 分别是响应体下载和 JSON 解析
+
+        Args:
+            result: API 响应结果（含 timings）
+            logger: 日志记录器
+        """
+        timings = result.get("timings")
+        if not timings:
+            return
+
+        if logger:
+            logger.info(
+                "Timings: " + ", ".join(
+                    f"{name}={value:.2f}" if isinstance(value, float) else f"{name}={value}"
+                    for name, value in timings.items()
+                )
+            )
+        allure.attach(
+            json.dumps(timings, indent=2, ensure_ascii=False),
+            name="分阶段耗时 (ms)",
+            attachment_type=allure.attachment_type.JSON
+        )
+
 
     @staticmethod
     def log_test_success(case_id: str, logger=None):
@@ -337,8 +428,8 @@ class TestHelpers:
             api_client: API 客户端
             test_测试用例数据
             save_response_func: 保存响应的函数
-            candlestick_params: K线验证参数（传递给 validate_candlestick_data）
-            completeness_params: 完整性验证参数（传递给 validate_data_completeness）
+            candlestick_params: K线验证参数（同 validate_candlestick_data）
+            completeness_params: 完整性验证参数（同 validate_data_completeness）
             logger: 日志记录器
         """
         # 执行基础测试
@@ -351,21 +442,13 @@ class TestHelpers:
 
         data = test_result["data"]
 
-        # 步骤4: K线数据验证
-        if candlestick_params:
-            with allure.step("步骤4: K线数据综合验证"):
-                TestHelpers.validate_candlestick_data(
-                    data=data,
-                    **candlestick_params,
-                    logger=logger
-                )
-
-        # 步骤5: 数据完整性验证
-        if completeness_params:
-            with allure.step("步骤5: 数据完整性综合验证"):
-                TestHelpers.validate_data_completeness(
-                    data=data,
-                    **completeness_params,
+        # 步骤4: K线 + 完整性融合验证（一次遍历，结果写入一个附件）
+        if candlestick_params or completeness_params:
+            with allure.step("步骤4: K线数据融合验证"):
+                TestHelpers.fused_validation(
+                    data,
+                    candlestick_params=candlestick_params,
+                    completeness_params=completeness_params,
                     logger=logger
                 )
 
@@ -5,6 +5,30 @@ utils/validators.py
 from typing import Dict, Any, List,Tuple
 import allure
 
+from utils.schema import Field, compile_schema
+from utils.violation_report import ViolationReport, log_outcome, record_or_raise, report_mark
+
+
+# K线响应的 result.data：保留原有的断言信息
+validate_data_exists_shape = compile_schema(
+    {
+        "result": Field(
+            {
+                "data": Field(
+                    list,
+                    nonempty=True,
+                    message="Result should contain 'data' field",
+                    type_message="Data should be a list",
+                    empty_message="Data should not be empty"
+                ),
+            },
+            message="Response should contain 'result' field"
+        ),
+    },
+    name="validate_data_exists_shape",
+    root="Response"
+)
+
 
 class ResponseValidator:
     """响应验证器 - 通用响应验证方法"""
@@ -126,14 +150,8 @@ class ResponseValidator:
             list: 返回数据列表
         """
         with allure.step("验证数据存在"):
-            assert "result" in response, "Response should contain 'result' field"
-            result_data = response.get("result", {})
-
-            assert "data" in result_data, "Result should contain 'data' field"
-            data = result_data["data"]
-
-            assert isinstance(data, list), "Data should be a list"
-            assert len(data) > 0, "Data should not be empty"
+            validate_data_exists_shape(response)
+            data = response["result"]["data"]
 
             if logger:
                 logger.info(f"✓ 数据存在，共 {len(data)} 条记录")
@@ -161,19 +179,46 @@ class ResponseValidator:
                     logger.info(f"✓ 响应消息验证通过: {actual_message}")
 
 
+def _timestamps(data: List[Dict[str, Any]], report: ViolationReport = None) -> List[Tuple[int, int]]:
+    """
+    解析时间戳，返回 [(下标, 时间戳)]
+
+    fail-fast 模式下无法解析时直接抛出异常（与原来一致）；
+    收集模式下记为 bad_timestamp 并跳过该条，其余数据继续验证。
+    """
+    if report is None:
+        return [(i, int(candle.get("t") or candle.get("timestamp"))) for i, candle in enumerate(data)]
+
+    parsed = []
+    for i, candle in enumerate(data):
+        value = candle.get("t") or candle.get("timestamp")
+        try:
+            parsed.append((i, int(value)))
+        except (TypeError, ValueError):
+            report.record("bad_timestamp", i, f"Candle {i}: timestamp {value!r} is not an integer")
+    return parsed
+
+
 class CandlestickValidator:
-    """K线数据验证器 - 专门用于 K线数据的验证"""
+    """
+    K线数据验证器 - 专门用于 K线数据的验证
+
+    每个方法都接受可选的 report（ViolationReport）：不传时在第一处违规断言失败；
+    传入时记录全部违规后继续，由调用方在最后统一 report.attach() / report.assert_clean()。
+    """
 
     @staticmethod
-    def validate_candlestick_structure(data:List[Dict[str, Any]], logger = None):
+    def validate_candlestick_structure(data:List[Dict[str, Any]], logger = None, report: ViolationReport = None):
         """
         验证 K线数据结构
 
         Args:
             K线数据列表
             logger: 日志记录器
+            report: 违规汇总报告（收集模式）
         """
         with allure.step("验证 K线数据结构"):
+            mark = report_mark(report)
             required_fields = [
                 ("t", "timestamp"),
                 ("o", "open"),
@@ -187,64 +232,84 @@ class CandlestickValidator:
             sample_size = min(3, len(data))
             for i, candle in enumerate(data[:sample_size]):
                 for field1, field2 in required_fields:
-                    assert field1 in candle or field2 in candle, \
-                        f"Candle {i} should have '{field1}' or '{field2}' field"
+                    if field1 not in candle and field2 not in candle:
+                        record_or_raise(report, "missing_field", i,
+                                        f"Candle {i} should have '{field1}' or '{field2}' field")
 
-            if logger:
-                logger.info(f"✓ K线数据结构验证通过（验证了前 {sample_size} 条数据）")
+            log_outcome(logger, report, mark, f"✓ K线数据结构验证通过（验证了前 {sample_size} 条数据）")
 
 
     @staticmethod
-    def validate_price_logic(data:List[Dict[str, Any]], logger = None):
+    def validate_price_logic(data:List[Dict[str, Any]], logger = None, report: ViolationReport = None):
         """
         验证 K线价格逻辑
 
         Args:
             K线数据列表
             logger: 日志记录器
+            report: 违规汇总报告（收集模式）
         """
         with allure.step("验证 K线价格逻辑"):
+            mark = report_mark(report)
             for i, candle in enumerate(data):
                 # 获取价格数据（支持两种字段名格式）
-                open_price = float(candle.get("o") or candle.get("open"))
-                high_price = float(candle.get("h") or candle.get("high"))
-                low_price = float(candle.get("l") or candle.get("low"))
-                close_price = float(candle.get("c") or candle.get("close"))
-                volume = float(candle.get("v") or candle.get("volume"))
+                try:
+                    open_price = float(candle.get("o") or candle.get("open"))
+                    high_price = float(candle.get("h") or candle.get("high"))
+                    low_price = float(candle.get("l") or candle.get("low"))
+                    close_price = float(candle.get("c") or candle.get("close"))
+                    volume = float(candle.get("v") or candle.get("volume"))
+                except (TypeError, ValueError) as e:
+                    if report is None:
+                        raise
+                    report.record("bad_value", i, f"Candle {i}: price/volume is not a number ({e})")
+                    continue
 
                 # 验证价格关系：high >= open, close, low
-                assert high_price >= open_price, \
-                    f"Candle {i}: high ({high_price}) should >= open ({open_price})"
-                assert high_price >= close_price, \
-                    f"Candle {i}: high ({high_price}) should >= close ({close_price})"
-                assert high_price >= low_price, \
-                    f"Candle {i}: high ({high_price}) should >= low ({low_price})"
+                if not high_price >= open_price:
+                    record_or_raise(report, "high_below_open", i,
+                                    f"Candle {i}: high ({high_price}) should >= open ({open_price})")
+                if not high_price >= close_price:
+                    record_or_raise(report, "high_below_close", i,
+                                    f"Candle {i}: high ({high_price}) should >= close ({close_price})")
+                if not high_price >= low_price:
+                    record_or_raise(report, "high_below_low", i,
+                                    f"Candle {i}: high ({high_price}) should >= low ({low_price})")
 
                 # 验证价格关系：low <= open, close
-                assert low_price <= open_price, \
-                    f"Candle {i}: low ({low_price}) should <= open ({open_price})"
-                assert low_price <= close_price, \
-                    f"Candle {i}: low ({low_price}) should <= close ({close_price})"
+                if not low_price <= open_price:
+                    record_or_raise(report, "low_above_open", i,
+                                    f"Candle {i}: low ({low_price}) should <= open ({open_price})")
+                if not low_price <= close_price:
+                    record_or_raise(report, "low_above_close", i,
+                                    f"Candle {i}: low ({low_price}) should <= close ({close_price})")
 
                 # 验证价格和成交量为正数
-                assert open_price > 0, f"Candle {i}: open price should > 0"
-                assert high_price > 0, f"Candle {i}: high price should > 0"
-                assert low_price > 0, f"Candle {i}: low price should > 0"
-                assert close_price > 0, f"Candle {i}: close price should > 0"
-                assert volume >= 0, f"Candle {i}: volume should >= 0"
+                if not open_price > 0:
+                    record_or_raise(report, "open_not_positive", i, f"Candle {i}: open price should > 0")
+                if not high_price > 0:
+                    record_or_raise(report, "high_not_positive", i, f"Candle {i}: high price should > 0")
+                if not low_price > 0:
+                    record_or_raise(report, "low_not_positive", i, f"Candle {i}: low price should > 0")
+                if not close_price > 0:
+                    record_or_raise(report, "close_not_positive", i, f"Candle {i}: close price should > 0")
+                if not volume >= 0:
+                    record_or_raise(report, "volume_negative", i, f"Candle {i}: volume should >= 0")
 
-            if logger:
-                logger.info(f"✓ K线价格逻辑验证通过（验证了 {len(data)} 条数据）")
+            log_outcome(logger, report, mark, f"✓ K线价格逻辑验证通过（验证了 {len(data)} 条数据）")
 
 
     @staticmethod
-    def validate_timestamps_order(data:List[Dict[str, Any]], logger = None):
+    def validate_timestamps_order(data:List[Dict[str, Any]], logger = None, report: ViolationReport = None):
         """
         验证时间戳顺序
 
+        收集模式下以违规较少的方向（升序或降序）为准，记录每个逆序位置。
+
         Args:
             K线数据列表
             logger: 日志记录器
+            report: 违规汇总报告（收集模式）
         """
         with allure.step("验证时间戳顺序"):
             if len(data) < 2:
@@ -252,28 +317,38 @@ class CandlestickValidator:
                     logger.warning("⚠️  数据量不足，跳过时间戳顺序验证")
                 return
 
-            timestamps = [int(candle.get("t") or candle.get("timestamp")) for candle in data]
+            mark = report_mark(report)
+            timestamps = _timestamps(data, report)
 
-            # 检查是升序还是降序
-            is_ascending = all(
-                timestamps[i] <= timestamps[i + 1]
-                for i in range(len(timestamps) - 1)
-            )
-            is_descending = all(
-                timestamps[i] >= timestamps[i + 1]
-                for i in range(len(timestamps) - 1)
-            )
-
-            assert is_ascending or is_descending, \
-                "Timestamps should be in order (ascending or descending)"
+            # 检查是升序还是降序：分别找出破坏升序 / 降序的位置
+            not_ascending = [
+                timestamps[k + 1] for k in range(len(timestamps) - 1)
+                if timestamps[k][1] > timestamps[k + 1][1]
+            ]
+            not_descending = [
+                timestamps[k + 1] for k in range(len(timestamps) - 1)
+                if timestamps[k][1] < timestamps[k + 1][1]
+            ]
+            is_ascending = not not_ascending
+            is_descending = not not_descending
+
+            if not (is_ascending or is_descending):
+                if report is None:
+                    raise AssertionError("Timestamps should be in order (ascending or descending)")
+                if len(not_ascending) <= len(not_descending):
+                    order, positions = "ascending", not_ascending
+                else:
+                    order, positions = "descending", not_descending
+                for index, timestamp in positions:
+                    report.record("timestamps_unordered", index, f"Candle {index}: timestamp {timestamp} breaks {order} order")
 
             order = "升序" if is_ascending else "降序"
-            if logger:
-                logger.info(f"✓ 时间戳顺序验证通过（{order}）")
+            log_outcome(logger, report, mark, f"✓ 时间戳顺序验证通过（{order}）")
 
 
     @staticmethod
-    def validate_data_count(data:List[Dict[str, Any]], max_count: int = None, exact_count: int = None, logger = None):
+    def validate_data_count(data:List[Dict[str, Any]], max_count: int = None, exact_count: int = None, logger = None,
+                            report: ViolationReport = None):
         """
         验证数据数量
 
@@ -282,28 +357,31 @@ class CandlestickValidator:
             max_count: 最大数量限制
             exact_count: 精确数量
             logger: 日志记录器
+            report: 违规汇总报告（收集模式）
         """
         actual_count = len(data)
+        mark = report_mark(report)
 
         if exact_count is not None:
             with allure.step(f"验证数据数量 = {exact_count}"):
-                assert actual_count == exact_count, \
-                    f"Data count should = {exact_count}, got {actual_count}"
+                if actual_count != exact_count:
+                    record_or_raise(report, "count_mismatch", None,
+                                    f"Data count should = {exact_count}, got {actual_count}")
 
-                if logger:
-                    logger.info(f"✓ 数据数量验证通过: {actual_count} = {exact_count}")
+                log_outcome(logger, report, mark, f"✓ 数据数量验证通过: {actual_count} = {exact_count}")
 
         elif max_count is not None:
             with allure.step(f"验证数据数量 <= {max_count}"):
-                assert actual_count <= max_count, \
-                    f"Data count should <= {max_count}, got {actual_count}"
+                if actual_count > max_count:
+                    record_or_raise(report, "count_exceeded", None,
+                                    f"Data count should <= {max_count}, got {actual_count}")
 
-                if logger:
-                    logger.info(f"✓ 数据数量验证通过: {actual_count} <= {max_count}")
+                log_outcome(logger, report, mark, f"✓ 数据数量验证通过: {actual_count} <= {max_count}")
 
 
     @staticmethod
-    def validate_price_range(data:List[Dict[str, Any]],min_price: float = None,max_price: float = None,logger = None):
+    def validate_price_range(data:List[Dict[str, Any]],min_price: float = None,max_price: float = None,logger = None,
+                             report: ViolationReport = None):
         """
         验证价格范围
 
@@ -312,33 +390,45 @@ class CandlestickValidator:
             min_price: 最低价格
             max_price: 最高价格
             logger: 日志记录器
+            report: 违规汇总报告（收集模式）
         """
         with allure.step(f"验证价格范围: {min_price} ~ {max_price}"):
+            mark = report_mark(report)
             for i, candle in enumerate(data):
-                close_price = float(candle.get("c") or candle.get("close"))
+                try:
+                    close_price = float(candle.get("c") or candle.get("close"))
+                except (TypeError, ValueError) as e:
+                    if report is None:
+                        raise
+                    report.record("bad_value", i, f"Candle {i}: close price is not a number ({e})")
+                    continue
 
-                if min_price is not None:
-                    assert close_price >= min_price, \
-                        f"Candle {i}: price {close_price} < min {min_price}"
+                if min_price is not None and not close_price >= min_price:
+                    record_or_raise(report, "price_below_min", i,
+                                    f"Candle {i}: price {close_price} < min {min_price}")
 
-                if max_price is not None:
-                    assert close_price <= max_price, \
-                        f"Candle {i}: price {close_price} > max {max_price}"
+                if max_price is not None and not close_price <= max_price:
+                    record_or_raise(report, "price_above_max", i,
+                                    f"Candle {i}: price {close_price} > max {max_price}")
 
-            if logger:
-                logger.info(f"✓ 价格范围验证通过: {min_price} ~ {max_price}（验证了 {len(data)} 条数据）")
+            log_outcome(logger, report, mark,
+                        f"✓ 价格范围验证通过: {min_price} ~ {max_price}（验证了 {len(data)} 条数据）")
 
 
     @staticmethod
-    def validate_time_interval(data:List[Dict[str, Any]],expected_interval: int,tolerance: int = None,logger = None):
+    def validate_time_interval(data:List[Dict[str, Any]],expected_interval: int,tolerance: int = None,logger = None,
+                               report: ViolationReport = None):
         """
         验证时间间隔
 
+        规则针对整体（至少 80% 的间隔符合预期）；收集模式下整体不达标时记录每个不符合的间隔。
+
         Args:
             K线数据列表
             expected_interval: 期望的时间间隔（毫秒）
             tolerance: 允许的误差（毫秒）
             logger: 日志记录器
+            report: 违规汇总报告（收集模式）
         """
         if len(data) < 2:
             if logger:
@@ -346,32 +436,49 @@ class CandlestickValidator:
             return
 
         with allure.step(f"验证时间间隔 = {expected_interval}ms"):
-            timestamps = [int(candle.get("t") or candle.get("timestamp")) for candle in data]
-            time_diffs = [abs(timestamps[i + 1] - timestamps[i]) for i in range(len(timestamps) - 1)]
+            mark = report_mark(report)
+            timestamps = _timestamps(data, report)
+            time_diffs = [
+                (timestamps[k][0], abs(timestamps[k + 1][1] - timestamps[k][1]))
+                for k in range(len(timestamps) - 1)
+            ]
+            if not time_diffs:
+                log_outcome(logger, report, mark, "⚠️  可解析的时间戳不足，跳过时间间隔验证")
+                return
 
             if tolerance is None:
                 tolerance = expected_interval * 0.1  # 默认允许 10% 误差
 
             # 检查大部分时间间隔是否符合预期
-            valid_intervals = sum(
-                1 for diff in time_diffs
-                if abs(diff - expected_interval) <= tolerance
-            )
+            mismatches = [(i, diff) for i, diff in time_diffs if abs(diff - expected_interval) > tolerance]
+            valid_intervals = len(time_diffs) - len(mismatches)
 
             consistency_rate = valid_intervals / len(time_diffs) * 100
 
             # 要求至少 80% 的时间间隔符合预期
-            assert consistency_rate >= 80, f"Time interval consistency rate {consistency_rate:.1f}% < 80%"
-            if logger:
-                logger.info(f"✓ 时间间隔验证通过: {consistency_rate:.1f}% 符合预期间隔 {expected_interval}ms")
+            if consistency_rate < 80:
+                if report is None:
+                    raise AssertionError(f"Time interval consistency rate {consistency_rate:.1f}% < 80%")
+                for i, diff in mismatches:
+                    report.record("interval_mismatch", i,
+                                  f"Candle {i}: interval {diff}ms != {expected_interval}ms "
+                                  f"(consistency {consistency_rate:.1f}% < 80%)")
+
+            log_outcome(logger, report, mark,
+                        f"✓ 时间间隔验证通过: {consistency_rate:.1f}% 符合预期间隔 {expected_interval}ms")
 
 
 class DataCompletenessValidator:
-    """数据完整性验证器 - 验证数据的完整性"""
+    """
+    数据完整性验证器 - 验证数据的完整性
+
+    与 CandlestickValidator 相同，每个方法都接受可选的 report（ViolationReport）进入收集模式。
+    """
 
     @staticmethod
     def validate_no_missing_fields(data:List[Dict[str, Any]],required_fields: List[Tuple[str, str]],
-    logger = None
+    logger = None,
+    report: ViolationReport = None
     ):
         """
         验证数据无缺失字段
@@ -380,28 +487,33 @@ class DataCompletenessValidator:
             K线数据列表
             required_fields: 必需字段列表 [("short_name", "full_name"), ...]
             logger: 日志记录器
+            report: 违规汇总报告（收集模式）
         """
         with allure.step("验证数据完整性 - 无缺失字段"):
+            mark = report_mark(report)
             missing_count = 0
 
             for i, candle in enumerate(data):
                 for field1, field2 in required_fields:
                     if field1 not in candle and field2 not in candle:
                         missing_count += 1
-                        if logger:
+                        if report is not None:
+                            report.record("missing_field", i, f"Candle {i} missing field: {field1}/{field2}")
+                        elif logger:
                             logger.warning(f"⚠️  Candle {i} 缺失字段: {field1}/{field2}")
 
-            assert missing_count == 0, f"Found {missing_count} missing fields in data"
+            if report is None:
+                assert missing_count == 0, f"Found {missing_count} missing fields in data"
 
-            if logger:
-                logger.info(f"✓ 数据完整性验证通过：无缺失字段（验证了 {len(data)} 条数据）")
+            log_outcome(logger, report, mark, f"✓ 数据完整性验证通过：无缺失字段（验证了 {len(data)} 条数据）")
 
 
     @staticmethod
     def validate_no_null_values(
             data: List[Dict[str, Any]],
             fields_to_check: List[str] = None,
-            logger=None
+            logger=None,
+            report: ViolationReport = None
     ):
         """
         验证数据无空值
@@ -410,8 +522,10 @@ class DataCompletenessValidator:
             K线数据列表
             fields_to_check: 需要检查的字段列表（None 表示检查所有字段）
             logger: 日志记录器
+            report: 违规汇总报告（收集模式）
         """
         with allure.step("验证数据完整性 - 无空值"):
+            mark = report_mark(report)
             null_count = 0
 
             for i, candle in enumerate(data):
@@ -420,70 +534,87 @@ class DataCompletenessValidator:
                 for field in fields:
                     if field in candle and candle[field] is None:
                         null_count += 1
-                        if logger:
+                        if report is not None:
+                            report.record("null_value", i, f"Candle {i} field '{field}' is null")
+                        elif logger:
                             logger.warning(f"⚠️  Candle {i} 字段 '{field}' 为空值")
 
-            assert null_count == 0, f"Found {null_count} null values in data"
+            if report is None:
+                assert null_count == 0, f"Found {null_count} null values in data"
 
-            if logger:
-                logger.info(f"✓ 数据完整性验证通过：无空值（验证了 {len(data)} 条数据）")
+            log_outcome(logger, report, mark, f"✓ 数据完整性验证通过：无空值（验证了 {len(data)} 条数据）")
 
 
     @staticmethod
-    def validate_no_duplicate_timestamps(data: List[Dict[str, Any]], logger=None):
+    def validate_no_duplicate_timestamps(data: List[Dict[str, Any]], logger=None, report: ViolationReport = None):
         """
         验证数据无重复时间戳
 
         Args:
             K线数据列表
             logger: 日志记录器
+            report: 违规汇总报告（收集模式，记录每个重复出现的位置）
         """
         with allure.step("验证数据完整性 - 无重复时间戳"):
-            timestamps = [int(candle.get("t") or candle.get("timestamp")) for candle in data]
-            unique_timestamps = set(timestamps)
+            mark = report_mark(report)
+            timestamps = _timestamps(data, report)
 
-            duplicate_count = len(timestamps) - len(unique_timestamps)
+            if report is None:
+                unique_timestamps = set(timestamp for _, timestamp in timestamps)
+                duplicate_count = len(timestamps) - len(unique_timestamps)
+                assert duplicate_count == 0, f"Found {duplicate_count} duplicate timestamps"
+            else:
+                first_seen: Dict[int, int] = {}
+                for i, timestamp in timestamps:
+                    if timestamp in first_seen:
+                        report.record("duplicate_timestamp", i,
+                                      f"Candle {i}: duplicate timestamp {timestamp} (first at {first_seen[timestamp]})")
+                    else:
+                        first_seen[timestamp] = i
 
-            assert duplicate_count == 0, f"Found {duplicate_count} duplicate timestamps"
-
-            if logger:
-                logger.info(f"✓ 数据完整性验证通过：无重复时间戳（验证了 {len(data)} 条数据）")
+            log_outcome(logger, report, mark, f"✓ 数据完整性验证通过：无重复时间戳（验证了 {len(data)} 条数据）")
 
 
     @staticmethod
-    def validate_data_consistency(data: List[Dict[str, Any]], logger=None):
+    def validate_data_consistency(data: List[Dict[str, Any]], logger=None, report: ViolationReport = None):
         """
         验证数据一致性（综合验证）
 
         Args:
             data: K线数据列表
             logger: 日志记录器
+            report: 违规汇总报告（收集模式，以第一条的字段为准记录每条不一致的数据）
         """
         with allure.step("验证数据一致性"):
-            # 验证所有数据的字段数量一致
-            field_counts = [len(candle.keys()) for candle in data]
-            unique_field_counts = set(field_counts)
+            mark = report_mark(report)
+
+            # 验证所有数据的字段数量一致（收集模式下由逐条的字段名比较覆盖）
+            if report is None:
+                field_counts = [len(candle.keys()) for candle in data]
+                unique_field_counts = set(field_counts)
 
-            assert len(unique_field_counts) == 1, \
-                f"Inconsistent field counts: {unique_field_counts}"
+                assert len(unique_field_counts) == 1, \
+                    f"Inconsistent field counts: {unique_field_counts}"
 
             # 验证所有数据的字段名称一致
             field_sets = [set(candle.keys()) for candle in data]
             first_fields = field_sets[0]
 
             for i, fields in enumerate(field_sets[1:], start=1):
-                assert fields == first_fields, \
-                    f"Candle {i} has different fields: {fields.symmetric_difference(first_fields)}"
+                if fields != first_fields:
+                    record_or_raise(report, "inconsistent_fields", i,
+                                    f"Candle {i} has different fields: {fields.symmetric_difference(first_fields)}")
 
-            if logger:
-                logger.info(f"✓ 数据一致性验证通过：所有数据字段结构一致（验证了 {len(data)} 条数据）")
+            log_outcome(logger, report, mark,
+                        f"✓ 数据一致性验证通过：所有数据字段结构一致（验证了 {len(data)} 条数据）")
 
 
     @staticmethod
     def validate_continuous_data(data:List[Dict[str, Any]],
     expected_interval: int,
     tolerance: int = None,
-    logger = None
+    logger = None,
+    report: ViolationReport = None
     ):
         """
         验证数据连续性（无时间间隙）
@@ -493,6 +624,7 @@ class DataCompletenessValidator:
             expected_interval: 期望的时间间隔（毫秒）
             tolerance: 允许的误差（毫秒）
             logger: 日志记录器
+            report: 违规汇总报告（收集模式，间隙率超限时记录每个间隙）
         """
         if len(data) < 2:
             if logger:
@@ -500,17 +632,21 @@ class DataCompletenessValidator:
             return
 
         with allure.step("验证数据连续性 - 无时间间隙"):
-            timestamps = [int(candle.get("t") or candle.get("timestamp")) for candle in data]
+            mark = report_mark(report)
+            timestamps = _timestamps(data, report)
+            if len(timestamps) < 2:
+                log_outcome(logger, report, mark, "⚠️  可解析的时间戳不足，跳过数据连续性验证")
+                return
 
             if tolerance is None:
                 tolerance = int(expected_interval * 0.1)
 
             gaps = []
-            for i in range(len(timestamps) - 1):
-                time_diff = abs(timestamps[i + 1] - timestamps[i])
+            for k in range(len(timestamps) - 1):
+                time_diff = abs(timestamps[k + 1][1] - timestamps[k][1])
                 if abs(time_diff - expected_interval) > tolerance:
                     gaps.append({
-                        "index": i,
+                        "index": timestamps[k][0],
                         "expected": expected_interval,
                         "actual": time_diff,
                         "gap": time_diff - expected_interval
@@ -523,9 +659,12 @@ class DataCompletenessValidator:
 
             # 允许少量间隙（不超过5%）
             gap_rate = len(gaps) / (len(timestamps) - 1) * 100
-            assert gap_rate <= 5, f"Too many gaps: {gap_rate:.1f}% > 5%"
-
-            if logger:
-                logger.info(f"✓ 数据连续性验证通过：间隙率 {gap_rate:.1f}% <= 5%")
-
-
+            if gap_rate > 5:
+                if report is None:
+                    raise AssertionError(f"Too many gaps: {gap_rate:.1f}% > 5%")
+                for gap in gaps:
+                    report.record("gap", gap["index"],
+                                  f"Candle {gap['index']}: interval {gap['actual']}ms != {gap['expected']}ms "
+                                  f"(gap rate {gap_rate:.1f}% > 5%)")
+
+            log_outcome(logger, report, mark, f"✓ 数据连续性验证通过：间隙率 {gap_rate:.1f}% <= 5%")
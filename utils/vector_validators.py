@@ -0,0 +1,200 @@
+"""
+utils/vector_validators.py
+向量化 K 线验证器 - 基于 CandleFrame 列运算，断言信息与 CandlestickValidator / DataCompletenessValidator 一致
+"""
+import operator
+from typing import Any, Callable, List, Optional, Tuple
+
+import allure
+
+from utils.candle_frame import CandleFrame, np
+
+
+def _is_vector(column) -> bool:
+    return np is not None and isinstance(column, np.ndarray)
+
+
+def _violations(left, op: Callable[[Any, Any], Any], right):
+    """
+    op(left, right) 不成立的位置（NaN 比较结果为 False，同样计为违规）
+
+    Args:
+        left: 列
+        op: operator.ge / operator.le / operator.gt ...
+        right: 列或标量
+    """
+    if _is_vector(left):
+        return ~op(left, right)
+    if isinstance(right, (int, float)):
+        return [not op(value, right) for value in left]
+    return [not op(a, b) for a, b in zip(left, right)]
+
+
+def _first_index(mask) -> Optional[int]:
+    """第一个违规位置，没有违规返回 None"""
+    if _is_vector(mask):
+        hits = np.flatnonzero(mask)
+        return int(hits[0]) if hits.size else None
+    return next((i for i, bad in enumerate(mask) if bad), None)
+
+
+def _diff(column):
+    """相邻元素差值"""
+    if _is_vector(column):
+        return np.diff(column)
+    return [column[i + 1] - column[i] for i in range(len(column) - 1)]
+
+
+# 价格逻辑检查，顺序与 CandlestickValidator.validate_price_logic 一致：
+# (左列, 运算, 右列或标量, 断言信息模板)
+PRICE_LOGIC_CHECKS: List[Tuple[str, Callable, Any, str]] = [
+    ("h", operator.ge, "o", "Candle {i}: high ({h}) should >= open ({o})"),
+    ("h", operator.ge, "c", "Candle {i}: high ({h}) should >= close ({c})"),
+    ("h", operator.ge, "l", "Candle {i}: high ({h}) should >= low ({l})"),
+    ("l", operator.le, "o", "Candle {i}: low ({l}) should <= open ({o})"),
+    ("l", operator.le, "c", "Candle {i}: low ({l}) should <= close ({c})"),
+    ("o", operator.gt, 0, "Candle {i}: open price should > 0"),
+    ("h", operator.gt, 0, "Candle {i}: high price should > 0"),
+    ("l", operator.gt, 0, "Candle {i}: low price should > 0"),
+    ("c", operator.gt, 0, "Candle {i}: close price should > 0"),
+    ("v", operator.ge, 0, "Candle {i}: volume should >= 0"),
+]
+
+
+class VectorizedCandlestickValidator:
+    """
+    向量化 K 线验证器
+
+    输入为 CandleFrame（已解析的列），每项检查对整列运算一次；
+    失败时报告第一个违规的 K 线，断言信息与逐条验证的原实现相同。
+    没有 NumPy 时按列逐元素比较，结果一致。
+    """
+
+    @staticmethod
+    def validate_price_logic(frame: CandleFrame, logger=None):
+        """
+        验证 K线价格逻辑（high >= open/close/low，low <= open/close，价格 > 0，成交量 >= 0）
+
+        Args:
+            frame: K线列式数据
+            logger: 日志记录器
+        """
+        with allure.step("验证 K线价格逻辑"):
+            first = None
+            for left, op, right, _ in PRICE_LOGIC_CHECKS:
+                index = _first_index(_violations(
+                    frame.columns[left], op, frame.columns[right] if isinstance(right, str) else right
+                ))
+                if index is not None and (first is None or index < first):
+                    first = index
+
+            if first is not None:
+                # 与原实现相同：同一根 K 线按检查顺序报告第一项失败
+                row = {name: float(frame.columns[name][first]) for name in ("o", "h", "l", "c", "v")}
+                for left, op, right, message in PRICE_LOGIC_CHECKS:
+                    right_value = row[right] if isinstance(right, str) else right
+                    if not op(row[left], right_value):
+                        raise AssertionError(message.format(i=first, **row))
+
+            if logger:
+                logger.info(f"✓ K线价格逻辑验证通过（验证了 {len(frame)} 条数据）")
+
+    @staticmethod
+    def validate_timestamps_order(frame: CandleFrame, logger=None):
+        """
+        验证时间戳顺序（升序或降序）
+
+        Args:
+            frame: K线列式数据
+            logger: 日志记录器
+        """
+        with allure.step("验证时间戳顺序"):
+            if len(frame) < 2:
+                if logger:
+                    logger.warning("⚠️  数据量不足，跳过时间戳顺序验证")
+                return
+
+            diffs = _diff(frame.t)
+            is_ascending = _first_index(_violations(diffs, operator.ge, 0)) is None
+            is_descending = _first_index(_violations(diffs, operator.le, 0)) is None
+
+            assert is_ascending or is_descending, \
+                "Timestamps should be in order (ascending or descending)"
+
+            order = "升序" if is_ascending else "降序"
+            if logger:
+                logger.info(f"✓ 时间戳顺序验证通过（{order}）")
+
+    @staticmethod
+    def validate_time_interval(frame: CandleFrame, expected_interval: int, tolerance: int = None, logger=None):
+        """
+        验证时间间隔（至少 80% 的相邻间隔在 expected_interval ± tolerance 内）
+
+        Args:
+            frame: K线列式数据
+            expected_interval: 期望的时间间隔（毫秒）
+            tolerance: 允许的误差（毫秒），默认 10%
+            logger: 日志记录器
+        """
+        if len(frame) < 2:
+            if logger:
+                logger.warning("⚠️  数据量不足，跳过时间间隔验证")
+            return
+
+        with allure.step(f"验证时间间隔 = {expected_interval}ms"):
+            if tolerance is None:
+                tolerance = expected_interval * 0.1  # 默认允许 10% 误差
+
+            diffs = _diff(frame.t)
+            if _is_vector(diffs):
+                valid_intervals = int(np.count_nonzero(np.abs(np.abs(diffs) - expected_interval) <= tolerance))
+            else:
+                valid_intervals = sum(1 for diff in diffs if abs(abs(diff) - expected_interval) <= tolerance)
+
+            consistency_rate = valid_intervals / len(diffs) * 100
+
+            assert consistency_rate >= 80, f"Time interval consistency rate {consistency_rate:.1f}% < 80%"
+            if logger:
+                logger.info(f"✓ 时间间隔验证通过: {consistency_rate:.1f}% 符合预期间隔 {expected_interval}ms")
+
+    @staticmethod
+    def validate_price_range(frame: CandleFrame, min_price: float = None, max_price: float = None, logger=None):
+        """
+        验证收盘价范围
+
+        Args:
+            frame: K线列式数据
+            min_price: 最低价格
+            max_price: 最高价格
+            logger: 日志记录器
+        """
+        with allure.step(f"验证价格范围: {min_price} ~ {max_price}"):
+            below = _first_index(_violations(frame.c, operator.ge, min_price)) if min_price is not None else None
+            above = _first_index(_violations(frame.c, operator.le, max_price)) if max_price is not None else None
+
+            # 同一根 K 线先报告低于下限（与原实现的检查顺序一致）
+            if below is not None and (above is None or below <= above):
+                raise AssertionError(f"Candle {below}: price {float(frame.c[below])} < min {min_price}")
+            if above is not None:
+                raise AssertionError(f"Candle {above}: price {float(frame.c[above])} > max {max_price}")
+
+            if logger:
+                logger.info(f"✓ 价格范围验证通过: {min_price} ~ {max_price}（验证了 {len(frame)} 条数据）")
+
+    @staticmethod
+    def validate_no_duplicate_timestamps(frame: CandleFrame, logger=None):
+        """
+        验证数据无重复时间戳
+
+        Args:
+            frame: K线列式数据
+            logger: 日志记录器
+        """
+        with allure.step("验证数据完整性 - 无重复时间戳"):
+            unique_count = len(np.unique(frame.t)) if _is_vector(frame.t) else len(set(frame.t))
+            duplicate_count = len(frame) - unique_count
+
+            assert duplicate_count == 0, f"Found {duplicate_count} duplicate timestamps"
+
+            if logger:
+                logger.info(f"✓ 数据完整性验证通过：无重复时间戳（验证了 {len(frame)} 条数据）")
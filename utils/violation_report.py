@@ -0,0 +1,151 @@
+"""
+utils/violation_report.py
+违规汇总报告 - 验证器的收集模式：不在第一处违规时中断，而是记录全部违规，最后输出一份紧凑报告
+"""
+import json
+import random
+from typing import Any, Dict, List, Optional, Union
+
+import allure
+
+
+Index = Union[int, str, None]
+
+
+class ViolationReport:
+    """
+    违规汇总报告
+
+    传给验证器的 report 参数后，验证器不再断言，而是把每处违规记录到这里：
+    - 按规则计数
+    - 每条规则的前 first_k 个违规位置（以及第一条说明）
+    - 所有违规的蓄水池抽样（sample_size 条，内存占用固定，每条违规被抽中的概率相同）
+
+    全部验证结束后用 attach() 输出一个 Allure 附件，用 assert_clean() 统一断言。
+    """
+
+    def __init__(self, name: str = "validation", first_k: int = 10, sample_size: int = 20,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            name: 报告名称（日志与附件）
+            first_k: 每条规则保留的前 K 个违规位置
+            sample_size: 蓄水池抽样大小
+            seed: 抽样随机种子（None 表示不固定）
+        """
+        self.name = name
+        self.first_k = first_k
+        self.sample_size = sample_size
+        self._random = random.Random(seed)
+
+        self.total = 0
+        self.counts: Dict[str, int] = {}
+        self.first_indices: Dict[str, List[Index]] = {}
+        self.first_messages: Dict[str, str] = {}
+        self.sample: List[Dict[str, Any]] = []
+
+    def record(self, rule: str, index: Index, message: str):
+        """
+        记录一处违规
+
+        Args:
+            rule: 规则名
+            index: 违规位置（数据下标、"data[0].bids[3]" 之类的路径，或 None 表示整体）
+            message: 说明（与 fail-fast 模式的断言信息一致）
+        """
+        self.total += 1
+        count = self.counts.get(rule, 0) + 1
+        self.counts[rule] = count
+
+        if count == 1:
+            self.first_indices[rule] = [index]
+            self.first_messages[rule] = message
+        elif count <= self.first_k:
+            self.first_indices[rule].append(index)
+
+        # Algorithm R：第 n 条违规以 sample_size/n 的概率替换样本中的随机一条
+        entry = {"rule": rule, "index": index, "message": message}
+        if len(self.sample) < self.sample_size:
+            self.sample.append(entry)
+        else:
+            slot = self._random.randrange(self.total)
+            if slot < self.sample_size:
+                self.sample[slot] = entry
+
+    @property
+    def passed(self) -> bool:
+        return self.total == 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "passed": self.passed,
+            "total": self.total,
+            "counts": dict(self.counts),
+            "first_indices": {rule: list(indices) for rule, indices in self.first_indices.items()},
+            "first_messages": dict(self.first_messages),
+            "sample": list(self.sample),
+        }
+
+    def attach(self):
+        """整份报告写入一个 Allure 附件"""
+        allure.attach(
+            json.dumps(self.to_dict(), indent=2, ensure_ascii=False),
+            name=f"违规汇总 [{self.name}]",
+            attachment_type=allure.attachment_type.JSON
+        )
+
+    def log(self, logger):
+        """按规则输出计数与前几个违规位置"""
+        if self.passed:
+            logger.info(f"✅ [{self.name}] 未发现违规")
+            return
+        logger.warning(f"⚠️  [{self.name}] 共 {self.total} 处违规")
+        for rule, count in self.counts.items():
+            logger.warning(f"   {rule}: {count} 处，前几个位置 {self.first_indices[rule]}，例: {self.first_messages[rule]}")
+
+    def assert_clean(self):
+        """
+        对汇总结果断言
+
+        Raises:
+            AssertionError: 存在违规（信息包含各规则计数与第一条说明）
+        """
+        if not self.passed:
+            details = "; ".join(
+                f"{rule} x{count} (首个 {self.first_indices[rule][0]}: {self.first_messages[rule]})"
+                for rule, count in self.counts.items()
+            )
+            raise AssertionError(f"[{self.name}] 共 {self.total} 处违规: {details}")
+
+
+def record_or_raise(report: Optional[ViolationReport], rule: str, index: Index, message: str):
+    """
+    验证器的违规出口：没有 report 时按原来的方式断言失败，有 report 时记录后继续
+
+    Raises:
+        AssertionError: report 为 None
+    """
+    if report is None:
+        raise AssertionError(message)
+    report.record(rule, index, message)
+
+
+def report_mark(report: Optional[ViolationReport]) -> int:
+    """当前违规总数（fail-fast 模式为 0），配合 log_outcome 判断一次验证是否新增了违规"""
+    return report.total if report is not None else 0
+
+
+def log_outcome(logger, report: Optional[ViolationReport], mark: int, passed_message: str):
+    """
+    输出一次验证的结果日志
+
+    fail-fast 模式能执行到这里就是通过；收集模式下本次新增了违规则输出警告而不是通过信息。
+    """
+    if not logger:
+        return
+    added = report_mark(report) - mark
+    if added:
+        logger.warning(f"⚠️  发现 {added} 处违规（已记录到报告 [{report.name}]）")
+    else:
+        logger.info(passed_message)
@@ -5,11 +5,19 @@ WebSocket 客户端（适配 Crypto.com）
 import asyncio
 import json
 import logging
-from typing import Optional, Dict, Any, List
+import random
+import time
+from typing import Optional, Dict, Any, List, AsyncIterator, Callable
 from python_socks.async_.asyncio import Proxy
 import websockets
+from websockets.exceptions import ConnectionClosed
 import sys
 import os
+from config.config import Config
+from utils import json_codec
+from utils.latency import LatencyHistogram
+from utils.rate_limiter import get_rate_limiter
+from utils.ws_queue import QueuePolicy, SubscriptionQueue, STREAM_CLOSED as _STREAM_CLOSED
 
 
 # 打印搜索路径，确认 venv 路径在其中
@@ -29,20 +37,59 @@ except ImportError as e:
 class WebSocketClient:
     """WebSocket 客户端"""
 
-    def __init__(self, ws_url: str, timeout: int = 30):
+    def __init__(self, ws_url: str, timeout: int = 30, auto_reconnect: Optional[bool] = None):
         """
         初始化 WebSocket 客户端
 
         Args:
             ws_url: WebSocket URL
             timeout: 超时时间（秒）
+            auto_reconnect: 连接被动断开后是否自动重连，None 表示使用 Config.WS_AUTO_RECONNECT
         """
         self.ws_url = ws_url
         self.timeout = timeout
+        self.auto_reconnect = Config.WS_AUTO_RECONNECT if auto_reconnect is None else auto_reconnect
         self.ws = None
         self.request_id = 0
         self.logger = self._setup_logger()
 
+        # 后台读取任务：唯一调用 ws.recv() 的地方
+        self._reader_task: Optional[asyncio.Task] = None
+        # 频道消息队列 {subscription: SubscriptionQueue}，在 subscribe 时注册
+        self._channel_queues: Dict[str, SubscriptionQueue] = {}
+        # 非频道数据（订阅确认、错误响应等），由 receive_message 读取
+        self._inbox: Optional[asyncio.Queue] = None
+        # 在途控制请求 {request_id: Future}，由读取任务按 id 完成
+        self._pending: Dict[int, asyncio.Future] = {}
+        # 心跳统计（由读取任务维护）
+        self._heartbeat_stats = {
+            "received": 0,
+            "responded": 0,
+            "failed": 0,
+            "last_response_ms": None,
+            "max_response_ms": 0.0,
+            "total_response_ms": 0.0,
+            "last_interval_s": None,
+        }
+        self._last_heartbeat_at: Optional[float] = None
+        # 延迟直方图 {subscription: {"exchange_to_client": ..., "decode": ...}}（毫秒）
+        self._latency: Dict[str, Dict[str, LatencyHistogram]] = {}
+        # 帧监听器 {subscription: [listener]}，由读取任务在入队前同步调用（None 表示所有频道）
+        self._frame_listeners: Dict[Optional[str], List[Callable[[Dict[str, Any]], Any]]] = {}
+
+        # 当前生效的订阅 {channel: extra_params}，重连后按此重放
+        self._active_subscriptions: Dict[str, Optional[Dict[str, Any]]] = {}
+        # 重连监控
+        self._closing = False
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._reconnected_at: Optional[float] = None
+        self._reconnect_stats = {
+            "disconnects": 0,
+            "reconnects": 0,
+            "failed_attempts": 0,
+            "last_time_to_first_message_ms": None,
+        }
+
     def _setup_logger(self):
         """设置日志"""
         logger = logging.getLogger(__name__)
@@ -64,31 +111,17 @@ class WebSocketClient:
         Returns:
             bool: 连接是否成功
         """
+        # 自动重连退避期间主动连接：先停止重连任务，避免两条连接争用同一个客户端
+        await self._cancel_reconnect()
+
         try:
             self.logger.info(f"正在连接 WebSocket: {self.ws_url}")
             self.logger.info(f"超时设置: {self.timeout}秒")
 
-            # 1. 创建代理对象
-            proxy = Proxy.from_url("http://127.0.0.1:7890")
-
-            # 2. 手动通过代理连接到目标主机的 443 端口
-            # stream.crypto.com 这里的域名要和 ws_url 的主机名一致
-            sock = await proxy.connect(dest_host="stream.crypto.com", dest_port=443,
-                timeout=self.timeout)
-
-            self.ws = await asyncio.wait_for(
-                websockets.connect(
-                    self.ws_url,
-                    sock=sock,  # 关键点：直接使用代理握手后的 socket
-                    server_hostname="stream.crypto.com",
-                    ping_interval=20,
-                    ping_timeout=10,
-                    close_timeout=10,
-                ),
-                timeout=self.timeout
-            )
-
+            ws = await self._open_socket()
 
+            self._closing = False
+            self._attach_socket(ws)
             self.logger.info("✅ WebSocket 连接成功")
             self.logger.info(f"连接状态: open={not self.ws.closed}")
             return True
@@ -105,8 +138,41 @@ class WebSocketClient:
         #     self.logger.error(f"URL: {self.ws_url}")
         #     return False
 
+    async def _open_socket(self):
+        """
+        通过代理建立 WebSocket 连接（connect 与自动重连共用）
+
+        Returns:
+            已完成握手的 WebSocket 连接
+        """
+        # 1. 创建代理对象
+        proxy = Proxy.from_url("http://127.0.0.1:7890")
+
+        # 2. 手动通过代理连接到目标主机的 443 端口
+        # stream.crypto.com 这里的域名要和 ws_url 的主机名一致
+        sock = await proxy.connect(dest_host="stream.crypto.com", dest_port=443,
+            timeout=self.timeout)
+
+        ws = await asyncio.wait_for(
+            websockets.connect(
+                self.ws_url,
+                sock=sock,  # 关键点：直接使用代理握手后的 socket
+                server_hostname="stream.crypto.com",
+                ping_interval=20,
+                ping_timeout=10,
+                close_timeout=10,
+            ),
+            timeout=self.timeout
+        )
+        return ws
+
     async def disconnect(self):
-        """断开 WebSocket 连接"""
+        """断开 WebSocket 连接（主动断开不会触发自动重连）"""
+        self._closing = True
+        await self._cancel_reconnect()
+        await self._stop_reader()
+        self._close_queues()
+        self._active_subscriptions.clear()
         if self.ws:
             try:
                 await self.ws.close()
@@ -114,6 +180,17 @@ class WebSocketClient:
             except Exception as e:
                 self.logger.error(f"断开 WebSocket 时发生错误: {e}")
 
+    async def _cancel_reconnect(self):
+        """取消并等待进行中的自动重连任务"""
+        task = self._reconnect_task
+        self._reconnect_task = None
+        if task is not None and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
     async def is_connected(self) -> bool:
         """
         检查连接状态
@@ -144,7 +221,7 @@ class WebSocketClient:
             return False
 
         try:
-            message_str = json.dumps(message)
+            message_str = json_codec.dumps(message)
             self.logger.info(f"📤 发送消息: {message_str}")
             await self.ws.send(message_str)
             self.logger.info("✅ 消息发送成功")
@@ -157,13 +234,16 @@ class WebSocketClient:
         """
         接收 WebSocket 消息
 
+        由后台读取任务统一接收并解码，已注册频道的数据推送进入各自的队列（见 stream），
+        其余消息（订阅确认、错误响应、未注册频道的推送）从这里读取。
+
         Args:
             timeout: 超时时间（秒），None 表示使用默认超时
 
         Returns:
             Dict: 解析后的消息，如果超时或连接关闭则返回 None
         """
-        if self.ws is None:
+        if self._inbox is None or (self.ws is None and self._inbox.empty()):
             self.logger.error("❌ WebSocket 未连接")
             return None
 
@@ -171,65 +251,485 @@ class WebSocketClient:
 
         try:
             self.logger.info(f"⏳ 等待接收消息（超时: {timeout_value}秒）...")
+            message = await asyncio.wait_for(self._inbox.get(), timeout=timeout_value)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"⏰ 接收消息超时（{timeout_value}秒）")
+            return None
 
-            # 接收消息
-            message = await asyncio.wait_for(
-                self.ws.recv(),
-                timeout=timeout_value
-            )
+        if message is _STREAM_CLOSED:
+            self.logger.error("❌ 连接已关闭")
+            return None
+        return message
+
+    async def stream(
+            self,
+            channel: str,
+            timeout: Optional[float] = None,
+            queue_policy: Optional[str] = None,
+            queue_maxsize: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        按频道迭代数据推送
 
-            # 打印原始消息（完整）
-            self.logger.info(f"📥 收到原始消息（长度: {len(message)}）: {message}")
+        用法: async for msg in client.stream("book.BTCUSD-PERP.10"): ...
 
-            # 解析 JSON
+        Args:
+            channel: 订阅频道（result.subscription）
+            timeout: 单条消息等待超时（秒），超时后结束迭代；None 表示一直等待
+            queue_policy: 频道队列尚未注册时使用的策略，见 QueuePolicy
+            queue_maxsize: 频道队列尚未注册时使用的容量
+
+        Yields:
+            Dict: 该频道的推送消息
+
+        Raises:
+            RuntimeError: block 策略下消费者跟不上、溢出区已满，频道队列已关闭（之后的推送已丢失）
+        """
+        queue = self._register_channel(channel, queue_policy, queue_maxsize)
+
+        while True:
             try:
-                parsed = json.loads(message)
-                self.logger.info(f"✅ 解析消息成功")
+                if timeout is None:
+                    message = await queue.get()
+                else:
+                    message = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"⏰ 频道 [{channel}] {timeout}秒内无新消息，结束迭代")
+                return
+
+            if message is _STREAM_CLOSED:
+                if queue.overflowed:
+                    raise RuntimeError(f"频道 [{channel}] 消费过慢，队列溢出区已满，队列已关闭: {queue.get_stats()}")
+                return
+            yield message
+
+    async def unsubscribe_all(self, timeout: Optional[int] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        取消当前所有订阅，并注销剩余的频道队列（会话级连接在用例之间清理用）
 
-                # 打印解析后的消息结构（用于调试）
-                self.logger.info(f"📋 消息结构: {list(parsed.keys())}")
+        Returns:
+            Dict: {channel: 取消订阅响应或 None}
+        """
+        channels = list(self._active_subscriptions)
+        responses = await self.unsubscribe_many(channels, timeout=timeout) if channels else {}
+        for channel in list(self._channel_queues):
+            self._release_channel(channel)
+        return responses
 
-                # 如果有 result 字段，打印其结构
-                if "result" in parsed:
-                    self.logger.info(f"📋 result 结构: {list(parsed['result'].keys())}")
+    def clear_inbox(self) -> int:
+        """
+        丢弃 inbox 中尚未读取的消息
 
-                    # 如果有 data 字段，打印数据条数
-                    if "data" in parsed["result"]:
-                        data = parsed["result"]["data"]
-                        self.logger.info(f"📋 data 条数: {len(data)}")
+        Returns:
+            int: 丢弃的消息数
+        """
+        dropped = 0
+        while self._inbox is not None and not self._inbox.empty():
+            self._inbox.get_nowait()
+            dropped += 1
+        return dropped
 
-                        # 打印第一条数据的结构
-                        if len(data) > 0:
-                            self.logger.info(f"📋 data[0] 结构: {list(data[0].keys())}")
+    # ==================== 后台读取与分发 ====================
 
-                            # 检查是否有 asks 和 bids
-                            if "asks" in data[0]:
-                                self.logger.info(f"📋 asks 数量: {len(data[0]['asks'])}")
-                            if "bids" in data[0]:
-                                self.logger.info(f"📋 bids 数量: {len(data[0]['bids'])}")
+    def get_queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取各频道队列统计
 
-                return parsed
+        Returns:
+            Dict: {channel: 接收/投递/丢弃/合并/阻塞/溢出次数、当前积压、最大积压、策略、是否已溢出关闭}
+        """
+        return {channel: queue.get_stats() for channel, queue in self._channel_queues.items()}
 
-            except json.JSONDecodeError as e:
-                self.logger.error(f"❌ JSON 解析失败: {e}")
-                self.logger.error(f"原始消息: {message}")
-                return None
+    def _register_channel(
+            self,
+            channel: str,
+            policy: Optional[str] = None,
+            maxsize: Optional[int] = None
+    ) -> SubscriptionQueue:
+        """
+        注册频道队列（已存在则直接返回，保留原有策略）
 
-        except asyncio.TimeoutError:
-            self.logger.warning(f"⏰ 接收消息超时（{timeout_value}秒）")
-            return None
+        Args:
+            channel: 订阅频道
+            policy: 队列策略，None 表示使用 Config.WS_QUEUE_POLICY
+            maxsize: 队列容量，None 表示使用 Config.WS_QUEUE_MAXSIZE
+        """
+        queue = self._channel_queues.get(channel)
+        if queue is None:
+            queue = SubscriptionQueue(
+                maxsize=Config.WS_QUEUE_MAXSIZE if maxsize is None else maxsize,
+                policy=policy or Config.WS_QUEUE_POLICY,
+                overflow_maxsize=Config.WS_QUEUE_OVERFLOW_MAXSIZE
+            )
+            self._channel_queues[channel] = queue
+        return queue
+
+    def _release_channel(self, channel: str):
+        """注销频道队列（及该频道的帧监听器），并通知正在迭代的消费者结束"""
+        self._frame_listeners.pop(channel, None)
+        queue = self._channel_queues.pop(channel, None)
+        if queue is not None:
+            queue.close()
+
+    def _close_queues(self):
+        """连接关闭：通知所有消费者结束"""
+        for queue in self._channel_queues.values():
+            queue.close()
+        self._channel_queues.clear()
+        if self._inbox is not None:
+            self._inbox.put_nowait(_STREAM_CLOSED)
+        self._fail_pending()
+
+    def _fail_pending(self):
+        """连接断开：在途请求全部以 None 结束"""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result(None)
+
+    def _attach_socket(self, ws, keep_queues: bool = False):
+        """
+        绑定已建立的连接并启动后台读取任务
+
+        Args:
+            ws: 已完成握手的连接
+            keep_queues: 重连时为 True，保留现有队列，正在迭代的消费者无感知
+
+        连接发生变化时停止旧连接的读取任务并关闭旧连接，保证读取任务始终读取 self.ws。
+        """
+        previous = self.ws
+        if previous is not None and previous is not ws:
+            task = self._reader_task
+            self._reader_task = None
+            if task is not None and not task.done():
+                task.cancel()
+            asyncio.ensure_future(self._close_socket(previous))
+
+        self.ws = ws
+        if not keep_queues or self._inbox is None:
+            self._inbox = asyncio.Queue()
+        self._start_reader()
+
+    async def _close_socket(self, ws):
+        """关闭被替换的旧连接（错误只记录日志）"""
+        try:
+            await ws.close()
+        except Exception as e:
+            self.logger.error(f"关闭旧连接时发生错误: {type(e).__name__}: {e}")
+
+    def _start_reader(self):
+        """启动后台读取任务（每个连接只有一个）"""
+        if self.ws is None:
+            return
+        if self._reader_task is None or self._reader_task.done():
+            self._reader_task = asyncio.ensure_future(self._reader_loop(self.ws))
+
+    async def _stop_reader(self):
+        """停止后台读取任务"""
+        task = self._reader_task
+        self._reader_task = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _reader_loop(self, ws):
+        """
+        后台读取循环
 
-        except websockets.exceptions.ConnectionClosed as e:
+        每帧只解码一次，按 result.subscription 直接投递到对应频道队列，
+        避免多个消费者轮询 receive_message 时互相“抢走”对方的消息。
+        """
+        try:
+            while True:
+                raw = await ws.recv()
+                received_at = time.perf_counter()
+                received_wall_ms = time.time() * 1000
+                message = self._decode_message(raw)
+                if message is not None:
+                    decode_ms = (time.perf_counter() - received_at) * 1000
+                    self._record_latency(message, received_wall_ms, decode_ms)
+                    await self._route_message(message, received_at)
+
+        except ConnectionClosed as e:
             self.logger.error(f"❌ 连接已关闭: {e}")
-            self.ws = None
-            return None
 
         except Exception as e:
-            self.logger.error(f"❌ 接收消息时发生错误: {type(e).__name__}: {e}")
+            self.logger.error(f"❌ 后台读取任务发生错误: {type(e).__name__}: {e}")
             import traceback
             self.logger.error(traceback.format_exc())
+
+        if self.ws is ws:
+            self.ws = None
+        self._reader_task = None
+        self._reconnect_stats["disconnects"] += 1
+
+        if self.auto_reconnect and not self._closing:
+            # 被动断开：保留频道队列，等待重连后继续推送
+            self._fail_pending()
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
+        else:
+            self._close_queues()
+
+    def _decode_message(self, raw) -> Optional[Dict[str, Any]]:
+        """解析一帧 JSON 消息，失败或不是 JSON 对象时返回 None"""
+        try:
+            parsed = json_codec.loads(raw)
+        except json_codec.DecodeError as e:
+            self.logger.error(f"❌ JSON 解析失败: {e}")
+            self.logger.error(f"原始消息: {raw}")
+            return None
+
+        if not isinstance(parsed, dict):
+            self.logger.error(f"❌ 消息不是 JSON 对象（{type(parsed).__name__}），已丢弃: {raw}")
             return None
 
+        self.logger.debug(f"📥 收到消息（长度: {len(raw)}）: {list(parsed.keys())}")
+        return parsed
+
+    def _record_latency(self, message: Dict[str, Any], received_wall_ms: float, decode_ms: float):
+        """
+        记录数据推送的延迟
+
+        - exchange_to_client: 本地接收时间 - 交易所时间戳 t（交易所侧 + 网络/代理延迟，受两端时钟偏差影响）
+        - decode: 收到帧到解码完成（本端延迟）
+        """
+        result = message.get("result")
+        if not isinstance(result, dict):
+            return
+        subscription = result.get("subscription")
+        data = result.get("data")
+        if not subscription or not isinstance(data, list) or not data:
+            return
+
+        histograms = self._latency.get(subscription)
+        if histograms is None:
+            histograms = {"exchange_to_client": LatencyHistogram(), "decode": LatencyHistogram()}
+            self._latency[subscription] = histograms
+
+        exchange_time = data[0].get("t") if isinstance(data[0], dict) else None
+        if isinstance(exchange_time, (int, float)):
+            histograms["exchange_to_client"].record(received_wall_ms - exchange_time)
+        histograms["decode"].record(decode_ms)
+
+    def get_latency_stats(self, channel: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取延迟统计（毫秒）
+
+        Args:
+            channel: 订阅频道，None 表示全部频道
+
+        Returns:
+            Dict: {channel: {"exchange_to_client": 摘要, "decode": 摘要}}，
+                  摘要包含 count/min/max/mean/p50/p99/p999
+        """
+        channels = [channel] if channel is not None else list(self._latency)
+        return {
+            name: {kind: histogram.summary() for kind, histogram in self._latency[name].items()}
+            for name in channels if name in self._latency
+        }
+
+    def reset_latency_stats(self):
+        """清空延迟统计（会话级连接在用例之间调用）"""
+        self._latency.clear()
+
+    # ==================== 帧监听 ====================
+
+    def add_frame_listener(self, listener: Callable[[Dict[str, Any]], Any], channel: Optional[str] = None):
+        """
+        注册帧监听器：读取任务收到频道推送后、放入队列前同步调用 listener(message)
+
+        监听器在读取任务中执行，必须足够快（只做计数、抽样等），
+        不依赖消费者从队列取消息，因此可以覆盖每一帧（包括被 drop/conflate 的帧）。
+        可以在 subscribe 之前注册，以覆盖首条快照。
+
+        Args:
+            listener: 回调函数，参数为解码后的消息
+            channel: 订阅频道，None 表示所有频道
+        """
+        self._frame_listeners.setdefault(channel, []).append(listener)
+
+    def remove_frame_listener(self, listener: Callable[[Dict[str, Any]], Any], channel: Optional[str] = None):
+        """注销帧监听器（未注册时忽略）"""
+        listeners = self._frame_listeners.get(channel, [])
+        if listener in listeners:
+            listeners.remove(listener)
+        if not listeners:
+            self._frame_listeners.pop(channel, None)
+
+    def _notify_listeners(self, subscription: str, message: Dict[str, Any]):
+        """调用频道及全局监听器，监听器异常只记录日志，不影响读取任务"""
+        for channel in (subscription, None):
+            for listener in self._frame_listeners.get(channel, ()):
+                try:
+                    listener(message)
+                except Exception as e:
+                    self.logger.error(f"❌ 帧监听器出错 [{subscription}]: {type(e).__name__}: {e}")
+
+    async def _route_message(self, message: Dict[str, Any], received_at: float):
+        """
+        分发消息
+
+        - public/heartbeat: 读取任务立即回复，不依赖消费者的处理速度
+        - 控制请求响应: 按 id 完成 _pending 中的 Future
+        - 已注册频道的数据推送: 先通知帧监听器，再按队列策略放入对应频道队列（从不等待消费者）
+        - 其他消息: 放入 inbox
+        """
+        if message.get("method") == "public/heartbeat":
+            await self._respond_heartbeat(message, received_at)
+            return
+
+        result = message.get("result")
+        subscription = result.get("subscription") if isinstance(result, dict) else None
+
+        # 控制请求的响应：按 id 完成对应 Future
+        future = self._pending.get(message.get("id"))
+        if future is not None and not future.done():
+            future.set_result(message)
+            if subscription is None:
+                return
+
+        if subscription is not None and self._reconnected_at is not None:
+            elapsed_ms = (received_at - self._reconnected_at) * 1000
+            self._reconnect_stats["last_time_to_first_message_ms"] = elapsed_ms
+            self._reconnected_at = None
+            self.logger.info(f"🔁 重连后首条推送到达，耗时 {elapsed_ms:.2f}ms")
+
+        if subscription and self._frame_listeners:
+            self._notify_listeners(subscription, message)
+
+        queue = self._channel_queues.get(subscription) if subscription else None
+
+        if queue is not None:
+            overflowed = queue.overflowed
+            queue.put_nowait(message)
+            if queue.overflowed and not overflowed:
+                self.logger.error(f"❌ 频道 [{subscription}] 消费过慢，溢出区已满，队列已关闭: {queue.get_stats()}")
+        else:
+            self._inbox.put_nowait(message)
+
+    # ==================== 自动重连 ====================
+
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        """
+        指数退避 + 全抖动：在 [0, min(最大延迟, 基础延迟 * 2^(attempt-1))] 内随机取值
+
+        Args:
+            attempt: 第几次重连（从 1 开始）
+        """
+        ceiling = min(Config.WS_RECONNECT_MAX_DELAY, Config.WS_RECONNECT_BASE_DELAY * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    async def _reconnect(self) -> bool:
+        """
+        重连监控：沿用 connect 的代理链路重建连接，并重放当前订阅
+
+        Returns:
+            bool: 是否重连成功；全部尝试失败后关闭所有频道队列
+        """
+        max_attempts = Config.WS_RECONNECT_MAX_ATTEMPTS
+
+        for attempt in range(1, max_attempts + 1):
+            delay = self._backoff_delay(attempt)
+            self.logger.warning(f"🔁 连接已断开，{delay:.2f}秒后进行第 {attempt}/{max_attempts} 次重连")
+            await asyncio.sleep(delay)
+
+            if self._closing:
+                return False
+
+            try:
+                ws = await self._open_socket()
+            except Exception as e:
+                self._reconnect_stats["failed_attempts"] += 1
+                self.logger.error(f"❌ 第 {attempt} 次重连失败: {type(e).__name__}: {e}")
+                continue
+
+            self._attach_socket(ws, keep_queues=True)
+            self._reconnect_stats["reconnects"] += 1
+            self._reconnected_at = time.perf_counter()
+            self.logger.info(f"✅ 第 {attempt} 次重连成功")
+
+            await self._resubscribe()
+            return True
+
+        self.logger.error(f"❌ 重连 {max_attempts} 次均失败，放弃重连")
+        self._close_queues()
+        return False
+
+    async def _resubscribe(self):
+        """按断开前的订阅集合重新订阅（相同 extra_params 的频道一起流水线发送）"""
+        groups: Dict[str, List[str]] = {}
+        params_by_key: Dict[str, Optional[Dict[str, Any]]] = {}
+        for channel, extra_params in self._active_subscriptions.items():
+            key = json.dumps(extra_params, sort_keys=True)
+            groups.setdefault(key, []).append(channel)
+            params_by_key[key] = extra_params
+
+        for key, channels in groups.items():
+            self.logger.info(f"🔁 重新订阅 {len(channels)} 个频道")
+            responses = await self.subscribe_many(channels, extra_params=params_by_key[key])
+            failed = [channel for channel, response in responses.items()
+                      if response is None or response.get("code") != 0]
+            if failed:
+                self.logger.error(f"❌ 重新订阅失败: {failed}")
+
+    def get_reconnect_stats(self) -> Dict[str, Any]:
+        """
+        获取重连统计
+
+        Returns:
+            Dict: disconnects / reconnects / failed_attempts 计数，
+                  last_time_to_first_message_ms 最近一次重连到首条推送的耗时
+        """
+        return dict(self._reconnect_stats)
+
+    # ==================== 心跳 ====================
+
+    async def _respond_heartbeat(self, message: Dict[str, Any], received_at: float):
+        """
+        回复 public/heartbeat 并记录耗时
+
+        从收到心跳帧到回复发送完成的时间计入 response_ms，
+        这是交易所心跳往返中由本端贡献的部分。
+        """
+        stats = self._heartbeat_stats
+        stats["received"] += 1
+        if self._last_heartbeat_at is not None:
+            stats["last_interval_s"] = received_at - self._last_heartbeat_at
+        self._last_heartbeat_at = received_at
+
+        try:
+            await self.ws.send(json_codec.dumps({
+                "id": message.get("id"),
+                "method": "public/respond-heartbeat"
+            }))
+        except Exception as e:
+            stats["failed"] += 1
+            self.logger.error(f"❌ 回复心跳失败: {type(e).__name__}: {e}")
+            return
+
+        response_ms = (time.perf_counter() - received_at) * 1000
+        stats["responded"] += 1
+        stats["last_response_ms"] = response_ms
+        stats["total_response_ms"] += response_ms
+        stats["max_response_ms"] = max(stats["max_response_ms"], response_ms)
+        self.logger.info(f"💓 已回复心跳 (id: {message.get('id')}, 耗时: {response_ms:.2f}ms)")
+
+    def get_heartbeat_stats(self) -> Dict[str, Any]:
+        """
+        获取心跳统计
+
+        Returns:
+            Dict: received / responded / failed 计数，
+                  last / avg / max_response_ms 回复耗时，last_interval_s 心跳间隔
+        """
+        stats = dict(self._heartbeat_stats)
+        responded = stats["responded"]
+        stats["avg_response_ms"] = stats.pop("total_response_ms") / responded if responded else None
+        return stats
+
     # async def subscribe(
     #         self,
     #         channels: List[str],
@@ -341,73 +841,150 @@ class WebSocketClient:
     #         print("Timestamp:", timestamp)
     #         if not bids and not asks:
     #             print("⚠️ 当前没有可用的买单和卖单数据")
-    async def subscribe(
+    async def _send_request(
             self,
-            channels: List[str],
+            method: str,
+            params: Dict[str, Any],
             timeout: Optional[int] = None
     ) -> Optional[Dict[str, Any]]:
         """
-        订阅频道（Crypto.com Exchange 格式）
+        发送控制请求并等待同 id 的响应
+
+        响应由后台读取任务按 id 匹配到 _pending 中的 Future，
+        因此多个请求可以同时在途，中间到达的推送和心跳不会影响匹配。
+        发送前按 Config.RATE_LIMITS["ws:<method>"] 取令牌。
 
-        仅发送订阅请求，并等待**一个**订阅确认响应返回。
-        数据推送将在后续的 receive_message 调用中获取。
+        Args:
+            method: 请求方法（subscribe / unsubscribe）
+            params: 请求参数
+            timeout: 超时时间（秒）
+
+        Returns:
+            Dict: 响应消息，发送失败、超时或连接关闭返回 None
         """
         if not await self.is_connected():
-            self.logger.error("❌ WebSocket 未连接，无法订阅")
+            self.logger.error(f"❌ WebSocket 未连接，无法发送 {method} 请求")
             return None
 
+        # 按方法限流（跨进程共享），心跳回复不经过这里，不受限流影响
+        rate_limiter = get_rate_limiter(f"ws:{method}")
+        if rate_limiter is not None:
+            await rate_limiter.acquire_async()
+
         request_id = self._get_next_id()
+        future = asyncio.get_event_loop().create_future()
+        self._pending[request_id] = future
+
         message = {
             "id": request_id,
-            "method": "subscribe",
-            "params": {
-                "channels": channels
-            }
+            "method": method,
+            "params": params
         }
+        timeout_value = timeout if timeout is not None else self.timeout
 
-        self.logger.info("=" * 60)
-        self.logger.info(f"📢 开始订阅")
-        self.logger.info(f"频道: {channels}")
-        self.logger.info(f"请求 ID: {request_id}")
-        self.logger.info("=" * 60)
+        try:
+            if not await self.send_message(message):
+                self.logger.error(f"❌ 发送 {method} 请求失败 (id: {request_id})")
+                return None
+
+            self.logger.info(f"⏳ 等待 {method} 响应 (id: {request_id})...")
+            return await asyncio.wait_for(future, timeout=timeout_value)
 
-        # 发送订阅请求
-        if not await self.send_message(message):
-            self.logger.error("❌ 发送订阅请求失败")
+        except asyncio.TimeoutError:
+            self.logger.error(f"❌ 等待 {method} 响应超时 (id: {request_id}, {timeout_value}秒)")
             return None
 
-        # 仅等待**一个**订阅确认响应
-        self.logger.info("⏳ 等待订阅确认响应...")
-        timeout_value = timeout if timeout is not None else self.timeout
+        finally:
+            self._pending.pop(request_id, None)
 
-        try:
-            # 仅接收一次消息
-            response = await self.receive_message(timeout=timeout_value)
+    async def subscribe(
+            self,
+            channels: List[str],
+            timeout: Optional[int] = None,
+            extra_params: Optional[Dict[str, Any]] = None,
+            queue_policy: Optional[str] = None,
+            queue_maxsize: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        订阅频道（Crypto.com Exchange 格式）
 
-            if response is None:
-                self.logger.error("❌ 未收到订阅响应或超时")
-                return None
+        发送订阅请求并等待同 id 的订阅确认；数据推送通过 stream(channel) 获取。
 
-            # 检查是否是订阅确认响应（匹配 request_id）
-            if response.get("id") == request_id and response.get("method") == "subscribe":
-                code = response.get("code", -1)
+        Args:
+            channels: 要订阅的频道列表
+            timeout: 超时时间（秒）
+            extra_params: 额外订阅参数（如 book_subscription_type、book_update_frequency）
+            queue_policy: 频道队列策略（block / drop_oldest / conflate_latest），None 表示使用配置
+            queue_maxsize: 频道队列容量，None 表示使用配置
 
-                if code == 0:
-                    self.logger.info("=" * 60)
-                    self.logger.info("✅ 订阅确认成功并返回")
-                    self.logger.info("=" * 60)
-                    return response # ⭐ 成功返回确认消息
+        Returns:
+            Dict: 订阅确认响应（成功或错误码），超时或失败返回 None
 
-                else:
-                    self.logger.warning(f"订阅响应包含错误码: {response.get('code')}")
-                    return response
-            else:
-                self.logger.warning(f"⚠️ 收到非预期的消息作为订阅响应: {response}")
-                return None
+        Raises:
+            ValueError: 增量订阅（SNAPSHOT_AND_UPDATE）使用 conflate_latest 策略
+        """
+        if (queue_policy == QueuePolicy.CONFLATE_LATEST and extra_params
+                and extra_params.get("book_subscription_type") == "SNAPSHOT_AND_UPDATE"):
+            raise ValueError("增量订阅不能使用 conflate_latest 策略：合并会丢弃 book.update，导致序列号不连续")
+
+        self.logger.info(f"📢 订阅频道: {channels}")
+
+        # 发送前注册频道队列，确认之前到达的推送也不会丢失；
+        # 只记录本次新注册的频道，失败时不影响已有订阅或正在迭代的消费者。
+        # 已溢出关闭的队列不再复用，重新订阅时换新队列
+        for channel in channels:
+            queue = self._channel_queues.get(channel)
+            if queue is not None and queue.overflowed:
+                self._channel_queues.pop(channel)
+        registered = [channel for channel in channels if channel not in self._channel_queues]
+        for channel in channels:
+            self._register_channel(channel, queue_policy, queue_maxsize)
+
+        params = {"channels": channels}
+        if extra_params:
+            params.update(extra_params)
+
+        response = await self._send_request("subscribe", params, timeout)
+
+        if response is None or response.get("code") != 0:
+            if response is not None:
+                self.logger.warning(f"订阅响应包含错误码: {response.get('code')}")
+            for channel in registered:
+                self._release_channel(channel)
+            return response
+
+        for channel in channels:
+            self._active_subscriptions[channel] = extra_params
+        self.logger.info(f"✅ 订阅确认成功: {channels}")
+        return response
+
+    async def subscribe_many(
+            self,
+            channels: List[str],
+            timeout: Optional[int] = None,
+            extra_params: Optional[Dict[str, Any]] = None,
+            queue_policy: Optional[str] = None,
+            queue_maxsize: Optional[int] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        流水线订阅：每个频道一个请求，全部发出后再统一等待确认
 
-        except Exception as e:
-            self.logger.error(f"❌ 等待订阅确认时发生错误: {e}")
-            return None
+        Args:
+            channels: 要订阅的频道列表
+            timeout: 每个请求的超时时间（秒）
+            extra_params: 额外订阅参数（对每个请求生效）
+            queue_policy: 频道队列策略，见 subscribe
+            queue_maxsize: 频道队列容量，见 subscribe
+
+        Returns:
+            Dict: {channel: 订阅确认响应或 None}
+        """
+        responses = await asyncio.gather(
+            *(self.subscribe([channel], timeout=timeout, extra_params=extra_params,
+                             queue_policy=queue_policy, queue_maxsize=queue_maxsize)
+              for channel in channels)
+        )
+        return dict(zip(channels, responses))
 
     async def unsubscribe(
             self,
@@ -415,7 +992,7 @@ class WebSocketClient:
             timeout: Optional[int] = None
     ) -> Optional[Dict[str, Any]]:
         """
-        取消订阅频道un
+        取消订阅频道
 
         Args:
             channels: 要取消订阅的频道列表
@@ -424,46 +1001,34 @@ class WebSocketClient:
         Returns:
             Dict: 取消订阅响应，如果失败则返回 None
         """
-        if not await self.is_connected():
-            self.logger.error("WebSocket 未连接，无法取消订阅")
-            return None
-
-        request_id = self._get_next_id()
-
-        message = {
-            "id": request_id,
-            "method": "unsubscribe",
-            "params": {
-                "channels": channels
-            }
-        }
-
         self.logger.info(f"取消订阅频道: {channels}")
 
-        # 发送取消订阅请求
-        send_success = await self.send_message(message)
-        if not send_success:
-            self.logger.error("发送取消订阅请求失败")
-            return None
-
-        # 等待响应
-        self.logger.info("等待取消订阅响应...")
-        timeout_value = timeout if timeout is not None else self.timeout
+        response = await self._send_request("unsubscribe", {"channels": channels}, timeout)
 
-        try:
-            max_attempts = 5
-            for attempt in range(max_attempts):
-                response = await self.receive_message(timeout=timeout_value)
+        if response is not None:
+            self.logger.info(f"收到取消订阅响应: {response}")
+            if response.get("code") == 0:
+                for channel in channels:
+                    self._release_channel(channel)
+                    self._active_subscriptions.pop(channel, None)
+        return response
 
-                if response is None:
-                    continue
-
-                if "id" in response and response["id"] == request_id:
-                    self.logger.info(f"收到取消订阅响应: {response}")
-                    return response
+    async def unsubscribe_many(
+            self,
+            channels: List[str],
+            timeout: Optional[int] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        流水线取消订阅：每个频道一个请求并发发出
 
-            return None
+        Args:
+            channels: 要取消订阅的频道列表
+            timeout: 每个请求的超时时间（秒）
 
-        except Exception as e:
-            self.logger.error(f"等待取消订阅响应时发生错误: {e}")
-            return None
\ No newline at end of file
+        Returns:
+            Dict: {channel: 取消订阅响应或 None}
+        """
+        responses = await asyncio.gather(
+            *(self.unsubscribe([channel], timeout=timeout) for channel in channels)
+        )
+        return dict(zip(channels, responses))
@@ -0,0 +1,233 @@
+"""
+utils/ws_pool.py
+WebSocket 连接池 - 按频道分片到多条连接
+"""
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List, AsyncIterator
+
+from config.config import Config
+from utils.ws_client import WebSocketClient
+
+
+class WebSocketPool:
+    """
+    WebSocket 连接池
+
+    把 N 个频道分散到最多 M 条连接上：
+    - 每条连接的频道数不超过 max_channels_per_socket
+    - 新频道放到当前频道数最少的连接上；连接数未满且现有连接都已有频道时，先新建连接
+    - 对外提供与 WebSocketClient 相同的 subscribe / unsubscribe / stream 接口
+    """
+
+    def __init__(
+            self,
+            ws_url: str,
+            timeout: int = 30,
+            max_sockets: Optional[int] = None,
+            max_channels_per_socket: Optional[int] = None
+    ):
+        """
+        初始化连接池
+
+        Args:
+            ws_url: WebSocket URL
+            timeout: 超时时间（秒）
+            max_sockets: 最大连接数，None 表示使用 Config.WS_POOL_MAX_SOCKETS
+            max_channels_per_socket: 单连接最大频道数，None 表示使用 Config.WS_MAX_CHANNELS_PER_SOCKET
+        """
+        self.ws_url = ws_url
+        self.timeout = timeout
+        self.max_sockets = max_sockets or Config.WS_POOL_MAX_SOCKETS
+        self.max_channels_per_socket = max_channels_per_socket or Config.WS_MAX_CHANNELS_PER_SOCKET
+
+        self.clients: List[WebSocketClient] = []
+        # 每条连接上已分配的频道（下标与 clients 对应）
+        self._placements: List[set] = []
+        self._owners: Dict[str, WebSocketClient] = {}
+        self._lock = asyncio.Lock()
+        self.logger = self._setup_logger()
+
+    def _setup_logger(self):
+        """设置日志"""
+        logger = logging.getLogger(__name__)
+        logger.setLevel(logging.INFO)
+
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+
+        return logger
+
+    @property
+    def capacity(self) -> int:
+        """连接池可容纳的频道总数"""
+        return self.max_sockets * self.max_channels_per_socket
+
+    async def _open_client(self) -> WebSocketClient:
+        """新建一条连接并加入连接池"""
+        client = WebSocketClient(ws_url=self.ws_url, timeout=self.timeout)
+        if not await client.connect():
+            raise ConnectionError(f"连接池第 {len(self.clients) + 1} 条连接建立失败: {self.ws_url}")
+
+        self.clients.append(client)
+        self._placements.append(set())
+        self.logger.info(f"🔌 连接池新增连接，当前 {len(self.clients)}/{self.max_sockets} 条")
+        return client
+
+    async def _place(self, channel: str) -> WebSocketClient:
+        """为频道选择连接（调用方需持有 _lock）"""
+        if channel in self._owners:
+            return self._owners[channel]
+
+        loads = [len(channels) for channels in self._placements]
+        has_room = [i for i, load in enumerate(loads) if load < self.max_channels_per_socket]
+
+        if len(self.clients) < self.max_sockets and (not has_room or min(loads[i] for i in has_room) > 0):
+            await self._open_client()
+            index = len(self.clients) - 1
+        elif has_room:
+            index = min(has_room, key=lambda i: loads[i])
+        else:
+            raise ValueError(f"连接池已满: {len(self._owners)}/{self.capacity} 个频道")
+
+        self._placements[index].add(channel)
+        self._owners[channel] = self.clients[index]
+        return self.clients[index]
+
+    def _unplace(self, channel: str):
+        """释放频道占用的位置"""
+        client = self._owners.pop(channel, None)
+        if client is not None:
+            self._placements[self.clients.index(client)].discard(channel)
+
+    async def subscribe(
+            self,
+            channels: List[str],
+            timeout: Optional[int] = None,
+            extra_params: Optional[Dict[str, Any]] = None,
+            queue_policy: Optional[str] = None,
+            queue_maxsize: Optional[int] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        订阅频道：按最少负载分配到各连接，各连接内流水线发送
+
+        Args:
+            channels: 要订阅的频道列表
+            timeout: 每个请求的超时时间（秒）
+            extra_params: 额外订阅参数
+            queue_policy: 频道队列策略，见 WebSocketClient.subscribe
+            queue_maxsize: 频道队列容量
+
+        Returns:
+            Dict: {channel: 订阅确认响应或 None}
+
+        Raises:
+            ValueError: 连接池已满（本次分配的频道全部回退）
+            ConnectionError: 新建连接失败（同上）
+        """
+        async with self._lock:
+            groups: Dict[int, List[str]] = {}
+            # 本次新分配的频道：分配中途失败或订阅失败时只回退这些，不影响已在工作的订阅
+            placed: List[str] = []
+            try:
+                for channel in channels:
+                    if channel not in self._owners:
+                        placed.append(channel)
+                    client = await self._place(channel)
+                    groups.setdefault(self.clients.index(client), []).append(channel)
+            except Exception:
+                for channel in placed:
+                    self._unplace(channel)
+                raise
+
+        results = await asyncio.gather(*(
+            self.clients[index].subscribe_many(group, timeout=timeout, extra_params=extra_params,
+                                               queue_policy=queue_policy, queue_maxsize=queue_maxsize)
+            for index, group in groups.items()
+        ))
+
+        responses: Dict[str, Optional[Dict[str, Any]]] = {}
+        for result in results:
+            responses.update(result)
+
+        for channel in placed:
+            response = responses.get(channel)
+            if response is None or response.get("code") != 0:
+                self._unplace(channel)
+        return responses
+
+    async def unsubscribe(
+            self,
+            channels: List[str],
+            timeout: Optional[int] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        取消订阅频道
+
+        Returns:
+            Dict: {channel: 取消订阅响应或 None}
+        """
+        groups: Dict[int, List[str]] = {}
+        for channel in channels:
+            client = self._owners.get(channel)
+            if client is not None:
+                groups.setdefault(self.clients.index(client), []).append(channel)
+
+        results = await asyncio.gather(*(
+            self.clients[index].unsubscribe_many(group, timeout=timeout)
+            for index, group in groups.items()
+        ))
+
+        responses: Dict[str, Optional[Dict[str, Any]]] = {}
+        for result in results:
+            responses.update(result)
+
+        for channel, response in responses.items():
+            if response is not None and response.get("code") == 0:
+                self._unplace(channel)
+        return responses
+
+    def stream(self, channel: str, timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        迭代频道推送，调用方无需关心频道在哪条连接上
+
+        Raises:
+            KeyError: 频道未通过连接池订阅
+        """
+        if channel not in self._owners:
+            raise KeyError(f"频道未在连接池中订阅: {channel}")
+        return self._owners[channel].stream(channel, timeout=timeout)
+
+    def owner_of(self, channel: str) -> Optional[WebSocketClient]:
+        """频道所在的连接"""
+        return self._owners.get(channel)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        获取各连接统计
+
+        Returns:
+            List: 每条连接的频道数、心跳统计、重连统计和频道队列统计
+        """
+        return [
+            {
+                "socket": index,
+                "channels": len(self._placements[index]),
+                "heartbeat": client.get_heartbeat_stats(),
+                "reconnect": client.get_reconnect_stats(),
+                "queues": client.get_queue_stats(),
+            }
+            for index, client in enumerate(self.clients)
+        ]
+
+    async def close(self):
+        """断开所有连接"""
+        await asyncio.gather(*(client.disconnect() for client in self.clients))
+        self.clients.clear()
+        self._placements.clear()
+        self._owners.clear()
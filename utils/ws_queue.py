@@ -0,0 +1,180 @@
+"""
+utils/ws_queue.py
+频道消息队列 - 有界队列 + 消费者跟不上时的处理策略
+"""
+import asyncio
+from collections import deque
+from typing import Any, Dict
+
+
+# 队列结束标记：连接关闭或取消订阅时返回给消费者，通知其退出
+STREAM_CLOSED = object()
+
+
+class QueuePolicy:
+    """队列满时的处理策略"""
+    # 不静默丢消息：协程 put 等待消费者取走消息；读取任务使用 put_nowait，不会被挂起
+    # （心跳回复、请求确认和其他频道的分发不受影响），超出容量的消息暂存在有界溢出区；
+    # 溢出区也满时队列标记为 overflowed 并关闭，消费者收到错误而不是缺口数据
+    BLOCK = "block"
+    # 丢弃最旧的一条，为新消息腾出位置
+    DROP_OLDEST = "drop_oldest"
+    # 只保留最新一条：新消息到达时替换所有未消费的消息（只适用于全量快照频道）
+    CONFLATE_LATEST = "conflate_latest"
+
+    ALL = (BLOCK, DROP_OLDEST, CONFLATE_LATEST)
+
+
+class SubscriptionQueue:
+    """
+    单个订阅的消息队列
+
+    与 asyncio.Queue 的区别：
+    - 按策略处理队列满的情况，并统计丢弃/合并/阻塞次数
+    - put_nowait() 从不等待：block 策略下超出容量的消息按顺序暂存（最多 overflow_maxsize 条），
+      消费者取走消息后依次补入；溢出区满时关闭队列并标记 overflowed
+    - close() 总能成功（不受容量限制），消费者取完剩余消息后收到 STREAM_CLOSED
+    """
+
+    def __init__(self, maxsize: int = 0, policy: str = QueuePolicy.BLOCK, overflow_maxsize: int = 0):
+        """
+        Args:
+            maxsize: 队列容量，0 表示不限（conflate_latest 始终只保留 1 条）
+            policy: 队列满时的处理策略，见 QueuePolicy
+            overflow_maxsize: block 策略下 put_nowait 溢出区的容量，0 表示与 maxsize 相同
+
+        Raises:
+            ValueError: 未知策略
+        """
+        if policy not in QueuePolicy.ALL:
+            raise ValueError(f"未知的队列策略: {policy}（可选: {', '.join(QueuePolicy.ALL)}）")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.overflow_maxsize = overflow_maxsize or maxsize
+        self.closed = False
+        # 溢出区已满、队列被关闭（消费者跟不上，之后的消息全部丢失）
+        self.overflowed = False
+
+        self._items: deque = deque()
+        # block 策略下 put_nowait 超出容量的消息（按到达顺序补入 _items）
+        self._overflow: deque = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+        self.stats = {
+            "received": 0,
+            "delivered": 0,
+            "dropped": 0,
+            "conflated": 0,
+            "blocked": 0,
+            "overflow": 0,
+            "max_depth": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._items) + len(self._overflow)
+
+    def full(self) -> bool:
+        return self.maxsize > 0 and len(self._items) >= self.maxsize
+
+    async def put(self, message: Any):
+        """
+        放入一条消息，按策略处理队列满的情况（队列已关闭时直接丢弃）
+        """
+        if self.closed:
+            return
+        self.stats["received"] += 1
+
+        if self.policy == QueuePolicy.CONFLATE_LATEST:
+            self.stats["conflated"] += len(self._items)
+            self._items.clear()
+
+        elif self.full():
+            if self.policy == QueuePolicy.DROP_OLDEST:
+                self._items.popleft()
+                self.stats["dropped"] += 1
+            else:
+                self.stats["blocked"] += 1
+                while self.full() and not self.closed:
+                    self._not_full.clear()
+                    await self._not_full.wait()
+                if self.closed:
+                    return
+
+        self._items.append(message)
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(self._items))
+        self._not_empty.set()
+
+    def put_nowait(self, message: Any):
+        """
+        放入一条消息且从不等待（后台读取任务使用）
+
+        drop_oldest / conflate_latest 与 put 相同；block 策略下队列满时消息进入溢出区，
+        计入 overflow，消费者取走消息后按顺序补入队列。溢出区也满时不再缓存：
+        队列标记为 overflowed 并关闭，消费者取完已缓存的消息后结束（内存占用有上限）。
+        """
+        if self.closed:
+            return
+        self.stats["received"] += 1
+
+        if self.policy == QueuePolicy.CONFLATE_LATEST:
+            self.stats["conflated"] += len(self._items)
+            self._items.clear()
+
+        elif self.full() or self._overflow:
+            if self.policy == QueuePolicy.DROP_OLDEST:
+                self._items.popleft()
+                self.stats["dropped"] += 1
+            elif len(self._overflow) >= self.overflow_maxsize:
+                self.stats["dropped"] += 1
+                self.overflowed = True
+                self.close()
+                return
+            else:
+                self.stats["overflow"] += 1
+                self._overflow.append(message)
+                self.stats["max_depth"] = max(self.stats["max_depth"], len(self))
+                return
+
+        self._items.append(message)
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(self._items))
+        self._not_empty.set()
+
+    async def get(self) -> Any:
+        """
+        取出一条消息
+
+        Returns:
+            消息；队列已关闭且没有剩余消息时返回 STREAM_CLOSED
+        """
+        while not self._items:
+            if self.closed:
+                return STREAM_CLOSED
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        message = self._items.popleft()
+        self.stats["delivered"] += 1
+        if self._overflow:
+            self._items.append(self._overflow.popleft())
+        else:
+            self._not_full.set()
+        return message
+
+    def close(self):
+        """关闭队列：唤醒等待中的消费者和生产者"""
+        self.closed = True
+        self._not_empty.set()
+        self._not_full.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """队列统计（含当前积压数量和策略）"""
+        return {
+            **self.stats,
+            "depth": len(self),
+            "maxsize": self.maxsize,
+            "policy": self.policy,
+            "overflowed": self.overflowed,
+        }
@@ -7,12 +7,47 @@ import allure
 from typing import Dict, Any
 import time
 import asyncio
+from utils.orderbook import OrderBook
+from utils.stream_validator import StreamingValidator
+from data.ws_data_loader import WebSocketDataLoader
 
 
 
 class WebSocketTestHelper:
     """WebSocket 测试辅助类"""
 
+    @staticmethod
+    def attach_latency_stats(ws_client, test_logger, channels):
+        """
+        附加各频道的延迟分位数到 Allure 报告
+
+        exchange_to_client 偏高而 decode 正常，说明延迟在交易所侧或网络/代理；
+        decode 偏高说明本端解码是瓶颈。
+        """
+        stats = {channel: ws_client.get_latency_stats(channel).get(channel) for channel in channels}
+        for channel, channel_stats in stats.items():
+            if channel_stats:
+                exchange, decode = channel_stats["exchange_to_client"], channel_stats["decode"]
+                test_logger.info(
+                    f"⏱️ [{channel}] 交易所→本地 p50/p99/p999: "
+                    f"{exchange['p50']}/{exchange['p99']}/{exchange['p999']} ms | "
+                    f"解码 p50/p99/p999: {decode['p50']}/{decode['p99']}/{decode['p999']} ms"
+                )
+        allure.attach(
+            json.dumps(stats, indent=2, ensure_ascii=False),
+            name="延迟统计 (ms)",
+            attachment_type=allure.attachment_type.JSON
+        )
+
+    @staticmethod
+    def report_stream(stream: StreamingValidator, test_logger):
+        """流式验证结果：一行汇总日志 + 一个 Allure 附件"""
+        stats = stream.get_stats()
+        test_logger.info(
+            f"📊 [{stats['name']}] 流式验证 {stats['frames']} 帧（{stats['frames_per_s']} 帧/秒），"
+            f"失败 {stats['failed_frames']} 帧 {stats['violations'] or ''}"
+        )
+        stream.attach()
 
     async def execute_subscribe_test(
             ws_client,
@@ -21,7 +56,7 @@ class WebSocketTestHelper:
             case: Dict[str, Any],
             validator
     ):
-        """执行订阅测试的通用流程 - 连续获取5条数据"""
+        """执行订阅测试的通用流程 - 连续获取 expected.message_count 条数据（默认 5 条）"""
         case_id = case['case_id']
         params = case['params']
         expected = case.get('expected', {})
@@ -31,6 +66,13 @@ class WebSocketTestHelper:
         depth = params['depth']
         channel = f"book.{instrument_name}.{depth}"
 
+        target_count = expected.get('message_count', 5)
+
+        # 流式验证：订阅前挂到读取路径上，收集期间的每一帧都执行用例 expected 编译好的检查
+        checks = WebSocketDataLoader.get_compiled_checks(case_id, case.get('channel_type', 'orderbook'))
+        stream = StreamingValidator(checks[channel], name=channel)
+        ws_client.add_frame_listener(stream, channel)
+
         with allure.step(f"1. 订阅频道: {channel}"):
             test_logger.info("=" * 80)
             test_logger.info(f"📢 发送订阅请求: {channel}")
@@ -56,80 +98,35 @@ class WebSocketTestHelper:
             validator.validate_subscription_response(subscribe_confirm)
             test_logger.info("✅ 订阅确认验证通过")
 
-        with allure.step("3. 等待并收集 5 条订单簿数据推送 (40秒超时)"):
+        with allure.step(f"3. 等待并收集 {target_count} 条订单簿数据推送 (20秒超时)"):
             test_logger.info("=" * 80)
-            test_logger.info(f"⏳ 开始连续收集 5 条订单簿数据，最大允许 40 秒...")
+            test_logger.info(f"⏳ 开始连续收集 {target_count} 条订单簿数据，最大允许 20 秒...")
             test_logger.info("=" * 80)
 
             book_data_list = []
-            target_count = 5
             timeout_seconds = 20
             start_time = time.monotonic()
 
-            # 尝试次数限制可以取消，只要在时间限制内就好
-            # max_attempts = 100
+            async def _collect():
+                # 后台读取任务已按频道分发，这里只会收到目标频道的数据
+                async for message in ws_client.stream(channel, timeout=8):
+                    book_data_list.append(message)
+                    test_logger.info(f"✅ 成功捕获 1 条目标频道数据 (Total: {len(book_data_list)})")
+                    if len(book_data_list) >= target_count:
+                        return
 
-            while len(book_data_list) < target_count:
-                elapsed_time = time.monotonic() - start_time
-
-                # 检查总超时
-                if elapsed_time > timeout_seconds:
-                    error_msg = f"❌ 严重超时：超过 {timeout_seconds} 秒 ({len(book_data_list)}/{target_count} 条)，强制退出！"
-                    test_logger.error(error_msg)
-                    raise AssertionError(error_msg)  # 抛出异常，测试失败并退出
-
-                try:
-                    test_logger.info(
-                        f"🔍 尝试接收 (已耗时: {elapsed_time:.2f}s) | 已收集: {len(book_data_list)}/{target_count}")
+            try:
+                await asyncio.wait_for(_collect(), timeout=timeout_seconds)
+            except asyncio.TimeoutError:
+                pass
 
-                    # 使用 asyncio.wait_for 强制单次接收超时，以防止内部阻塞
-                    message = await asyncio.wait_for(
-                        ws_client.receive_message(timeout=8),
-                        timeout=10  # 外部等待时间略长于内部
-                    )
+            if len(book_data_list) < target_count:
+                error_msg = f"❌ 严重超时：超过 {timeout_seconds} 秒 ({len(book_data_list)}/{target_count} 条)，强制退出！"
+                test_logger.error(error_msg)
+                raise AssertionError(error_msg)
 
-                    if message is None:
-                        test_logger.warning(f"⚠️  单次接收超时 (8s)，继续尝试...")
-                        continue
-
-                    # 调试日志：打印收到的原始消息类型和 method
-                    msg_method = message.get("method", "N/A")
-                    test_logger.info(f"📨 收到消息: Method='{msg_method}'")
-
-                    # 处理心跳 (必须回复，否则服务器可能主动断开导致卡死)
-                    if msg_method == "public/heartbeat":
-                        test_logger.info("💓 收到心跳，回复 pong")
-                        await ws_client.send_message({
-                            "id": message.get("id"),
-                            "method": "public/respond-heartbeat"
-                        })
-                        continue
-
-                    # 检查是否是目标频道数据
-                    result = message.get("result", {})
-                    msg_sub = result.get("subscription", "N/A")
-
-                    if (msg_method == "subscribe" and
-                            isinstance(result, dict) and
-                            msg_sub == channel):
-
-                        book_data_list.append(message)
-                        test_logger.info(f"✅ 成功捕获 1 条目标频道数据 (Total: {len(book_data_list)})")
-                    else:
-                        test_logger.info(f"📬 收到非目标消息 (Channel: {msg_sub})，继续等待...")
-
-                except asyncio.TimeoutError:
-                    test_logger.error(f"❌ 接收消息严重超时 (>10s)，可能是底层连接问题，继续检查总时间...")
-                    continue  # 总超时会在 while 顶部检查
-
-                except Exception as e:
-                    test_logger.exception(f"❌ 接收过程中发生致命异常: {e}")
-                    raise AssertionError(f"致命异常导致测试终止: {e}")  # 任何其他异常都应失败测试
-
-            # 如果循环结束，说明成功收集了足够的数据
             test_logger.info(f"🎉 成功收集到 {target_count} 条数据，用时 {time.monotonic() - start_time:.2f}s。")
-
-
+            WebSocketTestHelper.attach_latency_stats(ws_client, test_logger, [channel])
 
         # 循环验证每一条收到的数据
         for idx, book_data in enumerate(book_data_list):
@@ -147,14 +144,6 @@ class WebSocketTestHelper:
                     expected_subscription=channel,
                     expected_depth=depth
                 )
-                # 新增的内容验证
-                try:
-                    test_logger.info("验证订单簿业务内容：价格排序、买卖盘不倒挂")
-                    validator.validate_orderbook_content(book_data)
-                    test_logger.info(f"📸 快照 {idx + 1} 业务内容校验通过(价格排序、买卖盘不倒挂)")
-                except AssertionError as e:
-                    test_logger.error(f"📸 快照 {idx + 1} 业务校验失败(价格排序、买卖盘不倒挂): {str(e)}")
-                    raise e
 
                 # 输出详情
                 if len(result.get("data", [])) > 0:
@@ -168,6 +157,11 @@ class WebSocketTestHelper:
                     attachment_type=allure.attachment_type.JSON
                 )
 
+        with allure.step("5. 流式验证：收集期间每条推送的业务内容（价格排序、买卖盘不倒挂）"):
+            ws_client.remove_frame_listener(stream, channel)
+            WebSocketTestHelper.report_stream(stream, test_logger)
+            stream.assert_clean(min_frames=target_count)
+
         test_logger.info("=" * 80)
         test_logger.info(f"🎉 测试用例 {case_id} 成功收集并验证 {target_count} 条数据")
         test_logger.info("=" * 80)
@@ -179,7 +173,7 @@ class WebSocketTestHelper:
             case: Dict[str, Any],
             validator
     ):
-        """执行多频道订阅测试的通用流程 - 每个频道连续获取5条数据"""
+        """执行多频道订阅测试的通用流程 - 各频道平分 expected.message_count 条数据（默认每个频道 5 条）"""
         case_id = case['case_id']
         params = case['params']
         expected = case.get('expected', {})
@@ -193,6 +187,16 @@ class WebSocketTestHelper:
             channel = f"book.{instrument_name}.{depth}"
             channels.append(channel)
 
+        target_count_per_channel = max(1, expected['message_count'] // len(channels)) \
+            if expected.get('message_count') else 5
+
+        # 流式验证：每个频道一个，订阅前注册，执行用例 expected 编译好的检查
+        checks = WebSocketDataLoader.get_compiled_checks(case_id, case.get('channel_type', 'orderbook'))
+        streams = {}
+        for channel in channels:
+            streams[channel] = StreamingValidator(checks[channel], name=channel)
+            ws_client.add_frame_listener(streams[channel], channel)
+
         with allure.step(f"1. 订阅多个频道: {', '.join(channels)}"):
             test_logger.info("=" * 80)
             test_logger.info(f"📢 发送多频道订阅请求: {channels}")
@@ -222,90 +226,44 @@ class WebSocketTestHelper:
         for channel in channels:
             all_channel_data[channel] = []
 
-        with allure.step(f"3. 等待并收集每个频道各 5 条订单簿数据推送 (60秒超时)"):
+        with allure.step(f"3. 等待并收集每个频道各 {target_count_per_channel} 条订单簿数据推送 (60秒超时)"):
             test_logger.info("=" * 80)
-            test_logger.info(f"⏳ 开始为 {len(channels)} 个频道分别收集 5 条数据...")
+            test_logger.info(f"⏳ 开始为 {len(channels)} 个频道分别收集 {target_count_per_channel} 条数据...")
             test_logger.info("=" * 80)
 
-            target_count_per_channel = 5
             timeout_seconds = 60
             start_time = time.monotonic()
 
             # 计算总目标数量
             total_target = len(channels) * target_count_per_channel
-            total_collected = 0
 
-            while total_collected < total_target:
-                elapsed_time = time.monotonic() - start_time
+            async def _collect(channel):
+                # 每个频道独立消费自己的队列，无需再按 subscription 过滤
+                async for message in ws_client.stream(channel, timeout=8):
+                    all_channel_data[channel].append(message)
+                    test_logger.info(f"✅ 频道 [{channel}] 捕获第 {len(all_channel_data[channel])} 条数据")
+                    if len(all_channel_data[channel]) >= target_count_per_channel:
+                        return
 
-                # 检查总超时
-                if elapsed_time > timeout_seconds:
-                    error_msg = f"❌ 严重超时：超过 {timeout_seconds} 秒 ({total_collected}/{total_target} 条)，强制退出！"
-                    test_logger.error(error_msg)
-                    # 输出每个频道的收集情况
-                    for ch, data_list in all_channel_data.items():
-                        test_logger.error(f"  频道 {ch}: {len(data_list)}/{target_count_per_channel} 条")
-                    raise AssertionError(error_msg)
-
-                try:
-                    test_logger.info(
-                        f"🔍 尝试接收 (已耗时: {elapsed_time:.2f}s) | 总进度: {total_collected}/{total_target}")
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(_collect(channel) for channel in channels)),
+                    timeout=timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                pass
 
-                    # 使用 asyncio.wait_for 强制单次接收超时
-                    message = await asyncio.wait_for(
-                        ws_client.receive_message(timeout=8),
-                        timeout=10
-                    )
+            total_collected = sum(len(data_list) for data_list in all_channel_data.values())
+            if total_collected < total_target:
+                error_msg = f"❌ 严重超时：超过 {timeout_seconds} 秒 ({total_collected}/{total_target} 条)，强制退出！"
+                test_logger.error(error_msg)
+                # 输出每个频道的收集情况
+                for ch, data_list in all_channel_data.items():
+                    test_logger.error(f"  频道 {ch}: {len(data_list)}/{target_count_per_channel} 条")
+                raise AssertionError(error_msg)
 
-                    if message is None:
-                        test_logger.warning(f"⚠️  单次接收超时 (8s)，继续尝试...")
-                        continue
-
-                    # 调试日志：打印收到的原始消息类型和 method
-                    msg_method = message.get("method", "N/A")
-                    test_logger.info(f"📨 收到消息: Method='{msg_method}'")
-
-                    # 处理心跳
-                    if msg_method == "public/heartbeat":
-                        test_logger.info("💓 收到心跳，回复 pong")
-                        await ws_client.send_message({
-                            "id": message.get("id"),
-                            "method": "public/respond-heartbeat"
-                        })
-                        continue
-
-                    # 检查是否是目标频道数据
-                    result = message.get("result", {})
-                    msg_sub = result.get("subscription", "N/A")
-
-                    if msg_method == "subscribe" and isinstance(result, dict):
-                        # 检查是否属于我们订阅的频道之一
-                        if msg_sub in channels:
-                            # 检查该频道是否还需要更多数据
-                            if len(all_channel_data[msg_sub]) < target_count_per_channel:
-                                all_channel_data[msg_sub].append(message)
-                                total_collected += 1
-                                test_logger.info(
-                                    f"✅ 频道 [{msg_sub}] 捕获第 {len(all_channel_data[msg_sub])} 条数据 "
-                                    f"(总进度: {total_collected}/{total_target})"
-                                )
-                            else:
-                                test_logger.info(f"📬 频道 [{msg_sub}] 已收集足够数据，忽略此消息")
-                        else:
-                            test_logger.info(f"📬 收到非目标频道消息 (Channel: {msg_sub})，继续等待...")
-                    else:
-                        test_logger.info(f"📬 收到非订阅推送消息，继续等待...")
-
-                except asyncio.TimeoutError:
-                    test_logger.error(f"❌ 接收消息严重超时 (>10s)，可能是底层连接问题，继续检查总时间...")
-                    continue
-
-                except Exception as e:
-                    test_logger.exception(f"❌ 接收过程中发生致命异常: {e}")
-                    raise AssertionError(f"致命异常导致测试终止: {e}")
-
-            # 如果循环结束，说明成功收集了足够的数据
             test_logger.info(f"🎉 成功为所有频道收集到数据，用时 {time.monotonic() - start_time:.2f}s。")
+            WebSocketTestHelper.attach_latency_stats(ws_client, test_logger, channels)
 
         # 验证每个频道的数据
         for channel_idx, (channel, book_data_list) in enumerate(all_channel_data.items()):
@@ -340,19 +298,6 @@ class WebSocketTestHelper:
                         expected_depth=depth
                     )
 
-                    # 验证订单簿业务内容
-                    try:
-                        test_logger.info(f"验证频道 [{channel}] 订单簿业务内容：价格排序、买卖盘不倒挂")
-                        validator.validate_orderbook_content(book_data)
-                        test_logger.info(
-                            f"📸 频道 [{channel}] 快照 {current_index} 业务内容校验通过(价格排序、买卖盘不倒挂)"
-                        )
-                    except AssertionError as e:
-                        test_logger.error(
-                            f"📸 频道 [{channel}] 快照 {current_index} 业务校验失败(价格排序、买卖盘不倒挂): {str(e)}"
-                        )
-                        raise e
-
                     # 输出详情
                     if len(result.get("data", [])) > 0:
                         snapshot = result["data"][0]
@@ -368,6 +313,13 @@ class WebSocketTestHelper:
                         attachment_type=allure.attachment_type.JSON
                     )
 
+        with allure.step("5. 流式验证：各频道收集期间每条推送的业务内容"):
+            for channel, stream in streams.items():
+                ws_client.remove_frame_listener(stream, channel)
+                WebSocketTestHelper.report_stream(stream, test_logger)
+            for stream in streams.values():
+                stream.assert_clean(min_frames=target_count_per_channel)
+
         test_logger.info("=" * 80)
         test_logger.info(
             f"🎉 测试用例 {case_id} 成功收集并验证 {len(channels)} 个频道，"
@@ -407,13 +359,10 @@ class WebSocketTestHelper:
         with allure.step("2. 捕获取消订阅前的数据推送"):
             test_logger.info("⏳ 等待接收第一条订单簿数据...")
             try:
-                # 尝试接收一条真实数据
-                message = await asyncio.wait_for(ws_client.receive_message(timeout=10), timeout=12)
-
-                # 如果收到心跳，处理并再等一次
-                if message and message.get("method") == "public/heartbeat":
-                    await ws_client.send_message({"id": message.get("id"), "method": "public/respond-heartbeat"})
-                    message = await asyncio.wait_for(ws_client.receive_message(timeout=10), timeout=12)
+                # 尝试从频道队列接收一条真实数据
+                message = None
+                async for message in ws_client.stream(channel, timeout=10):
+                    break
 
                 if message and message.get("method") == "subscribe":
                     test_logger.info(f"✅ 已收到频道数据推送: {channel}")
@@ -456,6 +405,80 @@ class WebSocketTestHelper:
                 test_logger.info("✅ 确认：5秒内未收到新推送，取消订阅完全生效")
 
 
+    @staticmethod
+    async def execute_delta_book_test(
+            ws_client,
+            test_logger,
+            save_response,
+            case: Dict[str, Any],
+            validator
+    ):
+        """快照 + 增量订阅：本地重建订单簿，校验序列号连续、买卖盘不倒挂"""
+        case_id = case['case_id']
+        params = case['params']
+        expected = case.get('expected', {})
+
+        instrument_name = params['instrument_name']
+        depth = params['depth']
+        channel = f"book.{instrument_name}.{depth}"
+        target_count = expected.get('message_count', 50)
+        timeout_seconds = 60
+
+        with allure.step(f"1. 订阅频道 (SNAPSHOT_AND_UPDATE): {channel}"):
+            subscribe_confirm = await ws_client.subscribe(
+                channels=[channel],
+                timeout=30,
+                extra_params={
+                    "book_subscription_type": params['book_subscription_type'],
+                    "book_update_frequency": params['book_update_frequency']
+                }
+            )
+            assert subscribe_confirm is not None, "未收到订阅确认响应"
+            validator.validate_subscription_response(subscribe_confirm)
+            test_logger.info("✅ 订阅确认验证通过")
+
+        book = OrderBook(instrument_name, depth=depth, strict=expected.get('sequence_continuous', True))
+
+        with allure.step(f"2. 应用快照与增量，共 {target_count} 条"):
+            processed = 0
+            start_time = time.monotonic()
+
+            async def _apply():
+                nonlocal processed
+                async for message in ws_client.stream(channel, timeout=10):
+                    book.apply_message(message)
+                    processed += 1
+                    assert not book.is_crossed(), \
+                        f"❌ 订单簿倒挂! 买一: {book.best_bid()}, 卖一: {book.best_ask()} (第 {processed} 条)"
+                    if processed >= target_count:
+                        return
+
+            try:
+                await asyncio.wait_for(_apply(), timeout=timeout_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+            test_logger.info(
+                f"📊 已处理 {processed} 条，用时 {time.monotonic() - start_time:.2f}s，统计: {book.stats}")
+            assert processed >= target_count, \
+                f"❌ 超时：{timeout_seconds} 秒内只收到 {processed}/{target_count} 条"
+            assert book.stats["snapshots"] >= 1, "未收到初始快照"
+            assert book.stats["sequence_gaps"] == 0, f"序列号不连续: {book.stats}"
+            WebSocketTestHelper.attach_latency_stats(ws_client, test_logger, [channel])
+
+        with allure.step("3. 校验本地重建的订单簿"):
+            snapshot = book.to_snapshot()
+            validator.validate_orderbook_content(snapshot)
+            test_logger.info(f"📸 买一: {book.best_bid()} | 卖一: {book.best_ask()} | 价差: {book.spread()}")
+
+            if save_response:
+                save_response(data=snapshot, case_id=case_id, step="rebuilt_orderbook")
+            allure.attach(
+                json.dumps({"stats": book.stats, "book": snapshot}, indent=2, ensure_ascii=False),
+                name="本地重建订单簿",
+                attachment_type=allure.attachment_type.JSON
+            )
+
     @staticmethod
     async def execute_error_test(ws_client, test_logger, save_response, case, validator):
         params = case['params']
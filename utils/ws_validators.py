@@ -5,6 +5,38 @@ WebSocket 数据验证器（适配 Crypto.com Exchange）
 from typing import Dict, Any, List, Optional
 import logging
 
+from utils.schema import Field, compile_schema
+from utils.violation_report import ViolationReport, log_outcome, record_or_raise, report_mark
+
+
+# 订阅响应: {"id": 1, "method": "subscribe", "code": 0, "channel": "book.BTCUSD-PERP.10"}
+validate_subscription_shape = compile_schema(
+    {
+        "id": int,
+        "method": Field(str, equals="subscribe"),
+        "code": int,
+    },
+    name="validate_subscription_shape",
+    root="订阅响应"
+)
+
+# 订单簿推送（结构部分，subscription/depth 与订阅参数的比较在 validate_book_push_message 中）
+validate_book_push_shape = compile_schema(
+    {
+        "method": Field(str, equals="subscribe"),
+        "code": Field(int, equals=0),
+        "result": {
+            "instrument_name": str,
+            "subscription": str,
+            "channel": Field(str, equals="book"),
+            "depth": int,
+            "data": Field([{"bids": list, "asks": list, "t": (int, float)}], nonempty=True),
+        },
+    },
+    name="validate_book_push_shape",
+    root="推送消息"
+)
+
 
 class WebSocketValidator:
     """WebSocket 数据验证器"""
@@ -52,24 +84,15 @@ class WebSocketValidator:
             AssertionError: 验证失败时抛出
         """
         try:
-            # 首先检查响应是否为空
-            assert response is not None, "订阅响应为空（None）"
-            assert isinstance(response, dict), f"订阅响应应该是字典类型（实际类型: {type(response)}）"
+            # 结构：id / method == "subscribe" / code（编译后的校验函数，错误信息包含字段路径）
+            validate_subscription_shape(response)
 
             self.logger.info(f"开始验证订阅响应: {response}")
 
-            # Crypto.com 响应格式验证
-            # 必需字段: id, method, code
-            assert "id" in response, "缺少 id 字段"
-            assert "method" in response, "缺少 method 字段"
-            assert "code" in response, "缺少 code 字段"
-
             request_id = response["id"]
             method = response["method"]
             code = response["code"]
 
-            assert method == "subscribe", f"method 应该是 'subscribe'（实际: {method}）"
-
             self.logger.info(f"请求 ID: {request_id}, 方法: {method}, 响应码: {code}")
 
             # 验证响应码
@@ -143,53 +166,19 @@ class WebSocketValidator:
             bool: 验证是否通过
         """
         try:
-            assert message is not None, "推送消息为空"
-            assert isinstance(message, dict), f"推送消息应该是字典（实际: {type(message)}）"
+            # 结构：必需字段、类型、method/code/channel 取值、data 非空且每项含 bids/asks/t
+            validate_book_push_shape(message)
 
-            self.logger.info(f"验证订单簿推送消息")
-
-            # 必需字段
-            assert "method" in message, "缺少 method 字段"
-            assert "result" in message, "缺少 result 字段"
-            assert "code" in message, "缺少 code 字段"
-
-            method = message["method"]
-            code = message["code"]
             result = message["result"]
-
-            assert method == "subscribe", f"method 应该是 'subscribe'（实际: {method}）"
-            assert code == 0, f"code 应该是 0（实际: {code}）"
-            assert isinstance(result, dict), f"result 应该是字典（实际: {type(result)}）"
-
-            # 验证 result 字段
-            assert "instrument_name" in result, "result 缺少 instrument_name 字段"
-            assert "subscription" in result, "result 缺少 subscription 字段"
-            assert "channel" in result, "result 缺少 channel 字段"
-            assert "depth" in result, "result 缺少 depth 字段"
-            assert "data" in result, "result 缺少 data 字段"
-
-            instrument_name = result["instrument_name"]
             subscription = result["subscription"]
-            channel = result["channel"]
             depth = result["depth"]
-            data = result["data"]
 
-            self.logger.info(f"合约: {instrument_name}")
-            self.logger.info(f"订阅: {subscription}")
-            self.logger.info(f"频道: {channel}")
-            self.logger.info(f"深度: {depth}")
-
-            # 验证字段值
-            assert channel == "book", f"channel 应该是 'book'（实际: {channel}）"
             assert subscription == expected_subscription, \
                 f"subscription 不匹配（预期: {expected_subscription}, 实际: {subscription}）"
             assert depth == expected_depth, \
                 f"depth 不匹配（预期: {expected_depth}, 实际: {depth}）"
 
-            # 验证 data
-            assert isinstance(data, list), f"data 应该是列表（实际: {type(data)}）"
-            assert len(data) > 0, "data 不应为空"
-
+            self.logger.debug(f"合约: {result['instrument_name']}, 订阅: {subscription}, 深度: {depth}")
             self.logger.info("✅ 订单簿推送消息结构验证通过")
             return True
 
@@ -293,11 +282,60 @@ class WebSocketValidator:
 
         return True
 
+    @staticmethod
+    def _check_levels(levels: List[Any], name: str, path: str, report: Optional[ViolationReport]) -> List[float]:
+        """
+        逐档验证 [price, quantity] 格式与正数
+
+        Args:
+            levels: 买单或卖单档位列表
+            name: "买单" 或 "卖单"
+            path: 档位列表在数据中的路径（如 "data[0].bids"）
+            report: 违规汇总报告（None 表示在第一处违规断言失败）
+
+        Returns:
+            List[float]: 格式合法的档位价格（按原顺序，用于排序检查）
+        """
+        prices = []
+        for j, level in enumerate(levels):
+            index = f"{path}[{j}]"
+            if not isinstance(level, list):
+                record_or_raise(report, "bad_level", index, f"{name} {j} 应该是列表格式 [price, quantity]")
+                continue
+            if len(level) != 2:
+                record_or_raise(report, "bad_level", index,
+                                f"{name} {j} 应该包含 [price, quantity]（实际长度: {len(level)}）")
+                continue
+
+            price, quantity = level
+            if not isinstance(price, (int, float, str)):
+                record_or_raise(report, "bad_level", index,
+                                f"{name} {j} 价格应该是数字或字符串（实际类型: {type(price)}）")
+                continue
+            if not isinstance(quantity, (int, float, str)):
+                record_or_raise(report, "bad_level", index,
+                                f"{name} {j} 数量应该是数字或字符串（实际类型: {type(quantity)}）")
+                continue
+
+            # 转换为浮点数验证
+            try:
+                price_float = float(price)
+                quantity_float = float(quantity)
+            except (ValueError, TypeError) as e:
+                record_or_raise(report, "bad_level", index, f"{name} {j} 价格或数量无法转换为数字: {e}")
+                continue
+            if not price_float > 0:
+                record_or_raise(report, "non_positive", index, f"{name} {j} 价格应该大于 0（实际: {price_float}）")
+            if not quantity_float > 0:
+                record_or_raise(report, "non_positive", index, f"{name} {j} 数量应该大于 0（实际: {quantity_float}）")
+            prices.append(price_float)
+        return prices
+
     def validate_orderbook_data(
             self,
             data:List[Dict[str, Any]],
-    expected_depth: Optional[int] = None
-
+    expected_depth: Optional[int] = None,
+    report: Optional[ViolationReport] = None
     ) -> bool:
         """
         验证订单簿数据（Crypto.com 格式）
@@ -305,111 +343,101 @@ class WebSocketValidator:
         Args:
             订单簿数据列表
             expected_depth: 预期的深度（可选）
+            report: 违规汇总报告（可选）。传入时不在第一处违规中断，而是记录全部违规
+                （位置形如 "data[0].bids[3]"）后返回本次是否没有新增违规；
+                data 本身不是非空列表时仍直接断言失败
 
         Returns:
             bool: 验证是否通过
 
         Raises:
-            AssertionError: 验证失败时抛出
+            AssertionError: 验证失败时抛出（仅 fail-fast 模式）
         """
         try:
             assert data is not None, "订单簿数据为空（None）"
             assert isinstance(data, list), f"订单簿数据应该是列表类型（实际类型: {type(data)}）"
             assert len(data) > 0, "订单簿数据列表为空"
+            mark = report_mark(report)
 
             # 验证每一条订单簿数据
             for i, item in enumerate(data):
-                assert isinstance(item, dict), f"订单簿数据项 {i} 应该是字典类型"
+                path = f"data[{i}]"
+                if not isinstance(item, dict):
+                    record_or_raise(report, "malformed", path, f"订单簿数据项 {i} 应该是字典类型")
+                    continue
 
                 # 验证必需字段
-                assert "bids" in item, f"订单簿数据项 {i} 缺少 bids 字段"
-                assert "asks" in item, f"订单簿数据项 {i} 缺少 asks 字段"
-                assert "t" in item, f"订单簿数据项 {i} 缺少 t (时间戳) 字段"
+                missing = [field for field in ("bids", "asks", "t") if field not in item]
+                if missing:
+                    for field in missing:
+                        label = "t (时间戳)" if field == "t" else field
+                        record_or_raise(report, "missing_field", path, f"订单簿数据项 {i} 缺少 {label} 字段")
+                    continue
 
                 bids = item["bids"]
                 asks = item["asks"]
                 timestamp = item["t"]
 
                 # 验证买单和卖单格式
-                assert isinstance(bids, list), f"bids 应该是列表类型（实际类型: {type(bids)}）"
-                assert isinstance(asks, list), f"asks 应该是列表类型（实际类型: {type(asks)}）"
+                if not isinstance(bids, list):
+                    record_or_raise(report, "malformed", f"{path}.bids", f"bids 应该是列表类型（实际类型: {type(bids)}）")
+                    continue
+                if not isinstance(asks, list):
+                    record_or_raise(report, "malformed", f"{path}.asks", f"asks 应该是列表类型（实际类型: {type(asks)}）")
+                    continue
 
                 # 验证深度
                 if expected_depth:
-                    assert len(bids) <= expected_depth, \
-                        f"买单深度超出预期（预期: {expected_depth}, 实际: {len(bids)}）"
-                    assert len(asks) <= expected_depth, \
-                        f"卖单深度超出预期（预期: {expected_depth}, 实际: {len(asks)}）"
+                    if len(bids) > expected_depth:
+                        record_or_raise(report, "depth_exceeded", f"{path}.bids",
+                                        f"买单深度超出预期（预期: {expected_depth}, 实际: {len(bids)}）")
+                    if len(asks) > expected_depth:
+                        record_or_raise(report, "depth_exceeded", f"{path}.asks",
+                                        f"卖单深度超出预期（预期: {expected_depth}, 实际: {len(asks)}）")
 
                 # 验证订单格式 [price, quantity]
-                for j, bid in enumerate(bids):
-                    assert isinstance(bid, list), f"买单 {j} 应该是列表格式 [price, quantity]"
-                    assert len(bid) == 2, f"买单 {j} 应该包含 [price, quantity]（实际长度: {len(bid)}）"
-
-                    price, quantity = bid
-                    assert isinstance(price, (int, float, str)), \
-                        f"买单 {j} 价格应该是数字或字符串（实际类型: {type(price)}）"
-                    assert isinstance(quantity, (int, float, str)), \
-                        f"买单 {j} 数量应该是数字或字符串（实际类型: {type(quantity)}）"
-
-                    # 转换为浮点数验证
-                    try:
-                        price_float = float(price)
-                        quantity_float = float(quantity)
-                        assert price_float > 0, f"买单 {j} 价格应该大于 0（实际: {price_float}）"
-                        assert quantity_float > 0, f"买单 {j} 数量应该大于 0（实际: {quantity_float}）"
-                    except (ValueError, TypeError) as e:
-                        raise AssertionError(f"买单 {j} 价格或数量无法转换为数字: {e}")
-
-                for j, ask in enumerate(asks):
-                    assert isinstance(ask, list), f"卖单 {j} 应该是列表格式 [price, quantity]"
-                    assert len(ask) == 2, f"卖单 {j} 应该包含 [price, quantity]（实际长度: {len(ask)}）"
-
-                    price, quantity = ask
-                    assert isinstance(price, (int, float, str)), \
-                        f"卖单 {j} 价格应该是数字或字符串（实际类型: {type(price)}）"
-                    assert isinstance(quantity, (int, float, str)), \
-                        f"卖单 {j} 数量应该是数字或字符串（实际类型: {type(quantity)}）"
-
-                    # 转换为浮点数验证
-                    try:
-                        price_float = float(price)
-                        quantity_float = float(quantity)
-                        assert price_float > 0, f"卖单 {j} 价格应该大于 0（实际: {price_float}）"
-                        assert quantity_float > 0, f"卖单 {j} 数量应该大于 0（实际: {quantity_float}）"
-                    except (ValueError, TypeError) as e:
-                        raise AssertionError(f"卖单 {j} 价格或数量无法转换为数字: {e}")
-
-                # 验证价格排序（买单降序，卖单升序）
-                if len(bids) > 1:
-                    bid_prices = [float(bid[0]) for bid in bids]
-                    for j in range(len(bid_prices) - 1):
-                        assert bid_prices[j] >= bid_prices[j + 1], \
+                bid_prices = self._check_levels(bids, "买单", f"{path}.bids", report)
+                ask_prices = self._check_levels(asks, "卖单", f"{path}.asks", report)
+
+                # 验证价格排序（买单降序，卖单升序；收集模式下只比较格式合法的档位）
+                for j in range(len(bid_prices) - 1):
+                    if not bid_prices[j] >= bid_prices[j + 1]:
+                        record_or_raise(
+                            report, "bids_unsorted", f"{path}.bids[{j}]",
                             f"买单价格应该降序排列（位置 {j}: {bid_prices[j]}, 位置 {j + 1}: {bid_prices[j + 1]}）"
+                        )
 
-                if len(asks) > 1:
-                    ask_prices = [float(ask[0]) for ask in asks]
-                    for j in range(len(ask_prices) - 1):
-                        assert ask_prices[j] <= ask_prices[j + 1], \
+                for j in range(len(ask_prices) - 1):
+                    if not ask_prices[j] <= ask_prices[j + 1]:
+                        record_or_raise(
+                            report, "asks_unsorted", f"{path}.asks[{j}]",
                             f"卖单价格应该升序排列（位置 {j}: {ask_prices[j]}, 位置 {j + 1}: {ask_prices[j + 1]}）"
+                        )
 
                 # 验证买卖价差（最高买价应该小于最低卖价）
-                if len(bids) > 0 and len(asks) > 0:
-                    highest_bid = float(bids[0][0])
-                    lowest_ask = float(asks[0][0])
-                    assert highest_bid < lowest_ask, \
-                        f"最高买价应该小于最低卖价（买: {highest_bid}, 卖: {lowest_ask}）"
+                if bid_prices and ask_prices:
+                    highest_bid = bid_prices[0]
+                    lowest_ask = ask_prices[0]
+                    if not highest_bid < lowest_ask:
+                        record_or_raise(report, "crossed", path,
+                                        f"最高买价应该小于最低卖价（买: {highest_bid}, 卖: {lowest_ask}）")
 
                 # 验证时间戳
-                assert isinstance(timestamp, (int, float, str)), \
-                    f"时间戳应该是数字或字符串（实际类型: {type(timestamp)}）"
-
-                try:
-                    timestamp_int = int(timestamp)
-                    assert timestamp_int > 0, f"时间戳应该大于 0（实际: {timestamp_int}）"
-                except (ValueError, TypeError) as e:
-                    raise AssertionError(f"时间戳无法转换为整数: {e}")
-
+                if not isinstance(timestamp, (int, float, str)):
+                    record_or_raise(report, "bad_timestamp", f"{path}.t",
+                                    f"时间戳应该是数字或字符串（实际类型: {type(timestamp)}）")
+                else:
+                    try:
+                        timestamp_int = int(timestamp)
+                    except (ValueError, TypeError) as e:
+                        record_or_raise(report, "bad_timestamp", f"{path}.t", f"时间戳无法转换为整数: {e}")
+                    else:
+                        if not timestamp_int > 0:
+                            record_or_raise(report, "bad_timestamp", f"{path}.t",
+                                            f"时间戳应该大于 0（实际: {timestamp_int}）")
+
+                if report is not None:
+                    continue
                 self.logger.info(f"✅ 订单簿数据 {i + 1} 验证通过")
                 self.logger.info(f"  - 买单数量: {len(bids)}")
                 self.logger.info(f"  - 卖单数量: {len(asks)}")
@@ -419,8 +447,8 @@ class WebSocketValidator:
                 if len(asks) > 0:
                     self.logger.info(f"  - 最低卖价: {asks[0][0]}")
 
-            self.logger.info(f"✅ 所有订单簿数据验证通过（共 {len(data)} 条）")
-            return True
+            log_outcome(self.logger, report, mark, f"✅ 所有订单簿数据验证通过（共 {len(data)} 条）")
+            return report_mark(report) == mark
 
         except AssertionError as e:
             self.logger.error(f"❌ 订单簿数据验证失败: {e}")